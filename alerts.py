@@ -0,0 +1,222 @@
+# Alert rules evaluated over a watchlist on every new bar.
+#
+# Market data for the whole watchlist is held as one wide frame per field
+# (rows = bars, columns = symbols) and the indicators from indicators.py are
+# computed on those frames directly. A rule such as "RSI crosses above 70"
+# compiles to a NumPy expression over the (bars x symbols) matrices, so one
+# evaluation covers every symbol and every bar that arrived since the last
+# run. An alert fires once per crossing: the engine remembers the bar each
+# (rule, symbol) pair last fired on.
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+logger = logging.getLogger("crypto_app.alerts")
+
+
+# --------------------- RULES -----------------------
+
+class Rule:
+    # `left` and `right` are indicator/price fields ("RSI", "Close", "bb_bbh",
+    # "MACD_Line" ...) or a number; `op` is "crosses_above" or "crosses_below"
+    def __init__(self, name, left, op, right):
+        if op not in ("crosses_above", "crosses_below"):
+            raise ValueError(f"Unknown rule operator: {op}")
+        self.name = name
+        self.left = left
+        self.op = op
+        self.right = right
+
+    def __repr__(self):
+        return f"{self.left} {self.op.replace('_', ' ')} {self.right}"
+
+    def fields(self):
+        return [f for f in (self.left, self.right) if isinstance(f, str)]
+
+    def compile(self):
+        # Returns f(panel) -> boolean matrix (bars - 1, symbols); row i is
+        # True where the crossing happened between bar i and bar i + 1
+        left, right, above = self.left, self.right, self.op == "crosses_above"
+
+        def operand(panel, field):
+            return panel[field] if isinstance(field, str) else np.float64(field)
+
+        def evaluate(panel):
+            diff = operand(panel, left) - operand(panel, right)
+            if not above:
+                diff = -diff
+            with np.errstate(invalid="ignore"):
+                return (diff[1:] > 0) & (diff[:-1] <= 0)
+
+        return evaluate
+
+
+DEFAULT_RULES = [
+    Rule("RSI overbought", "RSI", "crosses_above", indicators.RSI_OVERBOUGHT),
+    Rule("RSI oversold", "RSI", "crosses_below", indicators.RSI_OVERSOLD),
+    Rule("MACD bullish cross", "MACD_Line", "crosses_above", "MACD_Signal"),
+    Rule("MACD bearish cross", "MACD_Line", "crosses_below", "MACD_Signal"),
+    Rule("Close above upper band", "Close", "crosses_above", "bb_bbh"),
+    Rule("Close below lower band", "Close", "crosses_below", "bb_bbl"),
+]
+
+
+# --------------------- SINKS -----------------------
+
+class FileSink:
+    # One JSON object per line
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alerts):
+        with open(self.path, "a") as fh:
+            for alert in alerts:
+                fh.write(json.dumps(alert) + "\n")
+
+
+class WebhookSink:
+    # Posts each batch as a JSON list; stands in for Slack/Teams/etc.
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alerts):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alerts).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+# --------------------- DATA -----------------------
+
+def watchlist_panel(symbols, period="5d", interval="1h"):
+    # Wide OHLCV frames for the whole watchlist; data.get_many fetches the
+    # missing symbols in grouped requests and shares the cache with the pages
+    import data
+
+    frames, _ = data.get_many(symbols, period, interval)
+    if not frames:
+        return {}
+    return {
+        field: pd.concat({s: df[field] for s, df in frames.items()}, axis=1)
+        for field in ("Open", "High", "Low", "Close", "Volume")
+    }
+
+
+def build_panel(ohlcv, names=None, params=None):
+    # Adds the named indicators (all by default) to the OHLCV frames and
+    # converts everything to (bars x symbols) float arrays. Each symbol's
+    # indicators run over its own bars, not the NaN rows the union index
+    # gives a stock next to crypto.
+    panel = dict(ohlcv)
+    panel.update(indicators.compute_on_calendars(ohlcv, names, params))
+    index = ohlcv["Close"].index
+    symbols = list(ohlcv["Close"].columns)
+    return index, symbols, {k: v.to_numpy(dtype="float64") for k, v in panel.items()}
+
+
+# --------------------- ENGINE -----------------------
+
+class AlertEngine:
+    def __init__(self, rules, sinks=(), fetch=watchlist_panel, poll_seconds=60, recent=500):
+        self.rules = list(rules)
+        self._compiled = [(rule, rule.compile()) for rule in self.rules]
+        # Only the indicators the rules read are computed
+        self._indicators = indicators.providing([f for rule in self.rules for f in rule.fields()])
+        self.sinks = list(sinks)
+        self.fetch = fetch
+        self.poll_seconds = poll_seconds
+        self.recent = deque(maxlen=recent)
+        self._last_fired = {}  # (rule name, symbol) -> bar timestamp
+        self._last_bar = None  # newest bar already evaluated
+        self._stop = threading.Event()
+        self._thread = None
+        self.watchlist = []
+
+    def evaluate(self, index, symbols, panel):
+        # Evaluates every rule on the bars newer than the last evaluated one
+        if len(index) < 2:
+            return []
+        if self._last_bar is None:
+            first = len(index) - 1  # On start-up only the newest bar counts
+        else:
+            first = max(1, int(index.searchsorted(self._last_bar, side="right")))
+        if first >= len(index):
+            # No new bar, but the newest one may have been revised
+            first = len(index) - 1
+        # Each symbol's bar is compared with its own previous bar, not with
+        # the NaN row another symbol's calendar puts before it: the rules run
+        # on the panel packed per symbol (indicators.Calendars) and the hits
+        # are put back on the union index
+        calendars = indicators.Calendars(pd.DataFrame(panel["Close"], index=index))
+        packed = {k: calendars.pack_values(v) for k, v in panel.items()}
+
+        alerts = []
+        for rule, evaluate in self._compiled:
+            hits = np.zeros(panel["Close"].shape)
+            hits[1:] = evaluate(packed)
+            hits = calendars.unpack_values(hits) == 1
+            for row, col in zip(*np.nonzero(hits[first:])):
+                symbol, bar = symbols[col], index[first + row]
+                key = (rule.name, symbol)
+                if self._last_fired.get(key) == bar:
+                    continue  # Already fired for this crossing
+                self._last_fired[key] = bar
+                alerts.append({
+                    "rule": rule.name,
+                    "condition": repr(rule),
+                    "symbol": symbol,
+                    "bar": pd.Timestamp(bar).isoformat(),
+                    "close": float(panel["Close"][first + row, col]),
+                })
+        self._last_bar = index[-1]
+        return alerts
+
+    def run_once(self):
+        ohlcv = self.fetch(self.watchlist)
+        if not ohlcv:
+            return []
+        alerts = self.evaluate(*build_panel(ohlcv, self._indicators))
+        if alerts:
+            self.recent.extend(alerts)
+            for sink in self.sinks:
+                try:
+                    sink.send(alerts)
+                except Exception as e:
+                    logger.warning("alert sink %s failed: %s", type(sink).__name__, e)
+        return alerts
+
+    def _loop(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("alert evaluation failed")
+            self._stop.wait(max(0.0, self.poll_seconds - (time.monotonic() - start)))
+
+    def start(self, watchlist):
+        self.watchlist = list(watchlist)
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="alert-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
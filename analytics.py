@@ -0,0 +1,188 @@
+# Cross-asset analytics over many symbols.
+#
+# Prices of a universe are aligned into one (dates x symbols) matrix and all
+# statistics are computed on that matrix with NumPy, never symbol by symbol.
+
+import numpy as np
+import pandas as pd
+
+
+# --------------------- CALENDAR ALIGNMENT -----------------------
+
+def _session_dates(series):
+    # Daily bars carry a midnight timestamp in the exchange's time zone
+    # (UTC for crypto, America/New_York for US stocks); comparing their local
+    # calendar dates lines the two up
+    index = series.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return series.set_axis(index.normalize())
+
+
+def align_prices(closes, how="inner", daily=True):
+    # closes: {symbol: Series}. "inner" keeps the dates every symbol traded,
+    # so crypto returns over a weekend are folded into the Monday return of
+    # stocks. "outer" keeps every date and carries the last price forward.
+    if daily:
+        closes = {s: _session_dates(c) for s, c in closes.items()}
+    closes = {s: c[~c.index.duplicated(keep="last")] for s, c in closes.items()}
+    prices = pd.concat(closes, axis=1, join="outer").sort_index()
+    if how == "inner":
+        prices = prices.dropna(how="any")
+    else:
+        prices = prices.ffill().dropna(how="any")
+    return prices
+
+
+def periods_per_year(index):
+    # Bars per year of an aligned index: 365 days when it has weekend dates
+    # (every symbol trades every day, or prices were carried forward), 252
+    # exchange sessions otherwise, times the bars per day of intraday data
+    index = pd.DatetimeIndex(index)
+    days = 365 if (index.dayofweek >= 5).any() else 252
+    dates = index.normalize().nunique()
+    return days * len(index) / dates if dates else days
+
+
+def log_returns(prices):
+    return np.log(prices).diff().iloc[1:]
+
+
+# --------------------- ROLLING COVARIANCE -----------------------
+
+class RollingCovariance:
+    # Covariance of the last `window` rows of a (rows x symbols) matrix.
+    #
+    # Keeps the running sums S = X'X and s = X'1 of the window. Sliding the
+    # window by k rows adds X_new'X_new and subtracts X_old'X_old, a rank-2k
+    # update instead of recomputing the full (window x N)'(window x N)
+    # product. Data is shifted by the first window's mean to keep the sums
+    # well conditioned.
+
+    def __init__(self, returns, window):
+        self.x = np.asarray(returns, dtype="float64")
+        if self.x.shape[0] < window:
+            raise ValueError(f"Need at least {window} rows, got {self.x.shape[0]}")
+        self.window = window
+        self.shift = self.x[:window].mean(axis=0)
+        first = self.x[:window] - self.shift
+        self.sxx = first.T @ first
+        self.sx = first.sum(axis=0)
+        self.end = window  # rows [end - window, end) are in the window
+
+    def advance(self, k=1):
+        k = min(k, self.x.shape[0] - self.end)
+        if k <= 0:
+            return False
+        new = self.x[self.end:self.end + k] - self.shift
+        old = self.x[self.end - self.window:self.end - self.window + k] - self.shift
+        # Both rank-k updates as one (2k x N)'(2k x N) product with the
+        # leaving rows negated
+        rows = np.concatenate((new, old))
+        signed = rows.copy()
+        signed[k:] *= -1.0
+        self.sxx += signed.T @ rows
+        self.sx += signed.sum(axis=0)
+        self.end += k
+        return True
+
+    def cov(self):
+        n = self.window
+        return (self.sxx - np.outer(self.sx, self.sx) / n) / (n - 1)
+
+    def corr(self):
+        return cov_to_corr(self.cov())
+
+
+def cov_to_corr(cov):
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def window_cov(returns, end, window):
+    # Covariance of the `window` rows ending at row `end` (exclusive), in one
+    # matrix product; used to jump straight to an arbitrary date
+    x = np.asarray(returns, dtype="float64")[end - window:end]
+    x = x - x.mean(axis=0)
+    return x.T @ x / (window - 1)
+
+
+def average_correlation(returns, window, step=1):
+    # Mean pairwise correlation of the universe for every window position,
+    # stepping the window incrementally. Returns a Series indexed by the
+    # window's last date.
+    returns = returns if isinstance(returns, pd.DataFrame) else pd.DataFrame(returns)
+    n = returns.shape[1]
+    rolling = RollingCovariance(returns.to_numpy(), window)
+    values, dates = [], []
+    while True:
+        corr = rolling.corr()
+        values.append((np.nansum(corr) - n) / (n * (n - 1)) if n > 1 else np.nan)
+        dates.append(returns.index[rolling.end - 1])
+        if not rolling.advance(step):
+            break
+    return pd.Series(values, index=dates, name="average correlation")
+
+
+# --------------------- PORTFOLIO RISK -----------------------
+# `prices` is an aligned (dates x symbols) matrix from align_prices and
+# `quantities` a Series of units held per symbol.
+
+def portfolio_values(prices, quantities):
+    quantities = quantities.reindex(prices.columns).fillna(0.0)
+    return pd.Series(prices.to_numpy() @ quantities.to_numpy(), index=prices.index, name="Portfolio")
+
+
+def simple_returns(prices):
+    return prices.pct_change().iloc[1:]
+
+
+def annualized_volatility(returns, periods_per_year=252):
+    return returns.std(ddof=1) * np.sqrt(periods_per_year)
+
+
+def historical_var_cvar(returns, level=0.95):
+    # Losses are reported as positive fractions of portfolio value
+    returns = np.asarray(returns, dtype="float64")
+    cutoff = np.quantile(returns, 1 - level)
+    return -cutoff, -returns[returns <= cutoff].mean()
+
+
+def parametric_var_cvar(returns, level=0.95):
+    # Normal approximation with the sample mean and standard deviation
+    from statistics import NormalDist
+
+    returns = np.asarray(returns, dtype="float64")
+    mu, sigma = returns.mean(), returns.std(ddof=1)
+    z = NormalDist().inv_cdf(1 - level)
+    var = -(mu + z * sigma)
+    cvar = -(mu - sigma * NormalDist().pdf(z) / (1 - level))
+    return var, cvar
+
+
+def betas(returns, benchmark):
+    # Beta of every column of `returns` against `benchmark`, in one pass
+    x = returns.to_numpy() - returns.to_numpy().mean(axis=0)
+    b = benchmark.to_numpy() - benchmark.to_numpy().mean()
+    return pd.Series(x.T @ b / (b @ b), index=returns.columns, name="Beta")
+
+
+def max_drawdown(values):
+    # Largest peak-to-trough fall, with the peak and trough dates
+    peaks = values.cummax()
+    drawdown = values / peaks - 1
+    trough = drawdown.idxmin()
+    peak = values.loc[:trough].idxmax()
+    return -drawdown.min(), peak, trough
+
+
+def risk_contributions(returns, weights, periods_per_year=252):
+    # Share of portfolio volatility contributed by each position (sums to 1)
+    cov = np.cov(returns.to_numpy(), rowvar=False) * periods_per_year
+    w = weights.reindex(returns.columns).fillna(0.0).to_numpy()
+    marginal = cov @ w
+    total = w @ marginal
+    return pd.Series(w * marginal / total, index=returns.columns, name="Risk contribution")
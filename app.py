@@ -1,20 +1,25 @@
-import pandas as pd
-import yfinance as yf
 import streamlit as st
-import plotly.graph_objects as go
+import pandas as pd
 from datetime import date
-from ta.utils import dropna
-from ta.volatility import BollingerBands
-from ta.volume import AccDistIndexIndicator  # Import for ADI
-import ta
 
-from streamlit_drawable_canvas import st_canvas
+# Heavy modules (yfinance, ta, plotly, feedparser, PIL, the drawable canvas)
+# are imported inside the section that uses them, so the title and sidebar
+# reach the browser before they load on a cold start.
+# Profile with: python benchmarks/startup.py
 
-from ta.momentum import RSIIndicator
 
-import requests
+import charts
+import expressions
+import fetch
+import frames
+import indicators
+import perf
+from data import get_data, get_indicators, get_news, provider_state
 
-from ta.trend import MACD
+# The developer panel checkbox lives at the bottom of the sidebar, but memory
+# tracking has to be switched on before the first stage runs
+show_perf_panel = st.session_state.get("show_perf_panel", False)
+profile = perf.RerunProfile(track_memory=show_perf_panel)
 
 
 st.title("Market Dashboard Application")
@@ -25,6 +30,16 @@ st.sidebar.header("User Input")
 
 
 
+# Flat price column names after the renaming step -> yfinance names
+OHLCV_NAMES = {
+    "Price Data_Open": "Open",
+    "Price Data_High": "High",
+    "Price Data_Low": "Low",
+    "Price Data_Close": "Close",  # Replacing Adj Close with Close
+    "Price Data_Volume": "Volume",
+}
+
+
 def get_input():
     # Normalize the symbol
     symbol = st.sidebar.text_input("Symbol", "BTC-USD").strip().upper()
@@ -60,452 +75,387 @@ def get_input():
     return symbol, period, interval, start_date, end_date
 
 
-def get_data(symbol, period, interval, start_date=None, end_date=None):
-    symbol = symbol.upper()
+@st.cache_data(show_spinner=False)
+def load_trade_bars(data, name, bar_interval):
+    # Builds bars from an uploaded trade recording instead of downloading them
+    import io
+    import bars
 
-    # Handle data fetching based on the selected period or custom dates
-    if period != "Custom Dates":
-        # Fetch data using period and interval
-        df = yf.download(tickers=symbol, period=period, interval=interval)
-    else:
-        # Fetch data using start and end dates
-        df = yf.download(tickers=symbol, start=start_date, end=end_date, interval=interval)
-
-    # Handle case where no data is returned
-    if df.empty:
-        df = pd.DataFrame(columns=['Date', 'Close', 'Open', 'Volume', 'Adj Close'])
-
-    return df
+    source = io.BytesIO(data)
+    source.name = name
+    ts, price, size = bars.read_trades(source)
+    return bars.trades_to_bars(ts, price, size, bar_interval)
 
 
 
 
 symbol, period, interval, start_date, end_date = get_input()
-df = get_data(symbol, period, interval, start_date, end_date)
-
-
-
-if not df.empty and 'Close' in df.columns: # Replacing Adj Close with Close
-    df = dropna(df)
-    close_prices = df["Close"].squeeze() # Replacing Adj Close with Close
-
-    # --------------------- BOLLINGER BANDS -----------------------
-    indicator_bb = BollingerBands(close=close_prices, window=20, window_dev=2) # Replacing Adj Close with Close
-    df['bb_bbm'] = indicator_bb.bollinger_mavg()  # Middle Band
-    df['bb_bbh'] = indicator_bb.bollinger_hband()  # Upper Band
-    df['bb_bbl'] = indicator_bb.bollinger_lband()  # Lower Band
-    df['bb_bbhi'] = indicator_bb.bollinger_hband_indicator()  # High Indicator
-    df['bb_bbli'] = indicator_bb.bollinger_lband_indicator()  # Low Indicator
-
-    # --------------------- ADI (Accumulation/Distribution Index) -----------------------
-    
-
-    # Check the column names and ensure they are capitalized correctly
-    required_columns = ['High', 'Low', 'Close', 'Volume']
-
-    
-        
-    # Correctly access columns as 1D pandas Series
-    high = df['High'].squeeze()  # Convert to Series if it's accidentally 2D
-    low = df['Low'].squeeze()
-    close = df['Close'].squeeze()
-    volume = df['Volume'].squeeze()
-
-    
-    # Calculate ADI
-    df['ADI'] = ta.volume.acc_dist_index(high, low, close, volume)
-
-
-
-# --------------------- RSI (Relative Strength Index) -----------------------
-
-    # Check that the 'Close' column exists and flatten it
-    if "Close" in df.columns:
-        close = df["Close"].squeeze()  # Ensure it's a 1D pandas Series
-
-        # Add RSI Period and FillNA options in the Sidebar
-        rsi_period = st.sidebar.slider("RSI Period", min_value=5, max_value=50, value=14, step=1)
-        fillna_option = st.sidebar.checkbox("Fill NaN values in RSI", value=False)
-
-        # Calculate RSI using the ta library
-        rsi_indicator = RSIIndicator(close=close, window=rsi_period, fillna=fillna_option)
-        df["RSI"] = rsi_indicator.rsi()
-
-
-# --------------------- MACD (Moving Average Convergence Divergence) -----------------------
-
+compact_mode = st.sidebar.checkbox(
+    "Compact memory mode",
+    value=False,
+    help="Store plotted indicators as float32 and band flags as int8",
+)
 
+# Recorded trades replace the download and allow sub-minute bars
+trades_file = st.sidebar.file_uploader(
+    "Recorded trades (timestamp, price, size)", type=["csv", "npz"]
+)
+if trades_file is not None:
+    bar_interval = st.sidebar.selectbox(
+        "Bar interval from trades:",
+        ['1s', '5s', '15s', '30s', '1m', '5m', '15m', '30m', '1h', '1d'],
+        index=4  # Default to '1m'
+    )
 
-    if "Close" in df.columns:
-        close = df["Close"].squeeze()  # Ensure it's a 1D pandas Series
+with profile.stage("download"):
+    if trades_file is not None:
+        df = load_trade_bars(trades_file.getvalue(), trades_file.name, bar_interval)
+    else:
+        try:
+            df = get_data(symbol, period, interval, start_date, end_date)
+        except fetch.NoDataError as e:
+            st.warning(f"No data for {symbol} with period {period} and interval {interval}: {e}")
+            st.stop()
+        except fetch.FetchError as e:
+            st.error(f"The market data provider is unavailable, please retry shortly ({e})")
+            st.stop()
+
+if "stale_seconds" in df.attrs:
+    st.warning(
+        f"The market data provider is degraded; showing data cached "
+        f"{df.attrs['stale_seconds'] / 60:.0f} minutes ago."
+    )
+completeness = df.attrs.get("completeness")
 
-        # Add MACD Parameters to the Sidebar
-        macd_fast = st.sidebar.slider("MACD Fast Window", min_value=5, max_value=50, value=12, step=1)
-        macd_slow = st.sidebar.slider("MACD Slow Window", min_value=10, max_value=100, value=26, step=1)
-        macd_signal = st.sidebar.slider("MACD Signal Window", min_value=5, max_value=30, value=9, step=1)
-        fillna_option = st.sidebar.checkbox("Fill NaN values in MACD", value=False)
 
-        # Calculate MACD using the ta library
-        macd_indicator = MACD(close=close, window_slow=macd_slow, window_fast=macd_fast, window_sign=macd_signal, fillna=fillna_option)
 
-        # Add MACD values to the DataFrame
-        df["MACD_Line"] = macd_indicator.macd()
-        df["MACD_Signal"] = macd_indicator.macd_signal()
-        df["MACD_Histogram"] = macd_indicator.macd_diff()
+if not df.empty and 'Close' in df.columns: # Replacing Adj Close with Close
+    from ta.utils import dropna
 
+    with profile.stage("dropna"):
+        df = dropna(df)
 
+    # --------------------- INDICATOR SELECTION -----------------------
+    # Only the indicators switched on here are computed, named and plotted
+    # (indicators.REGISTRY)
+    indicator_names = st.sidebar.multiselect(
+        "Indicators:", list(indicators.REGISTRY), default=indicators.DEFAULT_INDICATORS
+    )
 
+    # Add RSI Period and FillNA options in the Sidebar
+    rsi_period, rsi_fillna = indicators.REGISTRY["RSI"].params["window"], False
+    if "RSI" in indicator_names:
+        rsi_period = st.sidebar.slider("RSI Period", min_value=5, max_value=50, value=rsi_period, step=1)
+        rsi_fillna = st.sidebar.checkbox("Fill NaN values in RSI", value=False)
+
+    # Add MACD Parameters to the Sidebar
+    macd_fast, macd_slow, macd_signal = indicators.REGISTRY["MACD"].params.values()
+    macd_fillna = False
+    if "MACD" in indicator_names:
+        macd_fast = st.sidebar.slider("MACD Fast Window", min_value=5, max_value=50, value=macd_fast, step=1)
+        macd_slow = st.sidebar.slider("MACD Slow Window", min_value=10, max_value=100, value=macd_slow, step=1)
+        macd_signal = st.sidebar.slider("MACD Signal Window", min_value=5, max_value=30, value=macd_signal, step=1)
+        macd_fillna = st.sidebar.checkbox("Fill NaN values in MACD", value=False)
+
+    indicator_params = {
+        "RSI": {"window": rsi_period},
+        "MACD": {"window_fast": macd_fast, "window_slow": macd_slow, "window_sign": macd_signal},
+    }
+    for name, label in (("SMA", "SMA Window"), ("EMA", "EMA Window"), ("ATR", "ATR Window"),
+                        ("SuperTrend", "SuperTrend ATR Window"), ("Trailing Stop", "Trailing Stop ATR Window")):
+        if name in indicator_names:
+            default = indicators.REGISTRY[name].params["window"]
+            indicator_params[name] = {
+                "window": st.sidebar.slider(label, min_value=2, max_value=200, value=default, step=1)
+            }
+    indicator_fillna = {"RSI": rsi_fillna, "MACD": macd_fillna}
+
+    # --------------------- MATERIALIZED INDICATORS -----------------------
+    # With the registry's default parameters the columns precomputed next to
+    # the archive (materialize.py) are read instead of computed
+    stored = None
+    if trades_file is None and indicator_names and not (rsi_fillna or macd_fillna) \
+            and all(indicator_params[name] == indicators.REGISTRY[name].params for name in ("RSI", "MACD")):
+        with profile.stage("indicator:materialized"):
+            stored = get_indicators(symbol, interval, df)
+
+    # --------------------- INDICATORS -----------------------
+    # Bollinger Bands, ADI (Accumulation/Distribution Index), RSI, MACD, ...
+    # each under its flat column names ("<group>_<label>"). Intermediates
+    # (EMAs, rolling windows, ...) are shared between the indicators and kept
+    # for the next rerun until the prices change (indicators.Graph).
+    if "indicator_graph" not in st.session_state:
+        st.session_state["indicator_graph"] = indicators.Graph()
+    graph = st.session_state["indicator_graph"]
+    with profile.stage("indicator:graph"):
+        graph.update(df)
+
+    for name in indicator_names:
+        indicator = indicators.REGISTRY[name]
+        with profile.stage(f"indicator:{indicator.key}"):
+            if stored is not None and set(indicator.outputs) <= set(stored.columns):
+                values = {output: stored[output] for output in indicator.outputs}
+            else:
+                values = indicator(df, fillna=indicator_fillna.get(name, False), graph=graph,
+                                   **indicator_params.get(name, {}))
+            for output, column in indicator.columns.items():
+                df[column] = values[output]
+
+    # --------------------- CUSTOM FORMULAS -----------------------
+    # "label = formula" per line, e.g. "spread = ema(close, 12) - ema(close, 26)";
+    # compiled by expressions.py over the same graph, so terms the built-in
+    # indicators already computed are reused
+    formulas = st.sidebar.text_area(
+        "Custom indicators (one \"name = formula\" per line):",
+        help="Prices: open, high, low, close, volume. Functions: " + ", ".join(expressions.FUNCTIONS),
+    )
+    with profile.stage("indicator:custom"):
+        for label, formula in expressions.parse_lines(formulas):
+            try:
+                df[f"Custom_{label}"] = expressions.compile_formula(formula)(graph)
+            except expressions.ExpressionError as e:
+                st.sidebar.error(f"{label}: {e}")
+    graph.prune()
 
-    
     # --------------------- COLUMN RENAMING -----------------------
-    columns = [
-        #("Price Data", "Date"),
-        #("Price Data", "Adj Close"),
-        ("Price Data", "Close"), # Replacing Adj Close with Close
-        ("Price Data", "High"),
-        ("Price Data", "Low"),
-        ("Price Data", "Open"),
-        ("Price Data", "Volume"),
-        ("Bollinger Bands", "Middle"),
-        ("Bollinger Bands", "High"),
-        ("Bollinger Bands", "Low"),
-        ("Bollinger Bands", "High Indicator"),
-        ("Bollinger Bands", "Low Indicator"),
-        ("Indicators", "ADI"),  # Add ADI to columns
-        ("Indicators", "RSI"),  # Add RSI to columns
-        ("MACD", "MACD Line"),  # MACD line
-        ("MACD", "Signal Line"),  # Signal line
-        ("MACD", "Histogram"),  # MACD Histogram
-   
-    ]
-
-
-    # Rename columns
-    try:
-        df.columns = pd.MultiIndex.from_tuples(columns)
-        df.columns = [f"{level_0}_{level_1}" if level_0 else level_1 for level_0, level_1 in df.columns]
-    except ValueError as e:
-        st.error(f"Column mismatch: {e}")
-        st.write("Columns After Calculation:", df.columns)
+    with profile.stage("rename_columns"):
+        df = df.rename(columns={v: k for k, v in OHLCV_NAMES.items()})
+
+    # --------------------- MULTI-TIMEFRAME OVERLAYS -----------------------
+    # Daily/weekly indicators resampled from the downloaded bars (no extra
+    # download); each bar only sees higher-timeframe values that had closed
+    with profile.stage("indicator:mtf"):
+        ohlcv = df[list(OHLCV_NAMES)].rename(columns=OHLCV_NAMES)
+        base_length = ohlcv.index.to_series().diff().median()
+        timeframes = ["None"] + [tf for tf, (_, length) in indicators.TIMEFRAMES.items() if length > base_length]
+        rsi_timeframe = st.sidebar.selectbox("Higher-timeframe RSI:", timeframes)
+        bb_timeframe = st.sidebar.selectbox("Higher-timeframe Bollinger Bands:", timeframes)
+
+        if rsi_timeframe != "None":
+            mtf = indicators.higher_timeframe(ohlcv, rsi_timeframe, indicators.rsi, window=rsi_period)
+            df[f"MTF_RSI {rsi_timeframe}"] = mtf["RSI"]
+        if bb_timeframe != "None":
+            mtf = indicators.higher_timeframe(ohlcv, bb_timeframe, indicators.bollinger)
+            df[f"MTF_Bollinger {bb_timeframe} Middle"] = mtf["bb_bbm"]
+            df[f"MTF_Bollinger {bb_timeframe} High"] = mtf["bb_bbh"]
+            df[f"MTF_Bollinger {bb_timeframe} Low"] = mtf["bb_bbl"]
+
+    if compact_mode:
+        with profile.stage("compact"):
+            df = frames.compact_frame(df)
 
 
 # --------------------- DISPLAY DATAFRAME -----------------------
 # >>>> The following two lines are referred to the table with the data
 st.subheader("Historical Prices")
-st.write(df)
+with profile.stage("table:prices"):
+    st.write(df)
+    st.caption(f"In-memory size: {frames.memory_bytes(df) / 1024:,.0f} KiB")
+    if completeness is not None and completeness["missing"]:
+        st.caption(
+            f"Completeness: {completeness['completeness']:.2%} "
+            f"({completeness['missing']} of {completeness['expected']} expected bars missing "
+            f"in {len(completeness['gaps'])} gaps after backfill)"
+        )
 # >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
 
 st.subheader("Data Statistics")
-st.write(df.describe())
-
-
-# --------------------- VOLUME CHART -----------------------
-st.subheader("Volume")
-st.bar_chart(df['Price Data_Volume'])
-#st.bar_chart(df['Volume'])
-
-# --------------------- ADI CHART -----------------------
-st.subheader("Accumulation/Distribution Index (ADI)")
-st.line_chart(df['Indicators_ADI'])
-
-
-
-# -------------- Scaling ADI -----------------------
-
-# Scale ADI to fit within the price range
-adi_min = df['Indicators_ADI'].min()
-adi_max = df['Indicators_ADI'].max()
-price_min = df['Price Data_Close'].min() # Replacing Adj Close with Close
-price_max = df['Price Data_Close'].max() # Replacing Adj Close with Close
-
-# Dynamically scale ADI to match the price range
-df['Scaled_ADI'] = ((df['Indicators_ADI'] - adi_min) / (adi_max - adi_min)) * (price_max - price_min) + price_min
+with profile.stage("table:statistics"):
+    st.write(df.describe())
 
 
 # Display RSI data in the app
-st.subheader("RSI Data")
-st.write(df[["Price Data_Close", "Indicators_RSI"]].tail(20))  # Display the last 20 rows of Close and RSI # Replacing Adj Close with Close
-
-# --------------------- RSI Chart -----------------------
-st.subheader("RSI Chart")
-st.line_chart(df["Indicators_RSI"])
-
-
-# --------------------- MACD Chart -----------------------
-st.subheader("MACD Chart")
-fig_macd = go.Figure()
-
-# Add MACD Line
-fig_macd.add_trace(go.Scatter(
-    x=df.index,
-    y=df["MACD_MACD Line"],
-    mode='lines',
-    name="MACD Line",
-    line=dict(color='blue')
-))
-
-# Add Signal Line
-fig_macd.add_trace(go.Scatter(
-    x=df.index,
-    y=df["MACD_Signal Line"],
-    mode='lines',
-    name="Signal Line",
-    line=dict(color='orange')
-))
-
-# Add Histogram (Bar Chart)
-fig_macd.add_trace(go.Bar(
-    x=df.index,
-    y=df["MACD_Histogram"],
-    name="MACD Histogram",
-    marker_color="green",
-    opacity=0.5
-))
-
-# Update layout
-fig_macd.update_layout(
-    title="MACD Chart",
-    xaxis_title="Date",
-    yaxis_title="MACD",
-    height=400,
-    width=1000,
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    
-)
-
-# Display the MACD chart
-st.plotly_chart(fig_macd)
-
+if "Indicators_RSI" in df.columns:
+    st.subheader("RSI Data")
+    with profile.stage("table:rsi"):
+        st.write(df[["Price Data_Close", "Indicators_RSI"]].tail(20))  # Display the last 20 rows of Close and RSI # Replacing Adj Close with Close
 
 
-
-# --------------------- COMBINED CHART -----------------------
+# --------------------- CHART -----------------------
+# Price with Bollinger Bands, volume, ADI, RSI and MACD as linked panels of
+# one figure; picking a single panel shows that chart on its own. The figure
+# is kept per session and only traces whose column changed are replaced.
 st.subheader("Historical Price Chart with Volume, Bollinger Bands, ADI, RSI, and MACD")
+panels = charts.available_panels(df)
+chart_panels = st.multiselect("Panels:", panels, default=panels)
+
+# Long histories are drawn from a level-of-detail pyramid (pyramid.py): any
+# zoom window is read from one level at about CHART_POINTS points, so zooming
+# over years of minute bars costs the same as over a day. Streamlit does not
+# report Plotly zoom events to the script, so the window comes from a slider.
+CHART_POINTS = 2000
+chart_df = df
+if len(df) > CHART_POINTS:
+    import pyramid
+
+    if "chart_pyramid" not in st.session_state:
+        st.session_state["chart_pyramid"] = pyramid.Pyramid({
+            "Price Data_Open": ("first",),
+            "Price Data_High": ("max",),
+            "Price Data_Low": ("min",),
+            "Price Data_Close": ("last", "min", "max"),
+            "Price Data_Volume": ("sum",),
+        })
+    lod = st.session_state["chart_pyramid"]
+    with profile.stage("lod:update"):
+        lod.update(df)
+
+    # Wall-clock times, as the chart shows them
+    first = df.index[0].tz_localize(None).to_pydatetime() if df.index.tz else df.index[0].to_pydatetime()
+    last = df.index[-1].tz_localize(None).to_pydatetime() if df.index.tz else df.index[-1].to_pydatetime()
+    step = max((last - first) / 2000, df.index.to_series().diff().min().to_pytimedelta())
+    zoom = st.slider("Zoom:", min_value=first, max_value=last, value=(first, last), step=step,
+                     format="YYYY-MM-DD HH:mm")
+    # Back to instants; a wall-clock time repeated when DST ends takes its
+    # earlier instant at the start and its later one at the end, so the zoom
+    # keeps every bar it shows, and one skipped when DST starts moves forward
+    zoom_start, zoom_end = (pd.Timestamp(t).tz_localize(df.index.tz, ambiguous=dst, nonexistent="shift_forward")
+                            for t, dst in zip(zoom, (True, False)))
+
+    with profile.stage("lod:window"):
+        level, chart_df = lod.window(zoom_start, zoom_end + pd.Timedelta(1, "ns"), CHART_POINTS, tz=df.index.tz)
+    st.caption(f"{len(chart_df):,} points, {2 ** level:,} bars per point")
+
+if "figure_cache" not in st.session_state:
+    st.session_state["figure_cache"] = charts.FigureCache()
+
+with profile.stage("figure:dashboard"):
+    if chart_panels:
+        st.plotly_chart(st.session_state["figure_cache"].figure(chart_df, chart_panels))
+
+
+# --------------------- LIVE CHART (1m only) -----------------------
+# New bars are polled inside a fragment, so only this chart reruns on each
+# tick; the download, indicators and the rest of the page are left alone.
+
+if interval == "1m" and not df.empty and st.sidebar.checkbox("Live mode", value=False):
+    import live
+
+    feed_name = st.sidebar.selectbox("Live feed:", list(live.FEEDS))
+    live_refresh = st.sidebar.slider("Live refresh (seconds)", min_value=1, max_value=60, value=5)
+
+    live_key = (symbol, period, start_date, end_date, feed_name, rsi_period, macd_fast, macd_slow, macd_signal)
+    if st.session_state.get("live_key") != live_key:
+        history = df.rename(columns=OHLCV_NAMES)
+        last_time = history.index[-1].value
+        if feed_name == "Simulator":
+            feed = live.SimulatedFeed(last_close=history["Close"].iloc[-1], last_time=last_time)
+        else:
+            feed = live.YFinanceFeed(symbol, last_time=last_time)
+        st.session_state["live_session"] = live.LiveSession(
+            feed,
+            history=history,
+            rsi_window=rsi_period,
+            macd_windows=(macd_fast, macd_slow, macd_signal),
+        )
+        st.session_state["live_key"] = live_key
 
-# Create a Plotly figure
-fig = go.Figure()
-
-# Add Close Price as a line
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Price Data_Close'],  # Replacing Adj Close with Close
-    mode='lines',
-    name='Close',  # Replacing Adj Close with Close
-    line=dict(color='blue')
-))
-
-# Add Bollinger Bands (Middle, High, Low) as lines
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Bollinger Bands_Middle'],
-    mode='lines',
-    name='Bollinger Middle',
-    line=dict(color='orange')
-))
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Bollinger Bands_High'],
-    mode='lines',
-    name='Bollinger High',
-    line=dict(color='green')
-))
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Bollinger Bands_Low'],
-    mode='lines',
-    name='Bollinger Low',
-    line=dict(color='red')
-))
-
-# Add Volume as a bar chart (secondary Y-axis)
-fig.add_trace(go.Bar(
-    x=df.index,
-    y=df['Price Data_Volume'],
-    name='Volume',
-    marker_color='gray',
-    opacity=0.6,
-    yaxis='y2'  # Link to secondary Y-axis for volume
-))
-
-
-##############################
-# Add ADI as a separate line (on a secondary y-axis)
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Indicators_ADI'],
-    mode='lines',
-    name='ADI',
-    line=dict(color='purple'),
-    yaxis='y5'  # Assigning ADI to a new y-axis
-))
-
-#################################
-
-
-
-
-
-# Add RSI as a line
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df['Indicators_RSI'],
-    mode='lines',
-    name='RSI',
-    line=dict(color='brown'),
-    yaxis="y3"  # Link to tertiary Y-axis for RSI
-))
-
-# Add RSI levels as horizontal lines on the RSI Y-axis
-fig.add_hline(
-    y=70,
-    line_dash="dot",
-    line_color="red",
-    annotation_text="Overbought (70)",
-    annotation_position="top right",
-    yref="y3"  # Reference RSI axis
-)
-fig.add_hline(
-    y=30,
-    line_dash="dot",
-    line_color="green",
-    annotation_text="Oversold (30)",
-    annotation_position="bottom right",
-    yref="y3"  # Reference RSI axis
-)
-
-# Add MACD Line to Combined Chart
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df["MACD_MACD Line"],
-    mode='lines',
-    name="MACD Line",
-    line=dict(color='blue', dash="dot"),
-    yaxis="y4"  # Use a fourth axis for MACD
-))
-
-# Add Signal Line to Combined Chart
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df["MACD_Signal Line"],
-    mode='lines',
-    name="Signal Line",
-    line=dict(color='orange', dash="dash"),
-    yaxis="y4"  # Use a fourth axis for MACD
-))
-
-# Add MACD Histogram to Combined Chart (as a filled area)
-fig.add_trace(go.Scatter(
-    x=df.index,
-    y=df["MACD_Histogram"],
-    mode='lines',
-    fill='tozeroy',  # Fill area to zero
-    name="MACD Histogram",
-    line=dict(color="green"),
-    opacity=0.3,
-    yaxis="y4"  # Use a fourth axis for MACD
-))
-
-
-#####################################################################
-
-
-fig.update_layout(
-    title= 'Chart', #'Close Price, Bollinger Bands, Volume, ADI, RSI, and MACD',  # Updated title to reflect all included indicators
-    xaxis=dict(title='Date'),
-    yaxis=dict(
-        title='Price',
-        showgrid=True,
-        zeroline=True
-    ),
-    yaxis2=dict(
-        title='Volume',
-        overlaying='y',  # Overlay volume axis on the same plot
-        side='right'     # Display volume axis on the right side
-    ),
-    yaxis3=dict(
-        title='RSI',
-        range=[0, 100],  # RSI ranges from 0 to 100
-        overlaying='y',  # Overlay RSI axis on the same plot
-        side='right',    # Place RSI axis on the right side
-        anchor="free",   # Free anchor to avoid conflicts
-        position=0.85    # Slightly offset RSI axis to avoid overlap
-    ),
-    yaxis4=dict(
-        title="MACD",       # Title for MACD axis
-        overlaying="y",     # Overlay it on the same plot
-        side="right",       # Place it on the right
-        anchor="free",      # Free anchor for independent positioning
-        position=0.92       # Offset it to the right within the valid range
-    ),
-
-    #################################
-    
-    # Define this new y-axis in the layout:
-
-    yaxis5=dict(
-        title='ADI',
-        overlaying='y',
-        anchor='free',
-        side='right',
-        position=0.98  # Adjust to avoid overlap
-    ),
-
-    ###########################
-    
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    
-    height=700,
-    width=1000
-)
-
-
+    st.subheader(f"Live {symbol} (1m)")
 
+    @st.fragment(run_every=live_refresh)
+    def live_chart():
+        session = st.session_state["live_session"]
+        added = session.poll()
+        st.caption(f"{session.buffer.size} bars buffered, {added} new since the last update")
+        if getattr(session.feed, "unavailable", None):
+            st.caption(f"Live feed unavailable ({session.feed.unavailable}); showing the bars received so far")
+        st.plotly_chart(session.figure, key="live_chart")
 
-# Display the combined chart
-st.plotly_chart(fig)
+    live_chart()
 
 
 # -------------------------- Want to add the news container --------------------
 
 
-
-import feedparser
-
 st.subheader(f"Latest News for {symbol.upper()}")
 
-try:
-    if symbol.endswith("-USD"):  # Cryptocurrency news from Google News RSS feed
-        crypto_name = symbol.split('-')[0]  # e.g., BTC, ETH
-        rss_url = f"https://news.google.com/rss/search?q={crypto_name}+crypto&hl=en-US&gl=US&ceid=US:en"
+with profile.stage("news"):
+    try:
+        if symbol.endswith("-USD"):  # Cryptocurrency news from Google News RSS feed
+            crypto_name = symbol.split('-')[0]  # e.g., BTC, ETH
+            rss_url = f"https://news.google.com/rss/search?q={crypto_name}+crypto&hl=en-US&gl=US&ceid=US:en"
+
+            import feedparser
 
-        news_feed = feedparser.parse(rss_url)
+            news_feed = feedparser.parse(rss_url)
 
-        if news_feed.entries:
-            # Display the top 5 news articles
-            for entry in news_feed.entries[:5]:
-                st.markdown(f"### [{entry.title}]({entry.link})")
-                st.write(f"Published on: {entry.published}")
-                st.write("---")
-        else:
-            st.write("No news articles found for this cryptocurrency.")
+            if news_feed.entries:
+                # Display the top 5 news articles
+                for entry in news_feed.entries[:5]:
+                    st.markdown(f"### [{entry.title}]({entry.link})")
+                    st.write(f"Published on: {entry.published}")
+                    st.write("---")
+            else:
+                st.write("No news articles found for this cryptocurrency.")
 
 
 
-    else:
-        # Fetch stock news using yfinance
-        ticker = yf.Ticker(symbol)
-        stock_news = ticker.news
-        if stock_news and len(stock_news) > 0:
-            # Display the top 5 news articles
-            for article in stock_news[:5]:
-                st.markdown(f"### [{article['title']}]({article['link']})")
-                st.write(f"Published by: {article['publisher']}")
-                st.write(f"Published on: {pd.to_datetime(article['providerPublishTime'], unit='s')}")
-                st.write("---")
         else:
-            st.write("No news articles found for this stock.")
-except Exception as e:
-    st.error(f"An error occurred while fetching news: {e}")
+            # Fetch stock news from the market data provider
+            stock_news = get_news(symbol)
+            if stock_news and len(stock_news) > 0:
+                # Display the top 5 news articles
+                for article in stock_news[:5]:
+                    st.markdown(f"### [{article['title']}]({article['link']})")
+                    st.write(f"Published by: {article['publisher']}")
+                    st.write(f"Published on: {article['published']}")
+                    st.write("---")
+            else:
+                st.write("No news articles found for this stock.")
+    except Exception as e:
+        st.error(f"An error occurred while fetching news: {e}")
+
+
+
+# -------------------------- Alerts -----------------------------------
+# One engine per server process, shared by every session; it evaluates the
+# rules for the whole watchlist in a background thread on each poll.
+
+@st.cache_resource
+def alert_engine_holder():
+    return {"engine": None}
+
+
+st.sidebar.header("Alerts")
+alert_holder = alert_engine_holder()
+alert_engine = alert_holder["engine"]
+
+import alerts
+
+alert_watchlist = st.sidebar.text_area("Watchlist (one symbol per line):", symbol)
+alert_rule_names = st.sidebar.multiselect(
+    "Alert rules:",
+    [rule.name for rule in alerts.DEFAULT_RULES],
+    default=[rule.name for rule in alerts.DEFAULT_RULES],
+)
+alert_webhook = st.sidebar.text_input("Webhook URL (optional):")
+
+col1, col2 = st.sidebar.columns(2)
+with col1:
+    if st.button("Start alerts"):
+        if alert_engine is not None:
+            alert_engine.stop()
+        sinks = [alerts.FileSink("alerts.jsonl")]
+        if alert_webhook.strip():
+            sinks.append(alerts.WebhookSink(alert_webhook.strip()))
+        alert_engine = alerts.AlertEngine(
+            [rule for rule in alerts.DEFAULT_RULES if rule.name in alert_rule_names],
+            sinks=sinks,
+        )
+        alert_engine.start(
+            s.strip().upper() for s in alert_watchlist.splitlines() if s.strip()
+        )
+        alert_holder["engine"] = alert_engine
+with col2:
+    if st.button("Stop alerts") and alert_engine is not None:
+        alert_engine.stop()
+
+if alert_engine is not None:
+    status = "running" if alert_engine.running else "stopped"
+    st.sidebar.caption(f"Alert engine {status}, {len(alert_engine.watchlist)} symbols")
+    if alert_engine.recent:
+        st.subheader("Recent Alerts")
+        st.dataframe(pd.DataFrame(list(alert_engine.recent)[::-1]))
 
 
 
@@ -514,11 +464,7 @@ except Exception as e:
 
 # making it possible to manage notes and add them to drawings if i want to
 
-import streamlit as st
 from streamlit_drawable_canvas import st_canvas
-from PIL import Image, ImageDraw, ImageFont
-import io
-import json
 
 # --- Initialize Session State ---
 if "drawing_data" not in st.session_state:
@@ -593,36 +539,42 @@ canvas_result = st_canvas(
 )
 
 # --- Handle Drawing Data ---
-final_image = None
-if canvas_result.image_data is not None:
-    # Convert canvas data to an image
-    image = Image.fromarray(canvas_result.image_data.astype("uint8"), "RGBA")
-
-    # Add canvas text annotations
-    draw = ImageDraw.Draw(image)
-    font = ImageFont.load_default()  # Use default font
-    for annotation in st.session_state["canvas_annotations"]:
-        draw.text((annotation["x"], annotation["y"]), annotation["text"], fill="black", font=font)
-
-    # Save the final image for download
-    final_image = image
-    img_buffer = io.BytesIO()
-    image.save(img_buffer, format="PNG")
-    img_buffer.seek(0)
-
-    # Display the updated image
-    st.image(image, caption="Canvas Drawing with Annotations", use_container_width=True)
-
-    # Provide download button for the image
-    st.download_button(
-        label="Download Final Image with Canvas Annotations",
-        data=img_buffer,
-        file_name="drawing_with_canvas_annotations.png",
-        mime="image/png",
-    )
+with profile.stage("canvas"):
+    final_image = None
+    if canvas_result.image_data is not None:
+        import io
+        from PIL import Image, ImageDraw, ImageFont
+
+        # Convert canvas data to an image
+        image = Image.fromarray(canvas_result.image_data.astype("uint8"), "RGBA")
+
+        # Add canvas text annotations
+        draw = ImageDraw.Draw(image)
+        font = ImageFont.load_default()  # Use default font
+        for annotation in st.session_state["canvas_annotations"]:
+            draw.text((annotation["x"], annotation["y"]), annotation["text"], fill="black", font=font)
+
+        # Save the final image for download
+        final_image = image
+        img_buffer = io.BytesIO()
+        image.save(img_buffer, format="PNG")
+        img_buffer.seek(0)
+
+        # Display the updated image
+        st.image(image, caption="Canvas Drawing with Annotations", use_container_width=True)
+
+        # Provide download button for the image
+        st.download_button(
+            label="Download Final Image with Canvas Annotations",
+            data=img_buffer,
+            file_name="drawing_with_canvas_annotations.png",
+            mime="image/png",
+        )
 
 # --- Save and Download Sidebar Notes ---
 if st.session_state["text_annotations"]:
+    import json
+
     saved_data = {"text_annotations": st.session_state["text_annotations"]}
     st.download_button(
         label="Download Sidebar Notes (Text Only)",
@@ -631,3 +583,36 @@ if st.session_state["text_annotations"]:
         mime="application/json",
     )
 
+
+
+# -------------------------- Performance Panel -----------------------------------
+
+st.sidebar.header("Developer")
+st.sidebar.checkbox("Show performance panel", value=False, key="show_perf_panel")
+
+rerun_seconds = profile.finish()
+
+if show_perf_panel:
+    st.subheader("Performance (this rerun)")
+
+    stages = pd.DataFrame(profile.stages)
+    stages["ms"] = stages["seconds"] * 1000
+    if profile.track_memory:
+        stages["memory delta (KiB)"] = stages["memory_delta"] / 1024
+    st.dataframe(stages.drop(columns=["seconds", "memory_delta"]).set_index("stage"))
+
+    p50 = perf.registry.percentile(0.50)
+    p95 = perf.registry.percentile(0.95)
+    st.write(
+        f"Rerun: {rerun_seconds * 1000:.1f} ms | "
+        f"p50 {p50 * 1000:.1f} ms | p95 {p95 * 1000:.1f} ms "
+        f"over the last {len(perf.registry.recent_reruns)} reruns of this process"
+    )
+
+    cache = perf.cache_stats("get_data")
+    hit_rate = "n/a" if cache["hit_rate"] is None else f"{cache['hit_rate']:.0%}"
+    st.write(f"get_data cache: {cache['hits']} hits / {cache['calls']} calls ({hit_rate})")
+    st.write(f"Provider circuit: {provider_state()}")
+
+    with st.expander("Prometheus metrics"):
+        st.code(perf.registry.render(), language="text")
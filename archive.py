@@ -0,0 +1,173 @@
+# Memory-mapped OHLCV archive for long intraday histories.
+#
+# One directory per series, <root>/<SYMBOL>_<interval>/, holding
+#
+#   time.i8              int64 nanoseconds since the epoch (UTC), ascending
+#   <Column>.<dtype>     one raw fixed-width file per column in COLUMNS
+#   meta.json            row count, column dtypes and the display time zone
+#                        (null for a naive index, which is read back naive)
+#
+# Opening a series maps the files with np.memmap without reading them. A date
+# range is located with a binary search on the time column (a few pages) and
+# returned as a DataFrame whose columns are views of the maps, so only the
+# pages of the requested rows are ever read. Five years of 1m bars is ~120 MiB
+# on disk; a one-week window touches ~500 KiB of it.
+#
+# Series only grow forward: append() writes rows newer than the last stored
+# bar at the end of each file and then publishes the new row count in
+# meta.json, so readers that mapped the old length stay valid.
+#
+#   python archive.py import BTC-USD 1m bars.parquet   # bulk load a file
+#   python archive.py info BTC-USD 1m
+
+import json
+import os
+import shutil
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+DTYPES = {"Close": "f8", "High": "f8", "Low": "f8", "Open": "f8", "Volume": "f8"}
+
+
+class Series:
+    # Read-only view of one archived series
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+        self.tz = self.meta["tz"]
+        self.time = self._map("time", "i8")
+        self.columns = {c: self._map(c, d) for c, d in self.meta["dtypes"].items()}
+
+    def _map(self, name, dtype):
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, f"{name}.{dtype}"), dtype=dtype, mode="r", shape=(self.rows,))
+
+    @property
+    def first(self):
+        return self._timestamp(self.time[0]) if self.rows else None
+
+    @property
+    def last(self):
+        return self._timestamp(self.time[-1]) if self.rows else None
+
+    def _timestamp(self, ns):
+        return pd.Timestamp(int(ns), unit="ns", tz="UTC").tz_convert(self.tz)
+
+    def _position(self, value, default):
+        if value is None:
+            return default
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize(self.tz)
+        return int(np.searchsorted(self.time, ts.as_unit("ns").value))
+
+    def slice(self, start=None, end=None):
+        # Rows with start <= time < end, columns sharing memory with the maps
+        i, j = self._position(start, 0), self._position(end, self.rows)
+        index = pd.DatetimeIndex(np.asarray(self.time[i:j]).view("M8[ns]")).tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame({c: np.asarray(a[i:j]) for c, a in self.columns.items()}, index=index, copy=False)
+
+
+class Archive:
+    def __init__(self, root, columns=None):
+        self.root = root
+        self.columns = {c: "f8" for c in columns} if columns is not None else DTYPES
+        self._lock = threading.Lock()
+        self._open = {}  # path -> (meta mtime, Series)
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol.upper()}_{interval}")
+
+    def series(self, symbol, interval):
+        # Series for symbol/interval, or None; re-mapped after an append
+        path = self._path(symbol, interval)
+        try:
+            mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+        except OSError:
+            return None
+        cached = self._open.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = self._open[path] = (mtime, Series(path))
+        return cached[1]
+
+    def intervals(self):
+        if not os.path.isdir(self.root):
+            return ()
+        return tuple({n.rsplit("_", 1)[1] for n in os.listdir(self.root) if "_" in n})
+
+    def remove(self, symbol, interval):
+        with self._lock:
+            path = self._path(symbol, interval)
+            self._open.pop(path, None)
+            shutil.rmtree(path, ignore_errors=True)
+
+    def append(self, symbol, interval, df, extra=None):
+        # Stores the rows of df newer than the last archived bar; returns how
+        # many were written. `extra` is saved in meta.json with the new length.
+        if df.empty:
+            return 0
+        path = self._path(symbol, interval)
+        with self._lock:
+            os.makedirs(path, exist_ok=True)
+            current = self.series(symbol, interval)
+            rows = current.rows if current is not None else 0
+            tz = str(df.index.tz) if df.index.tz is not None else None
+            index = df.index.tz_localize("UTC") if df.index.tz is None else df.index
+            times = index.tz_convert("UTC").as_unit("ns").asi8
+            keep = np.ones(len(times), dtype=bool)
+            if rows:
+                keep = times > current.time[-1]
+                tz = current.tz
+            keep[1:] &= np.diff(times) > 0  # drop duplicates/out-of-order rows
+            if not keep.any():
+                return 0
+
+            files = {"time.i8": times[keep]}
+            for column, dtype in self.columns.items():
+                files[f"{column}.{dtype}"] = df[column].to_numpy(dtype=dtype)[keep]
+            for name, values in files.items():
+                with open(os.path.join(path, name), "r+b" if rows else "wb") as f:
+                    # Truncate anything past the published length (an
+                    # interrupted append) before writing
+                    f.truncate(rows * values.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(values).tobytes())
+
+            meta = {"rows": rows + int(keep.sum()), "tz": tz, "interval": interval, "dtypes": self.columns}
+            if extra is not None:
+                meta.update(extra)
+            tmp = os.path.join(path, "meta.json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(path, "meta.json"))
+            return int(keep.sum())
+
+
+def _read_frame(path):
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path, index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=True)
+    frame.columns = [c.strip().title() for c in frame.columns]
+    return frame[COLUMNS].sort_index()
+
+
+if __name__ == "__main__":
+    archive = Archive(os.environ.get("ARCHIVE_DIR", os.path.join(".cache", "ohlcv")))
+    command, symbol, interval = sys.argv[1:4]
+    if command == "import":
+        print(f"{archive.append(symbol, interval, _read_frame(sys.argv[4]))} rows appended")
+    series = archive.series(symbol, interval)
+    if series is None:
+        print(f"No archive for {symbol} {interval}")
+    else:
+        size = sum(os.path.getsize(os.path.join(series.path, f)) for f in os.listdir(series.path))
+        print(f"{symbol} {interval}: {series.rows} rows, {series.first} to {series.last}, {size / 2**20:.1f} MiB")
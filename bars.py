@@ -0,0 +1,228 @@
+# Tick-to-bar aggregation: builds OHLCV bars from raw trades.
+#
+# Trades arrive as three arrays (epoch-ns timestamps, prices, sizes) sorted by
+# time. Each aggregator ingests whole batches with NumPy (no per-trade Python
+# loop) and only carries the single bar that is still open between batches,
+# so memory stays constant however long the stream runs.
+#
+#   TimeBarAggregator  - one bar per fixed time bucket ("1s", "5s", "1m" ...)
+#   VolumeBarAggregator - a bar closes once it has traded `threshold` units
+#   TickBarAggregator  - a bar closes after `n` trades
+#
+# The frames they return use the same columns as yf.download, so app.py can
+# feed them straight into the indicator pipeline.
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Column order of yf.download, which the renaming step in app.py relies on
+COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+
+UNIT_NS = {"s": 10**9, "m": 60 * 10**9, "h": 3600 * 10**9, "d": 86400 * 10**9}
+
+
+def interval_ns(interval):
+    # "15s" -> 15_000_000_000; "1m", "5m", "1h", "1d" as in yf.download
+    unit = interval[-1]
+    if unit not in UNIT_NS or not interval[:-1].isdigit():
+        raise ValueError(f"Unsupported bar interval: {interval}")
+    return int(interval[:-1]) * UNIT_NS[unit]
+
+
+# --------------------- RECORDED TRADES -----------------------
+
+# Epoch unit of a numeric timestamp column by magnitude: dates of this
+# century are ~1.7e9 in s, ~1.7e12 in ms, ~1.7e15 in us and ~1.7e18 in ns.
+# (upper bound, ns per unit), smallest bound first.
+EPOCH_UNITS = [(10**11, 10**9), (10**14, 10**6), (10**17, 10**3), (math.inf, 1)]
+
+
+def _epoch_ns(values):
+    # Epoch timestamps in any of the units above as int64 ns; floats are
+    # scaled before the cast, so fractional seconds are kept
+    if not len(values):
+        return values.astype("int64")
+    magnitude = np.nanmax(np.abs(values))
+    scale = next(ns for bound, ns in EPOCH_UNITS if magnitude < bound)
+    if values.dtype.kind == "f":
+        return np.round(values * scale).astype("int64")
+    return values.astype("int64") * scale
+
+
+def read_trades(source):
+    # CSV with timestamp, price, size columns (timestamp as epoch s/ms/us/ns
+    # or ISO text), or a .npz written by save_trades(); sorted by time, trades
+    # with equal timestamps in file order
+    name = getattr(source, "name", str(source))
+    if name.endswith(".npz"):
+        data = np.load(source)
+        ts, price, size = data["ts"], data["price"], data["size"]
+    else:
+        df = pd.read_csv(source)
+        df.columns = [c.strip().lower() for c in df.columns]
+        ts = df["timestamp"]
+        if ts.dtype.kind in "iuf":
+            ts = _epoch_ns(ts.to_numpy())
+        else:
+            ts = pd.to_datetime(ts, utc=True).to_numpy(dtype="datetime64[ns]").view("int64")
+        price, size = df["price"].to_numpy(dtype="float64"), df["size"].to_numpy(dtype="float64")
+    order = np.argsort(ts, kind="stable")
+    return ts[order], price[order], size[order]
+
+
+def save_trades(path, ts, price, size):
+    np.savez(path, ts=ts, price=price, size=size)
+
+
+# --------------------- AGGREGATION -----------------------
+
+def _reduce(ids, ts, price, size):
+    # OHLCV per run of equal ids (ids are non-decreasing)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+    ends = np.concatenate((starts[1:], [len(ids)])) - 1
+    return {
+        "id": ids[starts],
+        "time": ts[starts],
+        "open": price[starts],
+        "high": np.maximum.reduceat(price, starts),
+        "low": np.minimum.reduceat(price, starts),
+        "close": price[ends],
+        "volume": np.add.reduceat(size, starts),
+        "count": ends - starts + 1,
+        "last": ends,  # index of the group's last trade within the batch
+    }
+
+
+class _Aggregator:
+    def __init__(self):
+        self.open_bar = None  # dict of scalars for the bar still forming
+        self._done = []  # completed bar blocks not yet collected
+
+    def _group_ids(self, ts, size):
+        # Bar id per trade, continuing the numbering of earlier batches
+        raise NotImplementedError
+
+    def _is_complete(self, bars):
+        # Boolean mask of the bars in this batch that are finished
+        raise NotImplementedError
+
+    def _label(self, bars):
+        # Bars are stamped with their first trade unless overridden
+        pass
+
+    def ingest(self, ts, price, size):
+        # Trades must be sorted by time, also across batches
+        ts = np.asarray(ts, dtype="int64")
+        price = np.asarray(price, dtype="float64")
+        size = np.asarray(size, dtype="float64")
+        if not len(ts):
+            return 0
+
+        bars = _reduce(self._group_ids(ts, size), ts, price, size)
+        self._label(bars)
+
+        # Fold the carried open bar into the first group when it continues it
+        carried = self.open_bar
+        if carried is not None:
+            if bars["id"][0] == carried["id"]:
+                bars["time"][0] = carried["time"]
+                bars["open"][0] = carried["open"]
+                bars["high"][0] = max(bars["high"][0], carried["high"])
+                bars["low"][0] = min(bars["low"][0], carried["low"])
+                bars["volume"][0] += carried["volume"]
+                bars["count"][0] += carried["count"]
+            else:
+                self._done.append({k: np.array([v]) for k, v in carried.items()})
+
+        complete = self._is_complete(bars)
+        self.open_bar = None if complete[-1] else {k: v[-1] for k, v in bars.items()}
+        if complete.any():
+            self._done.append({k: v[complete] for k, v in bars.items()})
+        return int(complete.sum())
+
+    def flush(self):
+        # Close the open bar, e.g. at the end of a recorded file
+        if self.open_bar is not None:
+            self._done.append({k: np.array([v]) for k, v in self.open_bar.items()})
+            self.open_bar = None
+
+    def collect(self):
+        # Completed bars since the last call, as a yf.download-style frame
+        if not self._done:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], tz="UTC"), dtype="float64")
+        blocks, self._done = self._done, []
+        merged = {k: np.concatenate([b[k] for b in blocks]) for k in blocks[0]}
+        return pd.DataFrame(
+            {
+                "Close": merged["close"],
+                "High": merged["high"],
+                "Low": merged["low"],
+                "Open": merged["open"],
+                "Volume": merged["volume"],
+            },
+            index=pd.to_datetime(merged["time"], utc=True),
+        )
+
+
+class TimeBarAggregator(_Aggregator):
+    def __init__(self, interval):
+        super().__init__()
+        self.step = interval_ns(interval) if isinstance(interval, str) else int(interval)
+
+    def _group_ids(self, ts, size):
+        return ts // self.step
+
+    def _label(self, bars):
+        # Labelled with the bucket start, like yf.download
+        bars["time"] = bars["id"] * self.step
+
+    def _is_complete(self, bars):
+        # A bucket is finished once a trade from a later bucket has arrived
+        complete = np.ones(len(bars["id"]), dtype=bool)
+        complete[-1] = False
+        return complete
+
+
+class VolumeBarAggregator(_Aggregator):
+    # Bars are cut at every multiple of `threshold` in cumulative volume; the
+    # trade that crosses a boundary closes the bar (a single large trade can
+    # cross several boundaries, the next bar then starts after the last one)
+    def __init__(self, threshold):
+        super().__init__()
+        self.threshold = float(threshold)
+        self.total = 0.0  # volume ingested so far
+        self._cum = None
+
+    def _group_ids(self, ts, size):
+        self._cum = self.total + np.cumsum(size)
+        before = self._cum - size
+        self.total = float(self._cum[-1])
+        return np.floor(before / self.threshold).astype("int64")
+
+    def _is_complete(self, bars):
+        return self._cum[bars["last"]] >= (bars["id"] + 1) * self.threshold
+
+
+class TickBarAggregator(_Aggregator):
+    def __init__(self, n):
+        super().__init__()
+        self.n = int(n)
+        self.total = 0  # trades ingested so far
+
+    def _group_ids(self, ts, size):
+        ids = (self.total + np.arange(len(ts))) // self.n
+        self.total += len(ts)
+        return ids
+
+    def _is_complete(self, bars):
+        return bars["count"] >= self.n
+
+
+def trades_to_bars(ts, price, size, interval):
+    # One-shot conversion of a recorded trade file into time bars
+    agg = TimeBarAggregator(interval)
+    agg.ingest(ts, price, size)
+    agg.flush()
+    return agg.collect()
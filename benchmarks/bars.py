@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# Throughput of the tick-to-bar aggregators in bars.py.
+#
+#   python benchmarks/bars.py                 # 10M synthetic trades
+#   python benchmarks/bars.py trades.csv      # a recorded trade file
+#
+# Trades are fed in batches, the way a live feed or a chunked file reader
+# would deliver them. Target: >= 1M trades/s on one core.
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bars  # noqa: E402
+
+BATCH = 100_000
+
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = 1_700_000_000 * 10**9
+    ts = start + np.sort(rng.integers(0, 86_400 * 10**9, n)).astype("int64")
+    price = 30_000 * np.exp(np.cumsum(rng.normal(0, 1e-5, n)))
+    size = rng.exponential(0.05, n)
+    return ts, price, size
+
+
+def run(name, agg, ts, price, size):
+    start = time.perf_counter()
+    for i in range(0, len(ts), BATCH):
+        agg.ingest(ts[i:i + BATCH], price[i:i + BATCH], size[i:i + BATCH])
+    agg.flush()
+    out = agg.collect()
+    seconds = time.perf_counter() - start
+    rate = len(ts) / seconds / 1e6
+    print(f"{name:<22}{len(out):>10,} bars{seconds * 1000:>10.1f} ms{rate:>10.1f} M trades/s")
+
+
+def main():
+    if len(sys.argv) > 1:
+        start = time.perf_counter()
+        ts, price, size = bars.read_trades(sys.argv[1])
+        print(f"read {len(ts):,} trades in {time.perf_counter() - start:.2f} s")
+    else:
+        ts, price, size = synthetic(10_000_000)
+
+    run("time bars 1s", bars.TimeBarAggregator("1s"), ts, price, size)
+    run("time bars 1m", bars.TimeBarAggregator("1m"), ts, price, size)
+    run("volume bars", bars.VolumeBarAggregator(size.sum() / 5_000), ts, price, size)
+    run("tick bars 1000", bars.TickBarAggregator(1_000), ts, price, size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# Payload size and client-side decode time of the dashboard figure
+# (charts.dashboard_figure) for different encodings of the same frame.
+#
+#   python benchmarks/chart_payload.py            # 50k one-minute bars
+#   python benchmarks/chart_payload.py 200000
+#
+#   json lists      x = ISO strings, y = JSON numbers (plotly < 6)
+#   typed y         x = ISO strings, y = base64 typed arrays
+#   typed y, ms x   x = float64 epoch ms typed array (bars with gaps)
+#   typed y, x0/dx  evenly spaced bars, no x array at all
+#
+# Decode time is measured with node when it is installed: JSON.parse, typed
+# array decoding of every {dtype, bdata} and Date.parse of every ISO string,
+# which is roughly what plotly.js does before drawing.
+
+import base64
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts  # noqa: E402
+
+COLUMNS = [
+    "Price Data_Close", "Price Data_Volume",
+    "Bollinger Bands_Middle", "Bollinger Bands_High", "Bollinger Bands_Low",
+    "Indicators_ADI", "Indicators_RSI",
+    "MACD_MACD Line", "MACD_Signal Line", "MACD_Histogram",
+]
+
+DECODE_JS = r"""
+const fs = require("fs");
+const text = fs.readFileSync(process.argv[2], "utf8");
+const runs = 5;
+let best = Infinity;
+for (let r = 0; r < runs; r++) {
+  const start = process.hrtime.bigint();
+  const fig = JSON.parse(text);
+  for (const trace of fig.data) {
+    for (const key of ["x", "y"]) {
+      const v = trace[key];
+      if (v && v.bdata) {
+        const buf = Buffer.from(v.bdata, "base64");
+        const Ctor = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array, i1: Int8Array}[v.dtype];
+        trace[key] = new Ctor(buf.buffer, buf.byteOffset, buf.length / Ctor.BYTES_PER_ELEMENT);
+      } else if (Array.isArray(v) && typeof v[0] === "string") {
+        trace[key] = v.map(Date.parse);
+      }
+    }
+  }
+  best = Math.min(best, Number(process.hrtime.bigint() - start) / 1e6);
+}
+console.log(best.toFixed(1));
+"""
+
+
+def frame(n, gaps, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=n, freq="min", tz="UTC")
+    if gaps:
+        index = index.delete(rng.choice(n, n // 1000, replace=False))
+    values = rng.normal(100, 10, (len(index), len(COLUMNS)))
+    return pd.DataFrame(values, index=index, columns=COLUMNS)
+
+
+def iso_x(fig, index):
+    # x as the ISO strings a DatetimeIndex is serialized to
+    x = [t.isoformat() for t in index]
+    for trace in fig.data:
+        trace.x0, trace.dx = None, None
+        trace.x = x
+    return fig
+
+
+def to_json_lists(fig):
+    # Serialization of plotly < 6: every array as JSON text
+    from plotly.utils import PlotlyJSONEncoder
+
+    spec = fig.to_plotly_json()
+    for trace in spec["data"]:
+        for key in ("x", "y"):
+            value = trace.get(key)
+            if isinstance(value, dict) and "bdata" in value:
+                trace[key] = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).tolist()
+    return json.dumps(spec, cls=PlotlyJSONEncoder)
+
+
+def decode_ms(payload):
+    node = shutil.which("node")
+    if node is None:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "decode.js")
+        data = os.path.join(tmp, "figure.json")
+        with open(script, "w") as f:
+            f.write(DECODE_JS)
+        with open(data, "w") as f:
+            f.write(payload)
+        out = subprocess.run([node, script, data], capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def report(name, fig, encoder=None):
+    start = time.perf_counter()
+    payload = encoder(fig) if encoder is not None else fig.to_json()
+    encode = (time.perf_counter() - start) * 1000
+    decode = decode_ms(payload)
+    decode = f"{decode:>10.1f} ms" if decode is not None else f"{'n/a':>13}"
+    print(f"{name:<18}{len(payload) / 2**20:>9.2f} MiB{encode:>10.1f} ms{decode}")
+    return len(payload)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    even = frame(n, gaps=False)
+    uneven = frame(n, gaps=True)
+
+    print(f"{n:,} bars, {len(COLUMNS)} traces")
+    print(f"{'encoding':<18}{'payload':>13}{'encode':>13}{'decode':>13}")
+    base = report("json lists", iso_x(charts.dashboard_figure(uneven), uneven.index), to_json_lists)
+    typed = report("typed y", iso_x(charts.dashboard_figure(uneven), uneven.index))
+    ms = report("typed y, ms x", charts.dashboard_figure(uneven))
+    x0 = report("typed y, x0/dx", charts.dashboard_figure(even))
+    print(f"payload vs json lists: {base / typed:.1f}x, {base / ms:.1f}x, {base / x0:.1f}x smaller")
+
+    # The encoded y values decode to exactly the frame's values
+    fig = json.loads(charts.dashboard_figure(uneven).to_json())
+    y = np.frombuffer(base64.b64decode(fig["data"][0]["y"]["bdata"]), dtype=fig["data"][0]["y"]["dtype"])
+    assert np.array_equal(y, uneven["Price Data_Close"].to_numpy())
+
+
+if __name__ == "__main__":
+    main()
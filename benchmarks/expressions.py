@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# Evaluation time of sidebar formulas (expressions.py).
+#
+#   python benchmarks/expressions.py            # 1M one-minute bars
+#   python benchmarks/expressions.py 5000000
+#
+# "cold" computes the windowed terms (EMA, SMA, std ...) in a new graph,
+# "warm" reuses them, as a rerun with unchanged prices does; the warm time
+# is the NumPy arithmetic alone. Each formula is checked against the same
+# formula written with pandas operators.
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expressions  # noqa: E402
+import indicators  # noqa: E402
+
+FORMULAS = {
+    "ema(close, 12) - ema(close, 26)":
+        lambda d: d.Close.ewm(span=12, min_periods=12, adjust=False).mean()
+        - d.Close.ewm(span=26, min_periods=26, adjust=False).mean(),
+    "(close - sma(close, 20)) / std(close, 20)":
+        lambda d: (d.Close - d.Close.rolling(20).mean()) / d.Close.rolling(20).std(ddof=0),
+    # 10 terms
+    "(close - sma(close, 20)) / std(close, 20) + 2 * (high - low) / close - abs(close - open) / (high - low)"
+    " + returns(close) * 100 - diff(close) / 2 + log(close) * 3 + sqrt(volume) - max(open, close) / low":
+        lambda d: (d.Close - d.Close.rolling(20).mean()) / d.Close.rolling(20).std(ddof=0)
+        + 2 * (d.High - d.Low) / d.Close - (d.Close - d.Open).abs() / (d.High - d.Low)
+        + d.Close.pct_change() * 100 - d.Close.diff() / 2 + np.log(d.Close) * 3
+        + np.sqrt(d.Volume) - np.fmax(d.Open, d.Close) / d.Low,
+}
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n, freq="min", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    spread = rng.uniform(0, 0.5, n)
+    return pd.DataFrame({
+        "Open": np.r_[close[0], close[:-1]],
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.exponential(10, n),
+    }, index=index)
+
+
+def best_ms(fn, runs=5):
+    best = np.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = frame(n)
+    print(f"{n:,} bars")
+    print(f"{'steps':>6}{'compile':>12}{'cold':>12}{'warm':>12}{'pandas':>12}  formula")
+    for text, reference in FORMULAS.items():
+        expressions.compile_formula.cache_clear()
+        start = time.perf_counter()
+        expression = expressions.compile_formula(text)
+        compile_us = (time.perf_counter() - start) * 1e6
+
+        cold = best_ms(lambda: expression(indicators.Graph(df)))
+        graph = indicators.Graph(df)
+        values = expression(graph)
+        warm = best_ms(lambda: expression(graph))
+        pandas = best_ms(lambda: reference(df))
+
+        expected = reference(df)
+        assert np.allclose(values, expected, equal_nan=True, rtol=1e-12, atol=0)
+        label = text if len(text) < 60 else text[:57] + "..."
+        print(f"{len(expression.program):>6}{compile_us:>9.0f} us{cold:>9.1f} ms{warm:>9.1f} ms{pandas:>9.1f} ms  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# Feature matrices (features.py) against ta's add_all_ta_features().
+#
+#   python benchmarks/features.py             # 500 symbols x 1260 daily bars
+#   python benchmarks/features.py 100 2520
+#
+# One symbol is run through both and every feature compared (values and NaN
+# layout, on a RangeIndex as in benchmarks/kernels.py); ta on the whole
+# universe is extrapolated from that symbol. The universe has symbols listed
+# at different dates, and a few of them are checked against features.frame()
+# on their own history.
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import features  # noqa: E402
+
+
+def universe(symbols, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=bars, freq="B")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (bars, symbols)), axis=0))
+    spread = rng.uniform(0.1, 2, (bars, symbols))
+    ohlcv = {
+        "Open": np.vstack([close[:1], close[:-1]]),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.uniform(1e5, 1e6, (bars, symbols)),
+    }
+    listed = rng.integers(0, bars // 4, symbols)
+    listed[0] = 0
+    for values in ohlcv.values():
+        values[np.arange(bars)[:, None] < listed] = np.nan
+    columns = [f"S{i}" for i in range(symbols)]
+    return {field: pd.DataFrame(v, index=index, columns=columns) for field, v in ohlcv.items()}, listed
+
+
+def single(ohlcv, column, start=0):
+    return pd.DataFrame({field: ohlcv[field][column] for field in ohlcv}).iloc[start:]
+
+
+def worst(a, b):
+    # Largest error relative to max(1, |b|), and whether the NaN layouts match
+    both = ~np.isnan(a) & ~np.isnan(b)
+    error = np.abs(a[both] - b[both]) / np.maximum(1, np.abs(b[both]))
+    return (error.max() if error.size else 0.0), bool((np.isnan(a) == np.isnan(b)).all())
+
+
+def main():
+    from ta import add_all_ta_features
+
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 1260
+    ohlcv, listed = universe(symbols, bars)
+    df = single(ohlcv, "S0").reset_index(drop=True)  # see PSAR in benchmarks/kernels.py
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        start = time.perf_counter()
+        reference = add_all_ta_features(df.copy(), "Open", "High", "Low", "Close", "Volume")
+        ta_s = time.perf_counter() - start
+    features.frame(df.iloc[:100])  # compiles the kernels
+    start = time.perf_counter()
+    ours = features.frame(df, dtype="float64")
+    ours_s = time.perf_counter() - start
+    print(f"one symbol, {bars} bars: ta {ta_s * 1000:.0f} ms, features {ours_s * 1000:.0f} ms")
+    for name in ours.columns:
+        error, layout = worst(ours[name].to_numpy(), reference[name].to_numpy(dtype="float64"))
+        assert layout and error < 1e-9, (name, error, layout)
+    skipped = [c for c in reference.columns[len(df.columns):] if c not in ours.columns]
+    print(f"  {len(ours.columns)} features match ta; not computed: {', '.join(skipped)}")
+
+    start = time.perf_counter()
+    values, names = features.stack(ohlcv)
+    stack_s = time.perf_counter() - start
+    print(f"{symbols} symbols: stack {stack_s:.2f} s, ta ~{ta_s * symbols:.0f} s; "
+          f"{values.shape} {values.dtype}, {values.nbytes / 2**20:.0f} MiB")
+    for j in np.argsort(listed)[-3:]:
+        column = f"S{j}"
+        alone = features.frame(single(ohlcv, column, listed[j]), dtype="float64").to_numpy()
+        error, layout = worst(values[listed[j]:, j, :].astype("float64"), alone)
+        assert layout and error < 1e-5, (column, error, layout)
+        assert np.isnan(values[:listed[j], j, :]).all()
+    print("  late listings match their own history")
+
+
+if __name__ == "__main__":
+    main()
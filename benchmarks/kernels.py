@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# Path-dependent kernels (kernels.py) per backend.
+#
+#   python benchmarks/kernels.py             # 1M one-minute bars
+#   python benchmarks/kernels.py 5000000
+#
+# Every kernel runs on each available backend (Numba when installed, the
+# Python fallback always); outputs must be identical across backends. PSAR
+# is also checked against ta's PSARIndicator on the first 20,000 bars, with
+# a RangeIndex: ta writes one of its branches by label, which on a
+# DatetimeIndex appends rows instead of setting the bar.
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicators  # noqa: E402
+import kernels  # noqa: E402
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    spread = rng.uniform(0, 0.5, n)
+    return pd.DataFrame({"High": close + spread, "Low": close - spread, "Close": close})
+
+
+def calls(df):
+    atr = indicators._atr(indicators.Graph(df))["ATR"]
+    return {
+        "psar": lambda backend: kernels.psar(df.High, df.Low, df.Close, backend=backend),
+        "supertrend": lambda backend: kernels.supertrend(df.High, df.Low, df.Close, atr, backend=backend),
+        "trailing_stop": lambda backend: kernels.trailing_stop(df.Close, atr, backend=backend),
+        "renko": lambda backend: kernels.renko(df.Close, 0.5, backend=backend),
+    }
+
+
+def best_ms(fn, runs=3):
+    best = np.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    from ta.trend import PSARIndicator
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = frame(n)
+    backends = list(kernels.backends())
+    print(f"{n:,} bars, default backend {kernels.default_backend()}")
+    print(f"{'kernel':<15}" + "".join(f"{b:>12}" for b in backends) + f"{'speedup':>10}")
+    for name, call in calls(df).items():
+        results = {b: call(b) for b in backends}  # also compiles
+        times = {b: best_ms(lambda: call(b)) for b in backends}
+        for b in backends[1:]:
+            for output, values in results[b].items():
+                assert np.array_equal(values.to_numpy(), results[backends[0]][output].to_numpy(),
+                                      equal_nan=True), (name, b, output)
+        speedup = f"{times['python'] / times['numba']:>9.0f}x" if "numba" in times else ""
+        print(f"{name:<15}" + "".join(f"{times[b]:>9.1f} ms" for b in backends) + speedup)
+
+    head = df.iloc[:20_000]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        start = time.perf_counter()
+        reference = PSARIndicator(head.High, head.Low, head.Close)
+        ta_ms = (time.perf_counter() - start) * 1000
+    for b in backends:
+        ours = kernels.psar(head.High, head.Low, head.Close, backend=b)
+        for output in ("psar", "psar_up", "psar_down"):
+            expected = getattr(reference, output)().to_numpy()
+            assert np.allclose(ours[output], expected, equal_nan=True, rtol=0, atol=1e-12), (b, output)
+    print(f"PSAR matches ta on {len(head):,} bars (ta {ta_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# Fanning OHLCV out to a process pool: pickled DataFrames vs shared-memory
+# handles (shared.py).
+#
+#   python benchmarks/shared.py                # 64 symbols x 200,000 1m bars
+#   python benchmarks/shared.py 128 500000
+#
+# Each task screens one symbol (last RSI(14) and the 20-bar return). With
+# pickling every task copies its frame through a pipe; with handles the
+# frames are published once (timed separately) and each task gets a few
+# hundred bytes. Both must give the same results. Tasks are run several
+# times over, as a sweep would, so each symbol is sent more than once.
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicators  # noqa: E402
+import shared  # noqa: E402
+
+ROUNDS = 4
+
+
+def frame(n, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n, freq="min", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    spread = rng.uniform(0, 0.5, n)
+    return pd.DataFrame({
+        "Close": close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Open": np.r_[close[0], close[:-1]],
+        "Volume": rng.exponential(10, n),
+    }, index=index)
+
+
+def screen(df):
+    close = df["Close"]
+    return float(indicators.rsi(close)["RSI"].iloc[-1]), float(close.iloc[-1] / close.iloc[-21] - 1)
+
+
+def screen_shared(handle):
+    return screen(shared.attach(handle))
+
+
+def run(function, items, workers):
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(function, items * ROUNDS))
+    return time.perf_counter() - start, results
+
+
+def main():
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    bars = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    frames = [frame(bars, seed) for seed in range(symbols)]
+    size = sum(df.memory_usage().sum() for df in frames) / 2**20
+    print(f"{symbols} symbols x {bars:,} bars ({size:.0f} MiB), {ROUNDS} rounds, {os.cpu_count()} CPUs")
+
+    with shared.Registry() as registry:
+        start = time.perf_counter()
+        handles = [registry.publish(("ohlcv", i), df) for i, df in enumerate(frames)]
+        print(f"publish {(time.perf_counter() - start) * 1000:.0f} ms, {registry.nbytes / 2**20:.0f} MiB shared")
+
+        print(f"{'workers':>8}{'pickled':>12}{'shared':>12}{'speedup':>10}")
+        for workers in sorted({1, 2, 4, 8, 16, os.cpu_count()}):
+            if workers > os.cpu_count():
+                continue
+            pickled_s, expected = run(screen, frames, workers)
+            shared_s, results = run(screen_shared, handles, workers)
+            assert results == expected
+            print(f"{workers:>8}{pickled_s:>10.2f} s{shared_s:>10.2f} s{pickled_s / shared_s:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# Cold-start import profile for app.py.
+#
+# Every module the dashboard imports is loaded in a fresh interpreter with
+# `python -X importtime`, so each number is a true cold import (no shared
+# module cache between measurements).
+#
+#   python benchmarks/startup.py            # table of cumulative import times
+#   python benchmarks/startup.py --raw yfinance   # full -X importtime tree
+#
+# It also imports the repository modules app.py loads at the top and fails
+# if any of them pulls in a module kept off the first paint (Numba, which
+# kernels.py imports on the first overlay).
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules needed before the first element is sent to the browser
+FIRST_PAINT = ["streamlit", "pandas"]
+
+# Modules app.py loads lazily, in the section that renders them
+DEFERRED = [
+    "yfinance",
+    "ta",
+    "plotly.graph_objects",
+    "feedparser",
+    "PIL.Image",
+    "streamlit_drawable_canvas",
+]
+
+# Repository modules app.py imports at the top, and modules none of them may
+# load
+APP_MODULES = ["charts", "expressions", "fetch", "frames", "indicators", "perf", "data"]
+KEPT_OUT = ["numba", "kernels"]
+
+
+def import_time(module):
+    # Returns the cumulative import time of `module` in microseconds, or None
+    # if it is not installed
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return None, proc.stderr
+
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        name = parts[2].rstrip()
+        try:
+            cumulative = int(parts[1])
+        except ValueError:  # header line
+            continue
+        # Top-level entries (no indentation) add up to the total cost
+        if not name.startswith("  "):
+            total += cumulative
+    return total, proc.stderr
+
+
+def loaded_eagerly():
+    # Modules of KEPT_OUT loaded by importing APP_MODULES in a fresh
+    # interpreter
+    code = (f"import sys; sys.path.insert(0, {ROOT!r}); import {', '.join(APP_MODULES)}; "
+            f"print(' '.join(m for m in {KEPT_OUT!r} if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "--raw":
+        _, stderr = import_time(sys.argv[2])
+        print(stderr)
+        return
+
+    print(f"{'module':<30}{'cold import (ms)':>18}")
+    print("-" * 48)
+
+    totals = {}
+    for group, modules in (("first paint", FIRST_PAINT), ("deferred", DEFERRED)):
+        totals[group] = 0
+        for module in modules:
+            us, _ = import_time(module)
+            if us is None:
+                print(f"{module:<30}{'not installed':>18}")
+                continue
+            totals[group] += us
+            print(f"{module:<30}{us / 1000:>18.1f}")
+        print(f"{'  = ' + group:<30}{totals[group] / 1000:>18.1f}")
+        print()
+
+    # Modules share dependencies (numpy, pandas ...), so the sum over separate
+    # interpreters overstates the eager cost; it is an upper bound.
+    print(f"time before first paint (ms):   {totals['first paint'] / 1000:.1f}")
+    print(f"deferred to section render (ms): <= {totals['deferred'] / 1000:.1f}")
+
+    eager = loaded_eagerly()
+    assert not eager, f"first paint imports {', '.join(eager)}"
+    print(f"first paint does not import {', '.join(KEPT_OUT)}")
+
+
+if __name__ == "__main__":
+    main()
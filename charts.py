@@ -0,0 +1,198 @@
+# The dashboard chart: one figure with shared-x subplots, so each column is
+# sent to the browser once and zooming one panel zooms them all.
+#
+# Panels are rows of that figure. Selecting a single panel gives the old
+# standalone chart (volume, ADI, RSI, MACD) from the same builder, and only
+# the columns of the selected panels are serialized.
+#
+# Payload: y values are passed as NumPy arrays, which plotly >= 6 sends as
+# base64 typed arrays instead of JSON number text. x is not the index (ISO
+# strings per point per trace) but epoch milliseconds of the wall-clock
+# times on a date axis, or just x0/dx when the bars are evenly spaced.
+# Measured with benchmarks/chart_payload.py.
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+# Panel -> relative row height
+PANELS = {
+    "Price & Bollinger Bands": 4,
+    "Volume": 1.5,
+    "ADI": 1.5,
+    "ATR": 1.5,
+    "RSI": 1.5,
+    "MACD": 2,
+    "Custom": 1.5,
+}
+
+
+def time_axis(index):
+    # Trace x arguments for index. Plotly draws dates without a time zone,
+    # so tz-aware times are sent as their local wall-clock time, as the ISO
+    # strings were displayed.
+    if not isinstance(index, pd.DatetimeIndex):
+        return {"x": index}
+    wall = index.tz_localize(None) if index.tz is not None else index
+    ms = wall.as_unit("ms").asi8.astype("float64")  # plotly.js has no int64 arrays
+    if len(ms) > 2:
+        steps = np.diff(ms)
+        if (steps == steps[0]).all():
+            return {"x0": ms[0], "dx": steps[0]}
+    return {"x": ms}
+
+
+def trace_specs(df, panels):
+    # (panel, column, trace type, style) for every trace, in figure order
+    specs = []
+    for panel in panels:
+        if panel == "Price & Bollinger Bands":
+            if "Price Data_Close min" in df.columns:
+                # Downsampled frame (pyramid.py): shade the range each point covers
+                specs.append((panel, "Price Data_Close max", "scatter",
+                              dict(name="Close range", line=dict(width=0), showlegend=False)))
+                specs.append((panel, "Price Data_Close min", "scatter",
+                              dict(name="Close range", line=dict(width=0), fill="tonexty",
+                                   fillcolor="rgba(0, 0, 255, 0.15)")))
+            specs.append((panel, "Price Data_Close", "scatter", dict(name="Close", line=dict(color="blue"))))
+            for band, color in (("Middle", "orange"), ("High", "green"), ("Low", "red")):
+                specs.append((panel, f"Bollinger Bands_{band}", "scatter",
+                              dict(name=f"Bollinger {band}", line=dict(color=color))))
+            specs.append((panel, "Moving Averages_SMA", "scatter", dict(name="SMA", line=dict(color="teal"))))
+            specs.append((panel, "Moving Averages_EMA", "scatter", dict(name="EMA", line=dict(color="magenta"))))
+            for side, color in (("Up", "green"), ("Down", "red")):
+                specs.append((panel, f"Parabolic SAR_{side}", "markers",
+                              dict(name=f"PSAR {side.lower()}", marker=dict(color=color, size=3))))
+                specs.append((panel, f"SuperTrend_{side}", "scatter",
+                              dict(name=f"SuperTrend {side.lower()}", line=dict(color=color, width=1))))
+            specs.append((panel, "Trailing Stop_Stop", "scatter",
+                          dict(name="Trailing stop", line=dict(color="black", dash="dash", width=1))))
+            specs.append((panel, "Renko_Level", "scatter",
+                          dict(name="Renko", line=dict(color="slategray", shape="hv"))))
+            for col in df.columns:
+                if col.startswith("MTF_Bollinger"):
+                    specs.append((panel, col, "scatter",
+                                  dict(name=col[len("MTF_"):], line=dict(color="gray", dash="dot", shape="hv"))))
+
+        elif panel == "Volume":
+            specs.append((panel, "Price Data_Volume", "bar", dict(name="Volume", marker_color="gray", opacity=0.6)))
+
+        elif panel == "ADI":
+            specs.append((panel, "Indicators_ADI", "scatter", dict(name="ADI", line=dict(color="purple"))))
+
+        elif panel == "ATR":
+            specs.append((panel, "Indicators_ATR", "scatter", dict(name="ATR", line=dict(color="darkcyan"))))
+
+        elif panel == "RSI":
+            specs.append((panel, "Indicators_RSI", "scatter", dict(name="RSI", line=dict(color="brown"))))
+            for col in df.columns:
+                if col.startswith("MTF_RSI"):
+                    specs.append((panel, col, "scatter",
+                                  dict(name=col[len("MTF_"):], line=dict(color="brown", dash="dash", shape="hv"))))
+
+        elif panel == "MACD":
+            specs.append((panel, "MACD_MACD Line", "scatter", dict(name="MACD Line", line=dict(color="blue"))))
+            specs.append((panel, "MACD_Signal Line", "scatter", dict(name="Signal Line", line=dict(color="orange"))))
+            specs.append((panel, "MACD_Histogram", "bar",
+                          dict(name="MACD Histogram", marker_color="green", opacity=0.5)))
+
+        elif panel == "Custom":
+            # Formulas typed in the sidebar (expressions.py)
+            for col in df.columns:
+                if col.startswith("Custom_"):
+                    specs.append((panel, col, "scatter", dict(name=col[len("Custom_"):])))
+    # Indicators switched off in the sidebar have no columns
+    return [spec for spec in specs if spec[1] in df.columns]
+
+
+def available_panels(df):
+    # Panels with at least one column in df
+    return list(dict.fromkeys(panel for panel, _, _, _ in trace_specs(df, PANELS)))
+
+
+def dashboard_figure(df, panels=None):
+    # df carries the flat column names of the renaming step in app.py
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    panels = [p for p in PANELS if panels is None or p in panels]
+    fig = make_subplots(
+        rows=len(panels),
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        row_heights=[PANELS[p] for p in panels],
+        subplot_titles=panels,
+    )
+    xs = time_axis(df.index)
+    rows = {panel: row for row, panel in enumerate(panels, start=1)}
+
+    for panel, column, kind, style in trace_specs(df, panels):
+        if kind == "bar":
+            trace = go.Bar(**xs, y=df[column].to_numpy(), **style)
+        elif kind == "markers":
+            trace = go.Scatter(**xs, y=df[column].to_numpy(), mode="markers", **style)
+        else:
+            trace = go.Scatter(**xs, y=df[column].to_numpy(), mode="lines", **style)
+        fig.add_trace(trace, row=rows[panel], col=1)
+
+    if "Price & Bollinger Bands" in rows:
+        fig.update_yaxes(title_text="Price", row=rows["Price & Bollinger Bands"], col=1)
+    if "RSI" in rows:
+        row = rows["RSI"]
+        fig.add_hline(y=indicators.RSI_OVERBOUGHT, line_dash="dot", line_color="red",
+                      annotation_text=f"Overbought ({indicators.RSI_OVERBOUGHT})",
+                      annotation_position="top right", row=row, col=1)
+        fig.add_hline(y=indicators.RSI_OVERSOLD, line_dash="dot", line_color="green",
+                      annotation_text=f"Oversold ({indicators.RSI_OVERSOLD})",
+                      annotation_position="bottom right", row=row, col=1)
+        fig.update_yaxes(range=[0, 100], row=row, col=1)
+
+    fig.update_xaxes(type="date", rangeslider_visible=False)
+    fig.update_layout(
+        height=int(200 + 110 * sum(PANELS[p] for p in panels)),
+        width=1000,
+        bargap=0,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    )
+    return fig
+
+
+def index_version(index):
+    # Changes whenever the x values of the figure would
+    return len(index), int(pd.util.hash_array(index.asi8 if isinstance(index, pd.DatetimeIndex)
+                                              else np.asarray(index)).sum())
+
+
+class FigureCache:
+    # The last dashboard figure of a session. A rerun with the same bars and
+    # traces reuses it; only traces whose column changed (a parameter slider
+    # moved, the last bar was revised) get their y array replaced. Layout,
+    # axes, hlines and the other traces are left as they are.
+    def __init__(self):
+        self._key = None
+        self._figure = None
+        self._sources = []  # per trace: (column, values it was built from)
+        self.patched = None  # traces replaced by the last call; None = rebuilt
+
+    def figure(self, df, panels):
+        panels = [p for p in PANELS if p in panels]
+        columns = [column for _, column, _, _ in trace_specs(df, panels)]
+        key = (index_version(df.index), tuple(panels), tuple(columns))
+        if key != self._key:
+            self._figure = dashboard_figure(df, panels)
+            self._sources = [(c, df[c].to_numpy()) for c in columns]
+            self._key = key
+            self.patched = None
+            return self._figure
+
+        self.patched = 0
+        with self._figure.batch_update():
+            for i, (column, old) in enumerate(self._sources):
+                new = df[column].to_numpy()
+                if new.dtype != old.dtype or not np.array_equal(old, new, equal_nan=True):
+                    self._figure.data[i].y = new
+                    self._sources[i] = (column, new)
+                    self.patched += 1
+        return self._figure
@@ -0,0 +1,274 @@
+# Market data layer shared by the dashboard pages.
+#
+# Every page fetches OHLCV through these functions so they share one cache
+# per server process. Requests go to the cheapest provider that can serve
+# them (providers.py); remote providers carry their own rate limiter and
+# circuit breaker (fetch.py). When the provider is degraded the last good
+# copy of a request is served and marked with df.attrs["stale_seconds"].
+#
+# Cache misses are not downloaded one symbol at a time. They are queued for
+# BATCH_WINDOW seconds, so that concurrent requests from watchlists,
+# screeners and other sessions for the same period/interval end up in one
+# group, and each group is fetched with one download_many request per
+# provider.max_batch symbols. The split results populate the cache.
+#
+# Before a fresh frame is cached its timestamps are checked against the
+# market calendar (gaps.py). Missing ranges are re-requested from the same
+# provider, one request per range and at most BACKFILL_MAX_REQUESTS per
+# frame; ranges that came back empty are not asked for again. The resulting
+# report is left in df.attrs["completeness"].
+#
+# Remote downloads are then appended to the memory-mapped archive
+# (providers.get_archive()), minus the bar that is still forming, so long intraday
+# histories build up locally and later requests are sliced from disk. The
+# default-parameter indicators of each archived series are extended at the
+# same time (materialize.py) and served by get_indicators().
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+import pandas as pd
+
+import fetch
+import gaps
+import materialize
+import perf
+import providers
+
+logger = logging.getLogger("crypto_app.data")
+
+CACHE_TTL = 60  # seconds a download is considered fresh
+BATCH_WINDOW = 0.02  # seconds a miss waits for others to join its group
+BACKFILL_MAX_REQUESTS = 4  # backfill requests per downloaded frame
+BACKFILL_MERGE_BARS = 30  # gaps closer than this many bars share a request
+
+_cache = fetch.ResponseCache(ttl=CACHE_TTL, max_entries=2048)
+_backfilled = set()  # (symbol, interval, start, end) ranges already requested
+_indicators = None  # materialize.IndicatorStore, opened with the archive
+_indicators_lock = threading.Lock()
+
+
+def _cache_key(symbol, request):
+    return (symbol, *request)
+
+
+# --------------------- REQUEST BATCHING -----------------------
+
+class _Batcher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (provider name, request) -> {symbol: Future}
+
+    def submit(self, provider, symbols, request):
+        # Returns {symbol: Future}. The first caller of a group waits for the
+        # window to close and then downloads the group for everyone.
+        group = (provider.name, request)
+        with self._lock:
+            batch = self._pending.get(group)
+            leader = batch is None
+            if leader:
+                batch = self._pending[group] = {}
+            futures = {s: batch.setdefault(s, Future()) for s in symbols}
+
+        if leader:
+            error = None
+            try:
+                time.sleep(BATCH_WINDOW)
+                with self._lock:
+                    batch = self._pending.pop(group)
+                self._run(provider, request, batch)
+            except Exception as e:
+                logger.exception("batch %s %s failed", provider.name, request)
+                error = e
+            finally:
+                # Whatever happened, no one waiting on the group may hang,
+                # and the next request starts a new batch
+                with self._lock:
+                    if self._pending.get(group) is batch:
+                        del self._pending[group]
+                for symbol, future in batch.items():
+                    if not future.done():
+                        future.set_exception(error or fetch.NoDataError(f"No data returned for {symbol}"))
+        return futures
+
+    def _run(self, provider, request, batch):
+        symbols = list(batch)
+        for i in range(0, len(symbols), provider.max_batch):
+            chunk = symbols[i:i + provider.max_batch]
+            perf.registry.inc("crypto_app_provider_requests_total", [("provider", provider.name)])
+            try:
+                frames, errors = fetch.call(
+                    lambda: provider.download_many(chunk, *request),
+                    limiter=provider.limiter,
+                    breaker=provider.breaker,
+                )
+            except Exception as e:
+                for symbol in chunk:
+                    batch[symbol].set_exception(e)
+                continue
+            for symbol, frame in frames.items():
+                frame = _backfill(provider, symbol, request[1], frame)
+                if provider.cost > 0:
+                    _archive(symbol, request[1], frame)
+                _cache.put(_cache_key(symbol, request), frame)
+                batch[symbol].set_result(frame)
+            for symbol, error in errors.items():
+                if isinstance(error, fetch.TransientError):
+                    error = fetch.ProviderUnavailable(str(error))
+                batch[symbol].set_exception(error)
+
+
+_batcher = _Batcher()
+
+
+# --------------------- GAP BACKFILL -----------------------
+
+def _backfill(provider, symbol, interval, frame):
+    report = gaps.completeness(symbol, frame, interval)
+    if report is None:
+        return frame
+    if report["missing"]:
+        step = pd.Timedelta(gaps.INTERVALS[interval])
+        ranges = gaps.merge_ranges(report["gaps"], step * BACKFILL_MERGE_BARS)
+        ranges = [r for r in ranges if (symbol, interval, r[0], r[1]) not in _backfilled]
+        # Largest holes first, the rest wait for the next download
+        ranges.sort(key=lambda r: r[2], reverse=True)
+        parts = []
+        for start, end, _ in ranges[:BACKFILL_MAX_REQUESTS]:
+            if not provider.can_serve(symbol, "Custom Dates", interval, start, end):
+                continue
+            _backfilled.add((symbol, interval, start, end))
+            perf.registry.inc("crypto_app_backfill_requests_total", [("provider", provider.name)])
+            try:
+                part = fetch.call(
+                    lambda: provider.download(symbol, "Custom Dates", interval, start, end),
+                    limiter=provider.limiter,
+                    breaker=provider.breaker,
+                    attempts=2,
+                )
+            except fetch.FetchError:
+                continue
+            if part.index.tz != frame.index.tz and part.index.tz is not None:
+                part.index = part.index.tz_convert(frame.index.tz)
+            parts.append(part[(part.index >= start) & (part.index < end)])
+        parts = [p for p in parts if not p.empty]
+        if parts:
+            frame = pd.concat([frame, *parts])
+            frame = frame[~frame.index.duplicated(keep="first")].sort_index()
+            report = gaps.completeness(symbol, frame, interval)
+        if len(_backfilled) > 100_000:
+            _backfilled.clear()
+    frame.attrs["completeness"] = report
+    return frame
+
+
+def _indicator_store():
+    # IndicatorStore over the provider archive, or None when it is turned off
+    global _indicators
+    store = providers.get_archive()
+    if _indicators is None and store is not None:
+        with _indicators_lock:
+            if _indicators is None:
+                _indicators = materialize.IndicatorStore(store)
+    return _indicators
+
+
+def _archive(symbol, interval, frame):
+    store = providers.get_archive()
+    if store is None or interval not in gaps.INTERVALS or frame.empty:
+        return
+    # A naive index is UTC, as the archive stores it (yfinance daily bars)
+    times = frame.index if frame.index.tz is not None else frame.index.tz_localize("UTC")
+    closed = times + pd.Timedelta(gaps.INTERVALS[interval]) <= pd.Timestamp.now(tz="UTC")
+    try:
+        store.append(symbol, interval, frame[closed])
+        _indicator_store().update(symbol, interval)
+    except OSError as e:
+        logger.warning("could not archive %s %s: %s", symbol, interval, e)
+
+
+# --------------------- PUBLIC API -----------------------
+
+def get_many(symbols, period, interval, start_date=None, end_date=None):
+    # Returns ({symbol: frame}, {symbol: FetchError}); every frame is a
+    # private copy, callers may add columns to it
+    if period != "Custom Dates":
+        start_date = end_date = None
+    request = (period, interval, start_date, end_date)
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))
+
+    frames, errors, misses = {}, {}, []
+    for symbol in symbols:
+        perf.cache_call("get_data")
+        df, _ = _cache.get(_cache_key(symbol, request))
+        if df is None:
+            perf.cache_miss("get_data")
+            misses.append(symbol)
+        else:
+            frames[symbol] = df
+
+    # Group the misses by the provider that will serve them
+    groups = {}
+    for symbol in misses:
+        try:
+            provider = providers.select_provider(symbol, *request, n_symbols=len(misses))
+        except fetch.FetchError as e:
+            errors[symbol] = e
+            continue
+        groups.setdefault(provider, []).append(symbol)
+
+    futures = {}
+    for provider, group in groups.items():
+        futures.update(_batcher.submit(provider, group, request))
+
+    for symbol, future in futures.items():
+        try:
+            frames[symbol] = future.result()
+        except fetch.ProviderUnavailable as e:
+            stale, age = _cache.get(_cache_key(symbol, request), allow_stale=True)
+            if stale is None:
+                errors[symbol] = e
+                continue
+            perf.registry.inc("crypto_app_stale_served_total")
+            stale = stale.copy()
+            stale.attrs["stale_seconds"] = age
+            frames[symbol] = stale
+        except fetch.FetchError as e:
+            errors[symbol] = e
+
+    return {s: frames[s].copy() for s in symbols if s in frames}, errors
+
+
+def get_data(symbol, period, interval, start_date=None, end_date=None):
+    frames, errors = get_many([symbol], period, interval, start_date, end_date)
+    symbol = symbol.upper()
+    if symbol in errors:
+        raise errors[symbol]
+    return frames[symbol]
+
+
+def get_closes(symbols, period, interval, start_date=None, end_date=None):
+    # Close prices of several symbols, one column each, on their own calendars
+    # (see analytics.align_prices). Symbols without data are left out.
+    frames, _ = get_many(symbols, period, interval, start_date, end_date)
+    return {symbol: df["Close"] for symbol, df in frames.items()}
+
+
+def get_indicators(symbol, interval, df):
+    # Materialized default-parameter indicator columns for df (cleaned bars
+    # from get_data), or None when they have to be computed
+    store = _indicator_store()
+    if store is None:
+        return None
+    return store.read(symbol.upper(), interval, df)
+
+
+def provider_state():
+    return ", ".join(f"{p.name} {p.breaker.state}" for p in providers.PROVIDERS if p.breaker)
+
+
+def get_news(symbol):
+    provider = providers.news_provider()
+    return provider.news(symbol) if provider is not None else []
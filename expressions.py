@@ -0,0 +1,258 @@
+# Custom indicator formulas typed in the sidebar, e.g.
+#
+#   ema(close, 12) - ema(close, 26)
+#   (close - sma(close, 20)) / std(close, 20)
+#
+# A formula is parsed with the ast module and only a small subset is
+# accepted: numbers, the price fields, + - * / ** and the functions in
+# FUNCTIONS. Everything else (attributes, subscripts, names outside the
+# list, keyword arguments ...) is rejected, so a formula can never run
+# arbitrary code.
+#
+# The formula is lowered to a node key of indicators.Graph, e.g.
+# ("sub", ("ema", "Close", 12), ("ema", "Close", 26)). Equal sub-expressions
+# get equal keys (operands of + * min max are put in a fixed order first) and
+# constant sub-expressions are folded while compiling.
+#
+# The key is then compiled into a flat program: windowed terms (EMA, SMA,
+# std, shift, ...) are read from the graph, so they are computed once and
+# shared across the formulas of the sidebar and with the built-in
+# indicators (MACD already holds EMA(12) and EMA(26)); the arithmetic on top
+# runs as one NumPy ufunc per distinct sub-expression, writing into buffers
+# of sub-expressions that are not read again instead of allocating. Each
+# ufunc is one pass over the column, about a millisecond per million bars
+# (benchmarks/expressions.py).
+#
+# Compiled formulas are cached by their text (compile_formula()).
+
+import ast
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+
+import indicators
+
+# Names a formula can read -> price field
+VARIABLES = {name.lower(): name for name in indicators.FIELDS}
+
+# Function -> (graph node, number of series arguments, number of window
+# arguments)
+FUNCTIONS = {
+    "ema": ("ema", 1, 1),
+    "sma": ("sma", 1, 1),
+    "std": ("std", 1, 1),
+    "wilder": ("wilder", 1, 1),
+    "shift": ("shift", 1, 1),
+    "diff": ("diff", 1, 0),
+    "returns": ("returns", 1, 0),
+    "abs": ("abs", 1, 0),
+    "log": ("log", 1, 0),
+    "sqrt": ("sqrt", 1, 0),
+    "min": ("min", 2, 0),
+    "max": ("max", 2, 0),
+    "tr": ("true_range", 0, 0),
+}
+
+OPERATORS = {
+    ast.Add: "add",
+    ast.Sub: "sub",
+    ast.Mult: "mul",
+    ast.Div: "div",
+    ast.Pow: "pow",
+}
+
+COMMUTATIVE = {"add", "mul", "min", "max"}
+
+# Longest window a formula may ask for, far beyond any history on screen
+MAX_WINDOW = 1_000_000
+
+# Graph nodes the program computes itself, as NumPy ufuncs
+UFUNCS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+    "pow": np.power,
+    "neg": np.negative,
+    "abs": np.abs,
+    "log": np.log,
+    "sqrt": np.sqrt,
+    "min": np.fmin,
+    "max": np.fmax,
+}
+
+FOLD = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": lambda a, b: a / b if b else math.copysign(math.inf, a) if a else math.nan,
+    "pow": lambda a, b: a ** b,
+    "neg": lambda a: -a,
+    "abs": abs,
+    "log": lambda a: math.log(a) if a > 0 else math.nan,
+    "sqrt": lambda a: math.sqrt(a) if a >= 0 else math.nan,
+    "min": min,
+    "max": max,
+}
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _constant(key):
+    return isinstance(key, tuple) and key[0] == "const"
+
+
+def _number(value):
+    # Constant key for a folded or literal value; overflows, complex results
+    # (a negative number to a fractional power) and infinities are errors
+    try:
+        value = float(value)
+    except (ArithmeticError, TypeError, ValueError):
+        raise ExpressionError("constant is not a real number in range") from None
+    if not math.isfinite(value):
+        raise ExpressionError("constant is not a finite number")
+    return ("const", value)
+
+
+def _node(op, *args):
+    # Node key for op(args), folded when every argument is a constant
+    if args and all(_constant(a) for a in args) and op in FOLD:
+        try:
+            value = FOLD[op](*(a[1] for a in args))
+        except (ArithmeticError, TypeError, ValueError):
+            raise ExpressionError(f"constant {op} is not a real number in range") from None
+        return _number(value)
+    if op in COMMUTATIVE:
+        args = tuple(sorted(args, key=repr))
+    return (op, *args)
+
+
+def _window(node):
+    if not (isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool)
+            and 0 < node.value <= MAX_WINDOW):
+        raise ExpressionError(f"window lengths must be whole numbers from 1 to {MAX_WINDOW:,}")
+    return node.value
+
+
+def _lower(node):
+    if isinstance(node, ast.Expression):
+        return _lower(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return _number(node.value)
+    if isinstance(node, ast.Name):
+        if node.id.lower() not in VARIABLES:
+            raise ExpressionError(f"unknown name {node.id!r}; use {', '.join(VARIABLES)}")
+        return VARIABLES[node.id.lower()]
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _lower(node.operand)
+        return _node("neg", operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        return _node(OPERATORS[type(node.op)], _lower(node.left), _lower(node.right))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        name = node.func.id.lower()
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"unknown function {node.func.id!r}; use {', '.join(FUNCTIONS)}")
+        if node.keywords:
+            raise ExpressionError(f"{name}() takes positional arguments only")
+        op, series, windows = FUNCTIONS[name]
+        if len(node.args) != series + windows:
+            raise ExpressionError(f"{name}() takes {series + windows} arguments")
+        args = [_lower(a) for a in node.args[:series]]
+        if windows:
+            if _constant(args[0]):
+                raise ExpressionError(f"{name}() needs a series, not a number")
+            return (op, args[0], *(_window(a) for a in node.args[series:]))
+        return _node(op, *args)
+    raise ExpressionError(f"unsupported syntax: {ast.unparse(node)!r}")
+
+
+def _program(key):
+    # Steps (slot, ufunc or None, operand slots, graph key or constant,
+    # buffers freed by the step) in evaluation order; each distinct
+    # sub-expression gets one slot
+    steps, slots = [], {}
+
+    def visit(k):
+        if k in slots:
+            return slots[k]
+        if isinstance(k, tuple) and k[0] in UFUNCS:
+            args = tuple(visit(a) for a in k[1:])
+            steps.append((len(slots), UFUNCS[k[0]], args, None))
+        else:
+            steps.append((len(slots), None, (), k[1] if _constant(k) else k))
+        slots[k] = len(slots)
+        return slots[k]
+
+    visit(key)
+    last = {}
+    for i, (_, _, args, _) in enumerate(steps):
+        for a in args:
+            last[a] = i
+    # Buffers of the program (not graph arrays) whose last reader is this
+    # step; they are reused as outputs instead of allocating new ones
+    owned = {slot for slot, ufunc, _, _ in steps if ufunc is not None}
+    return [(slot, ufunc, args, source, sorted({a for a in args if a in owned and last[a] == i}))
+            for i, (slot, ufunc, args, source) in enumerate(steps)]
+
+
+class Expression:
+    def __init__(self, text, key):
+        self.text = text
+        self.key = key  # indicators.Graph node key
+        self.program = _program(key)
+
+    def __repr__(self):
+        return f"Expression({self.text!r})"
+
+    def __call__(self, graph):
+        # Values over the graph's prices: a Series (or wide frame) aligned
+        # with them, a float for a constant formula
+        if _constant(self.key):
+            return self.key[1]
+        values, pool, like = {}, [], None
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for slot, ufunc, args, source, frees in self.program:
+                if ufunc is None:
+                    if isinstance(source, float):
+                        values[slot] = source
+                    else:
+                        series = graph[source]
+                        like = series if like is None else like
+                        values[slot] = series.to_numpy(dtype="float64")
+                    continue
+                operands = [values[a] for a in args]
+                pool.extend(values.pop(a) for a in frees)
+                values[slot] = ufunc(*operands, out=pool.pop() if pool else None)
+        result = values[self.program[-1][0]]
+        if isinstance(like, pd.DataFrame):
+            return pd.DataFrame(result, index=like.index, columns=like.columns, copy=False)
+        return pd.Series(result, index=like.index, copy=False)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_formula(text):
+    # Expression for a formula; raises ExpressionError when it is not valid
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"syntax error: {e.msg}") from None
+    return Expression(text, _lower(tree))
+
+
+def parse_lines(text):
+    # [(label, formula)] from "label = formula" lines; a line without a
+    # label is labelled with its formula
+    out = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        label, sep, formula = line.partition("=")
+        if not sep or not label.strip() or "(" in label:
+            label, formula = line, line
+        out.append((label.strip(), formula.strip()))
+    return out
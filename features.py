@@ -0,0 +1,452 @@
+# Feature matrices for machine learning: the columns ta's
+# add_all_ta_features() adds, under the same names and with ta's default
+# parameters, for one symbol or a whole universe at once.
+#
+# add_all_ta_features() builds one indicator object per feature and per
+# symbol, loops in Python for several of them (ATR, ADX, MFI, NVI, Aroon,
+# CCI ...) and inserts every column into the frame as float64. Here the
+# prices are wide frames (rows = bars, columns = symbols), so each feature is
+# a handful of NumPy/pandas calls that cover every symbol: rolling sums,
+# means, highs and lows are cumulative sums and sliding windows over the
+# whole (bars, symbols) array, a seeded Wilder recursion is an adjust=False
+# EWM, rolling argmax and mean deviation run on sliding windows. EMAs and
+# the other intermediates shared by several features come from one
+# indicators.Graph. Each feature is written into a float32
+# (bars, symbols, features) array; about 3 s for 500 symbols x 5 years of
+# daily bars against ~3 min with ta (benchmarks/features.py).
+#
+#   values, names = stack(alerts.watchlist_panel(symbols, "5y", "1d"))
+#   dmatrix = xgboost.DMatrix(values.reshape(-1, len(names)), feature_names=names)
+#
+# NaN is xgboost's missing value, so warm-up rows and bars before a symbol
+# was listed need no special handling. Each symbol is computed on its own
+# bars, as if it were alone (indicators.Calendars): a symbol listed later
+# than the others gets its own warm-up, a stock next to crypto skips the
+# nights and weekends, and rows a symbol has no bar on are NaN.
+#
+# PSAR is a loop per symbol (kernels.py, compiled with Numba when it is
+# installed). Not included: KAMA, whose smoothing coefficient varies per bar.
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import kernels
+
+# Rows per sliding-window block in _windows(); bounds the temporary memory
+WINDOW_BLOCK = 65_536
+
+
+# --------------------- HELPERS -----------------------
+# On wide frames pandas runs rolling windows one column at a time; these
+# cover every column in one pass over the (bars, symbols) array.
+
+def _like(x, values):
+    return pd.DataFrame(values, index=x.index, columns=x.columns)
+
+
+def _flag(condition):
+    return condition.astype("float64")
+
+
+def _window_sum(values, window):
+    # Sum of the trailing `window` rows (fewer at the top)
+    total = np.cumsum(values, axis=0)
+    out = total.copy()
+    out[window:] -= total[:-window]
+    return out
+
+
+def _rolling(x, window, how, min_periods=None):
+    # x.rolling(window, min_periods=min_periods).<how>() for how in sum,
+    # mean, max, min
+    values = x.to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    count = _window_sum(valid.astype("float64"), window)
+    if how in ("sum", "mean"):
+        finite = np.isfinite(values)
+        out = _window_sum(np.where(finite, values, 0.0), window)
+        if not finite[valid].all():
+            # inf in a window as pandas: +inf, -inf or NaN for both
+            up = _window_sum(values == np.inf, window) > 0
+            down = _window_sum(values == -np.inf, window) > 0
+            out[up] = np.inf
+            out[down] = -np.inf
+            out[up & down] = np.nan
+        if how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out /= count
+    else:
+        reduce = np.fmax if how == "max" else np.fmin
+        padded = np.concatenate((np.full((window - 1,) + values.shape[1:], np.nan), values))
+        view = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+        out = np.empty_like(values)
+        for i in range(0, len(view), WINDOW_BLOCK):
+            out[i:i + WINDOW_BLOCK] = reduce.reduce(view[i:i + WINDOW_BLOCK], axis=-1)
+    out[count < max(window if min_periods is None else min_periods, 1)] = np.nan
+    return _like(x, out)
+
+
+def _shift_fill_mean(x, periods):
+    # shift() with the first rows set to the column mean, as ta does
+    out = x.shift(periods)
+    out.iloc[:periods] = np.broadcast_to(x.mean().to_numpy(), out.iloc[:periods].shape)
+    return out
+
+
+def _true_range(high, low, prev_close):
+    # ta's IndicatorMixin._true_range: NaN terms are skipped
+    return np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+
+
+def _seeded_wilder(x, window):
+    # ta's ATR/ADX smoothing: the mean of the first `window` values of each
+    # column, then y = (y_prev * (window - 1) + x) / window
+    values = x.to_numpy(dtype="float64")
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+    start = first + window - 1
+    rows = np.arange(len(values))[:, None]
+    seed = _rolling(x, window, "mean").to_numpy()
+    y = np.where(rows > start, values, np.nan)
+    y = np.where(rows == start, seed, y)
+    return _like(x, y).ewm(alpha=1 / window, adjust=False).mean()
+
+
+def _windows(x, window, function):
+    # function(windows) over the trailing `window` rows of each column;
+    # windows is a (rows, symbols, window) view. NaN where a window is not
+    # full or holds NaN.
+    values = x.to_numpy(dtype="float64")
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        view = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        for i in range(0, len(view), WINDOW_BLOCK):
+            block = view[i:i + WINDOW_BLOCK]
+            out[window - 1 + i:window - 1 + i + len(block)] = function(block)
+    full = _window_sum(~np.isnan(values), window) == window
+    out[~full] = np.nan
+    return _like(x, out)
+
+
+def _mean_deviation(windows):
+    return np.abs(windows - windows.mean(axis=-1, keepdims=True)).mean(axis=-1)
+
+
+# --------------------- FEATURE GROUPS -----------------------
+# Each returns {ta column name: wide frame}; g is an indicators.Graph over
+# the wide OHLCV frames, every history starting on the first row
+
+def _volume(g):
+    high, low, close, volume = g["High"], g["Low"], g["Close"], g["Volume"]
+    prev = close.shift(1)
+    clv = (((close - low) - (high - close)) / (high - low)).fillna(0.0)
+    money_flow = clv * volume
+
+    typical = (high + low + close) / 3.0
+    typical_prev = typical.shift(1)
+    direction = _flag(typical > typical_prev) - _flag(typical < typical_prev)
+    raw_flow = typical * volume * direction
+    positive = _rolling(raw_flow.clip(lower=0), 14, "sum")
+    negative = -_rolling(raw_flow.clip(upper=0), 14, "sum")
+
+    emv = (high.diff(1) + low.diff(1)) * (high - low) / (2 * volume) * 100000000
+    factor = (1.0 + g[("returns", "Close")]).where(volume.shift(1) > volume, 1.0)
+    factor.iloc[0] = 1.0
+    return {
+        "volume_adi": money_flow.cumsum(),
+        "volume_obv": volume.where(~(close < prev), -volume).cumsum(),
+        "volume_cmf": _rolling(money_flow, 20, "sum") / _rolling(volume, 20, "sum"),
+        "volume_fi": ((close - prev) * volume).ewm(span=13, min_periods=13, adjust=False).mean(),
+        "volume_em": emv,
+        "volume_sma_em": _rolling(emv, 14, "mean"),
+        "volume_vpt": (g[("returns", "Close")] * volume).cumsum(),
+        "volume_vwap": _rolling(typical * volume, 14, "sum") / _rolling(volume, 14, "sum"),
+        "volume_mfi": 100 - (100 / (1 + positive / negative)),
+        "volume_nvi": 1000 * factor.cumprod(),
+    }
+
+
+def _volatility(g):
+    high, low, close = g["High"], g["Low"], g["Close"]
+    bb = indicators._bollinger(g, 20, 2)
+    hband, lband, mavg = bb["bb_bbh"], bb["bb_bbl"], bb["bb_bbm"]
+
+    kc_mid = _rolling((high + low + close) / 3.0, 10, "mean")
+    kc_high = _rolling((4 * high - 2 * low + close) / 3.0, 10, "mean", 0)
+    kc_low = _rolling((-2 * high + 4 * low + close) / 3.0, 10, "mean", 0)
+
+    dc_high = _rolling(high, 20, "max")
+    dc_low = _rolling(low, 20, "min")
+
+    tr = _true_range(high, low, close.shift(1))
+    atr = _seeded_wilder(tr, 10).fillna(0.0)
+
+    peak = _rolling(close, 14, "max", 1)
+    drawdown = 100 * (close - peak) / peak
+    return {
+        "volatility_bbm": mavg,
+        "volatility_bbh": hband,
+        "volatility_bbl": lband,
+        "volatility_bbw": (hband - lband) / mavg * 100,
+        "volatility_bbp": (close - lband) / (hband - lband).where(hband != lband),
+        "volatility_bbhi": bb["bb_bbhi"],
+        "volatility_bbli": bb["bb_bbli"],
+        "volatility_kcc": kc_mid,
+        "volatility_kch": kc_high,
+        "volatility_kcl": kc_low,
+        "volatility_kcw": (kc_high - kc_low) / kc_mid * 100,
+        "volatility_kcp": (close - kc_low) / (kc_high - kc_low),
+        "volatility_kchi": _flag(close > kc_high),
+        "volatility_kcli": _flag(close < kc_low),
+        "volatility_dcl": dc_low,
+        "volatility_dch": dc_high,
+        "volatility_dcm": (dc_high - dc_low) / 2.0 + dc_low,
+        "volatility_dcw": (dc_high - dc_low) / g[("sma", "Close", 20)] * 100,
+        "volatility_dcp": (close - dc_low) / (dc_high - dc_low),
+        "volatility_atr": atr,
+        "volatility_ui": np.sqrt(_rolling(drawdown ** 2, 14, "sum") / 14),
+    }
+
+
+def _adx(g, window=14):
+    high, low, close = g["High"], g["Low"], g["Close"]
+    prev = close.shift(1)
+    tr = np.maximum(high, prev) - np.minimum(low, prev)  # NaN on the first bar
+    up = high - high.shift(1)
+    down = low.shift(1) - low
+    missing = up.isna() | down.isna()
+    pos = up.where((up > down) & (up > 0), 0.0).abs().mask(missing)
+    neg = down.where((down > up) & (down > 0), 0.0).abs().mask(missing)
+
+    trs = _seeded_wilder(tr, window)
+    di_pos = (100 * _seeded_wilder(pos, window) / trs).where(trs != 0, 0.0).mask(trs.isna())
+    di_neg = (100 * _seeded_wilder(neg, window) / trs).where(trs != 0, 0.0).mask(trs.isna())
+    total = di_pos + di_neg
+    dx = (100 * (di_pos - di_neg).abs() / total).where(total != 0, 0.0).mask(total.isna())
+
+    # ta starts +DI/-DI one bar after the seed and pads with zeros
+    warm = np.broadcast_to(np.arange(len(close))[:, None] <= window, close.shape)
+    return {
+        "trend_adx": _seeded_wilder(dx, window).fillna(0.0),
+        "trend_adx_pos": di_pos.mask(warm, 0.0),
+        "trend_adx_neg": di_neg.mask(warm, 0.0),
+    }
+
+
+def _trend(g):
+    high, low, close = g["High"], g["Low"], g["Close"]
+    macd = indicators._macd(g, 12, 26, 9)
+
+    prev_filled = _shift_fill_mean(close, 1)
+    tr = _true_range(high, low, prev_filled)
+    trn = _rolling(tr, 14, "sum")
+    vip = _rolling((high - low.shift(1)).abs(), 14, "sum") / trn
+    vin = _rolling((low - high.shift(1)).abs(), 14, "sum") / trn
+
+    ema3 = g[("ema", ("ema", ("ema", "Close", 15), 15), 15)]
+    ema3_prev = _shift_fill_mean(ema3, 1)
+
+    amplitude = ("sub", "High", "Low")
+    mass = _rolling(g[("ema", amplitude, 9)] / g[("ema", ("ema", amplitude, 9), 9)], 25, "sum")
+
+    def roc_mean(roc, window):
+        shifted = _shift_fill_mean(close, roc)
+        return _rolling((close - shifted) / shifted, window, "mean")
+
+    kst = 100 * (roc_mean(10, 10) + 2 * roc_mean(15, 10) + 3 * roc_mean(20, 10) + 4 * roc_mean(30, 15))
+    kst_sig = _rolling(kst, 9, "mean", 0)
+
+    conv = 0.5 * (_rolling(high, 9, "max") + _rolling(low, 9, "min"))
+    base = 0.5 * (_rolling(high, 26, "max") + _rolling(low, 26, "min"))
+    span_a = 0.5 * (conv + base)
+    # min_periods=0 would carry span_b past the end of a shorter history, into
+    # the mean the visual cloud is padded with
+    span_b = (0.5 * (_rolling(high, 52, "max", 0) + _rolling(low, 52, "min", 0))).where(close.notna())
+
+    stc_macd = g[("sub", ("ema", "Close", 23), ("ema", "Close", 50))]
+    macd_min, macd_max = _rolling(stc_macd, 10, "min"), _rolling(stc_macd, 10, "max")
+    stoch_d = (100 * (stc_macd - macd_min) / (macd_max - macd_min)).ewm(span=3, min_periods=3, adjust=False).mean()
+    d_min, d_max = _rolling(stoch_d, 10, "min"), _rolling(stoch_d, 10, "max")
+    stc = (100 * (stoch_d - d_min) / (d_max - d_min)).ewm(span=3, min_periods=3, adjust=False).mean()
+
+    typical = (high + low + close) / 3.0
+    cci = (typical - _rolling(typical, 20, "mean")) / (0.015 * _windows(typical, 20, _mean_deviation))
+
+    aroon_up = _windows(high, 26, lambda w: w.argmax(axis=-1) / 25 * 100)
+    aroon_down = _windows(low, 26, lambda w: w.argmin(axis=-1) / 25 * 100)
+
+    out = {
+        "trend_macd": macd["MACD_Line"],
+        "trend_macd_signal": macd["MACD_Signal"],
+        "trend_macd_diff": macd["MACD_Histogram"],
+        "trend_sma_fast": g[("sma", "Close", 12)],
+        "trend_sma_slow": g[("sma", "Close", 26)],
+        "trend_ema_fast": g[("ema", "Close", 12)],
+        "trend_ema_slow": g[("ema", "Close", 26)],
+        "trend_vortex_ind_pos": vip,
+        "trend_vortex_ind_neg": vin,
+        "trend_vortex_ind_diff": vip - vin,
+        "trend_trix": (ema3 - ema3_prev) / ema3_prev * 100,
+        "trend_mass_index": mass,
+        "trend_dpo": _shift_fill_mean(close, 11) - g[("sma", "Close", 20)],
+        "trend_kst": kst,
+        "trend_kst_sig": kst_sig,
+        "trend_kst_diff": kst - kst_sig,
+        "trend_ichimoku_conv": conv,
+        "trend_ichimoku_base": base,
+        "trend_ichimoku_a": span_a,
+        "trend_ichimoku_b": span_b,
+        "trend_stc": stc,
+    }
+    out.update(_adx(g))
+    out.update({
+        "trend_cci": cci,
+        "trend_visual_ichimoku_a": _shift_fill_mean(span_a, 26),
+        "trend_visual_ichimoku_b": _shift_fill_mean(span_b, 26),
+        "trend_aroon_up": aroon_up,
+        "trend_aroon_down": aroon_down,
+        "trend_aroon_ind": aroon_up - aroon_down,
+    })
+    psar = kernels.psar(high, low, close)
+    up, down = psar["psar_up"], psar["psar_down"]
+    out.update({
+        "trend_psar_up": up,
+        "trend_psar_down": down,
+        "trend_psar_up_indicator": _flag(up.notna() & up.shift(1).isna()),
+        "trend_psar_down_indicator": _flag(down.notna() & down.shift(1).isna()),
+    })
+    return out
+
+
+def _momentum(g):
+    high, low, close = g["High"], g["Low"], g["Close"]
+    rsi = indicators._rsi(g, 14)["RSI"]
+    rsi_low, rsi_high = _rolling(rsi, 14, "min"), _rolling(rsi, 14, "max")
+    stoch_rsi = (rsi - rsi_low) / (rsi_high - rsi_low)
+    stoch_rsi_k = _rolling(stoch_rsi, 3, "mean")
+
+    diff = g[("diff", "Close")]
+    smooth = diff.ewm(span=25, min_periods=25, adjust=False).mean().ewm(span=13, min_periods=13, adjust=False).mean()
+    smooth_abs = (diff.abs().ewm(span=25, min_periods=25, adjust=False).mean()
+                  .ewm(span=13, min_periods=13, adjust=False).mean())
+
+    prev = close.shift(1)
+    tr = _true_range(high, low, prev)
+    pressure = close - np.minimum(low, prev)
+
+    def average(window):
+        return _rolling(pressure, window, "sum") / _rolling(tr, window, "sum")
+
+    low_14 = _rolling(low, 14, "min")
+    high_14 = _rolling(high, 14, "max")
+    stoch = 100 * (close - low_14) / (high_14 - low_14)
+
+    median = 0.5 * (high + low)
+    prev_12 = close.shift(12)
+
+    ppo = (g[("ema", "Close", 12)] - g[("ema", "Close", 26)]) / g[("ema", "Close", 26)] * 100
+    ppo_signal = ppo.ewm(span=9, min_periods=9, adjust=False).mean()
+    pvo = (g[("ema", "Volume", 12)] - g[("ema", "Volume", 26)]) / g[("ema", "Volume", 26)] * 100
+    pvo_signal = pvo.ewm(span=9, min_periods=9, adjust=False).mean()
+    return {
+        "momentum_rsi": rsi,
+        "momentum_stoch_rsi": stoch_rsi,
+        "momentum_stoch_rsi_k": stoch_rsi_k,
+        "momentum_stoch_rsi_d": _rolling(stoch_rsi_k, 3, "mean"),
+        "momentum_tsi": smooth / smooth_abs * 100,
+        "momentum_uo": 100.0 * (4.0 * average(7) + 2.0 * average(14) + 1.0 * average(28)) / 7.0,
+        "momentum_stoch": stoch,
+        "momentum_stoch_signal": _rolling(stoch, 3, "mean"),
+        "momentum_wr": -100 * (high_14 - close) / (high_14 - low_14),
+        "momentum_ao": _rolling(median, 5, "mean") - _rolling(median, 34, "mean"),
+        "momentum_roc": (close - prev_12) / prev_12 * 100,
+        "momentum_ppo": ppo,
+        "momentum_ppo_signal": ppo_signal,
+        "momentum_ppo_hist": ppo - ppo_signal,
+        "momentum_pvo": pvo,
+        "momentum_pvo_signal": pvo_signal,
+        "momentum_pvo_hist": pvo - pvo_signal,
+    }
+
+
+def _others(g):
+    close = g["Close"]
+    return {
+        "others_dr": (close / close.shift(1) - 1) * 100,
+        "others_dlr": np.log(close).diff() * 100,
+        "others_cr": (close / close.iloc[0] - 1) * 100,
+    }
+
+
+GROUPS = [_volume, _volatility, _trend, _momentum, _others]
+
+# Feature names in add_all_ta_features() order, per group
+GROUP_FEATURES = {
+    _volume: [
+        "volume_adi", "volume_obv", "volume_cmf", "volume_fi", "volume_em", "volume_sma_em",
+        "volume_vpt", "volume_vwap", "volume_mfi", "volume_nvi",
+    ],
+    _volatility: [
+        "volatility_bbm", "volatility_bbh", "volatility_bbl", "volatility_bbw", "volatility_bbp",
+        "volatility_bbhi", "volatility_bbli", "volatility_kcc", "volatility_kch", "volatility_kcl",
+        "volatility_kcw", "volatility_kcp", "volatility_kchi", "volatility_kcli", "volatility_dcl",
+        "volatility_dch", "volatility_dcm", "volatility_dcw", "volatility_dcp", "volatility_atr",
+        "volatility_ui",
+    ],
+    _trend: [
+        "trend_macd", "trend_macd_signal", "trend_macd_diff", "trend_sma_fast", "trend_sma_slow",
+        "trend_ema_fast", "trend_ema_slow", "trend_vortex_ind_pos", "trend_vortex_ind_neg",
+        "trend_vortex_ind_diff", "trend_trix", "trend_mass_index", "trend_dpo", "trend_kst",
+        "trend_kst_sig", "trend_kst_diff", "trend_ichimoku_conv", "trend_ichimoku_base",
+        "trend_ichimoku_a", "trend_ichimoku_b", "trend_stc", "trend_adx", "trend_adx_pos",
+        "trend_adx_neg", "trend_cci", "trend_visual_ichimoku_a", "trend_visual_ichimoku_b",
+        "trend_aroon_up", "trend_aroon_down", "trend_aroon_ind",
+        "trend_psar_up", "trend_psar_down", "trend_psar_up_indicator", "trend_psar_down_indicator",
+    ],
+    _momentum: [
+        "momentum_rsi", "momentum_stoch_rsi", "momentum_stoch_rsi_k", "momentum_stoch_rsi_d",
+        "momentum_tsi", "momentum_uo", "momentum_stoch", "momentum_stoch_signal", "momentum_wr",
+        "momentum_ao", "momentum_roc", "momentum_ppo", "momentum_ppo_signal", "momentum_ppo_hist",
+        "momentum_pvo", "momentum_pvo_signal", "momentum_pvo_hist",
+    ],
+    _others: ["others_dr", "others_dlr", "others_cr"],
+}
+
+FEATURES = [name for group in GROUPS for name in GROUP_FEATURES[group]]
+
+
+# --------------------- MATRICES -----------------------
+
+def stack(ohlcv, names=None, dtype="float32"):
+    # (bars, symbols, features) array and the feature names. ohlcv maps
+    # "Open"... "Volume" to wide frames with the same index and columns
+    # (alerts.watchlist_panel()). names selects features (all by default);
+    # groups none of them belong to are skipped.
+    names = FEATURES if names is None else [n for n in FEATURES if n in set(names)]
+    # Computed with every symbol's own bars packed to the top, so windows
+    # skip the rows of other calendars and indicators that treat the first
+    # bars specially see the symbol's first bars; unpacked when written out
+    calendars = indicators.Calendars(ohlcv["Close"])
+    prices = {field: calendars.pack(ohlcv[field]) for field in indicators.FIELDS if field in ohlcv}
+    graph = indicators.Graph(prices)
+    # Filled feature by feature, then transposed in one copy
+    out = np.empty((len(names),) + ohlcv["Close"].shape, dtype=dtype)
+    position = {name: i for i, name in enumerate(names)}
+    for group in GROUPS:
+        if not position.keys() & set(GROUP_FEATURES[group]):
+            continue
+        for name, values in group(graph).items():
+            if name in position:
+                out[position[name]] = calendars.unpack_values(values.to_numpy(dtype="float64"))
+        graph.update(prices)
+        graph.prune()  # this group's intermediates
+    return np.ascontiguousarray(out.transpose(1, 2, 0)), names
+
+
+def frame(df, names=None, dtype="float32"):
+    # Features of one symbol (a frame with yfinance column names) as a frame
+    # with ta's column names
+    ohlcv = {field: df[[field]].set_axis([0], axis=1) for field in indicators.FIELDS if field in df.columns}
+    values, names = stack(ohlcv, names, dtype)
+    return pd.DataFrame(values[:, 0, :], index=df.index, columns=names)
@@ -0,0 +1,179 @@
+# Resilient fetching from market-data providers.
+#
+#   TokenBucket    - process-wide rate limiter shared by every session
+#   CircuitBreaker - stops calling a provider that keeps failing, then probes
+#   call()         - bounded retries with exponential backoff and full jitter
+#   ResponseCache  - TTL cache that keeps expired entries to serve as stale
+#                    data while the provider is degraded (concurrent misses
+#                    are collapsed into one request by data.py's batcher)
+#
+# Streamlit serves every session from threads of one process, so module-level
+# instances of these classes are shared by all users of that process.
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import perf
+
+logger = logging.getLogger("crypto_app.fetch")
+
+
+class FetchError(Exception):
+    pass
+
+
+class NoDataError(FetchError):
+    # The provider answered but has nothing for this request (unknown symbol,
+    # interval not available for the period...); retrying will not help
+    pass
+
+
+class TransientError(FetchError):
+    # Throttling, timeouts, empty answers caused by provider trouble
+    pass
+
+
+class ProviderUnavailable(FetchError):
+    # Retries exhausted or the circuit breaker is open
+    pass
+
+
+# --------------------- RATE LIMITER -----------------------
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)  # tokens added per second
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# --------------------- CIRCUIT BREAKER -----------------------
+
+class CircuitBreaker:
+    # closed: calls go through. open: calls fail fast for `reset_seconds`.
+    # half-open: one probe call decides between closed and open again.
+    def __init__(self, failure_threshold=5, reset_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    logger.warning("circuit opened after %d failures", self._failures)
+                    perf.registry.inc("crypto_app_circuit_opened_total")
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+# --------------------- RETRIES -----------------------
+
+def call(fn, limiter=None, breaker=None, attempts=4, base_delay=0.5, max_delay=8.0):
+    # Runs fn() until it succeeds, raises NoDataError, or `attempts` transient
+    # failures have happened. Sleeps a random time in [0, min(max_delay,
+    # base_delay * 2**n)] between attempts ("full jitter"), so sessions that
+    # were throttled together do not retry in lockstep.
+    last_error = None
+    for attempt in range(attempts):
+        if breaker is not None and not breaker.allow():
+            raise ProviderUnavailable("provider circuit is open") from last_error
+        if limiter is not None and not limiter.acquire():
+            raise ProviderUnavailable("rate limit wait timed out") from last_error
+        try:
+            result = fn()
+        except NoDataError:
+            if breaker is not None:
+                breaker.record_success()  # the provider itself is healthy
+            raise
+        except Exception as e:
+            last_error = e
+            if breaker is not None:
+                breaker.record_failure()
+            perf.registry.inc("crypto_app_fetch_failures_total")
+            if attempt + 1 < attempts:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+                logger.info("fetch failed (%s), retry %d in %.2fs", e, attempt + 1, delay)
+                time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+    raise ProviderUnavailable(f"gave up after {attempts} attempts: {last_error}") from last_error
+
+
+# --------------------- RESPONSE CACHE -----------------------
+
+class ResponseCache:
+    def __init__(self, ttl, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, allow_stale=False):
+        # Returns (value, age_seconds) or (None, None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+        age = time.time() - entry[0]
+        if age > self.ttl and not allow_stale:
+            return None, None
+        return entry[1], age
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,41 @@
+# Memory-compact representation of the indicator-enriched frame.
+#
+# yfinance and ta hand back every column as float64. In compact mode the
+# columns that are only ever plotted are stored as float32 (about 7
+# significant digits, far more than a chart can resolve) and the Bollinger
+# band 0/1 flags as int8. Price and volume columns keep full precision
+# because they are shown in the tables and statistics.
+
+import numpy as np
+
+import indicators
+
+# Registry outputs that are 0/1 flags rather than plotted values
+FLAG_OUTPUTS = {"bb_bbhi", "bb_bbli"}
+
+# Column names after the renaming step in app.py: every indicator column of
+# the registry ("<group>_<label>")
+FLAG_COLUMNS = [column for indicator in indicators.REGISTRY.values()
+                for output, column in indicator.columns.items() if output in FLAG_OUTPUTS]
+PLOT_ONLY_COLUMNS = [column for indicator in indicators.REGISTRY.values()
+                     for output, column in indicator.columns.items() if output not in FLAG_OUTPUTS]
+
+# Higher-timeframe overlays ("MTF_RSI 1D", ...) and custom formulas
+# ("Custom_<label>") are plot-only as well
+PLOT_ONLY_PREFIXES = ("MTF_", "Custom_")
+
+
+def compact_frame(df):
+    dtypes = {}
+    for col in df.columns:
+        if col in PLOT_ONLY_COLUMNS or col.startswith(PLOT_ONLY_PREFIXES):
+            dtypes[col] = np.float32
+    for col in FLAG_COLUMNS:
+        # ta returns the flags as 0.0/1.0 floats; NaN would not fit in int8
+        if col in df.columns and not df[col].isna().any():
+            dtypes[col] = np.int8
+    return df.astype(dtypes)
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
@@ -0,0 +1,123 @@
+# Gap detection for OHLCV series.
+#
+# The timestamps a series should have are generated for its market calendar
+# (24/7 for crypto pairs such as BTC-USD, weekday sessions for stocks) and
+# compared with the timestamps it has, all as int64 arrays. Missing bars are
+# grouped into contiguous ranges so a backfill needs one request per range
+# rather than one per bar.
+#
+# The stock calendar is weekdays minus US federal holidays with a
+# 09:30-16:00 America/New_York session. NYSE holidays differ slightly (Good
+# Friday is closed, Columbus and Veterans Day are open) and half days are not
+# modelled, so a few expected bars may be reported missing on those dates.
+
+import numpy as np
+import pandas as pd
+
+EXCHANGE_TZ = "America/New_York"
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+# yfinance interval -> bar length; longer intervals are not checked
+INTERVALS = {
+    "1m": "1min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "60m": "60min", "90m": "90min", "1h": "60min", "1d": "1D",
+}
+
+FIAT = ("USD", "EUR", "GBP", "JPY", "USDT", "USDC")
+
+
+def is_24_7(symbol):
+    # Crypto pairs are quoted as BASE-QUOTE (BTC-USD); stocks have no dash
+    # before a fiat quote
+    return "-" in symbol and symbol.rsplit("-", 1)[1] in FIAT
+
+
+def _holidays(start, end):
+    from pandas.tseries.holiday import USFederalHolidayCalendar
+
+    return USFederalHolidayCalendar().holidays(start.normalize(), end.normalize())
+
+
+def expected_index(symbol, interval, start, end):
+    # Timestamps a complete series would have between start and end (inclusive)
+    freq = pd.Timedelta(INTERVALS[interval])
+    tz = start.tz
+    if is_24_7(symbol):
+        if interval == "1d":
+            return pd.date_range(start.normalize(), end, freq="D", tz=tz)
+        return pd.date_range(start.floor(freq), end, freq=freq, tz=tz)
+
+    local_start = start.tz_convert(EXCHANGE_TZ) if tz is not None else start
+    local_end = end.tz_convert(EXCHANGE_TZ) if tz is not None else end
+    days = pd.bdate_range(local_start.normalize().tz_localize(None),
+                          local_end.normalize().tz_localize(None))
+    days = days.difference(_holidays(days[0], days[-1])) if len(days) else days
+    if interval == "1d":
+        index = days
+    else:
+        # (days x bars per session) grid of session timestamps
+        offsets = np.arange(SESSION_OPEN.value, SESSION_CLOSE.value, freq.value, dtype="int64")
+        grid = days.as_unit("ns").asi8[:, None] + offsets[None, :]
+        index = pd.DatetimeIndex(grid.ravel())
+    if tz is not None:
+        index = index.tz_localize(EXCHANGE_TZ).tz_convert(tz)
+    return index[(index >= start) & (index <= end)]
+
+
+def find_gaps(index, expected):
+    # Missing timestamps grouped into [start, end) ranges
+    missing = ~np.isin(expected.as_unit("ns").asi8, index.as_unit("ns").asi8)
+    positions = np.flatnonzero(missing)
+    if not len(positions):
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1)
+    starts = positions[np.concatenate(([0], breaks + 1))]
+    ends = positions[np.concatenate((breaks, [len(positions) - 1]))]
+    step = pd.Timedelta(expected[1] - expected[0]) if len(expected) > 1 else pd.Timedelta(0)
+    return [(expected[s], expected[e] + step, int(e - s + 1)) for s, e in zip(starts, ends)]
+
+
+def _session_dates(index):
+    # Daily bars are stamped at midnight of their session date in the time
+    # zone of their source (New York for yfinance stocks, UTC in the archive);
+    # the wall-clock date is the session either way
+    return (index.tz_localize(None) if index.tz is not None else index).normalize()
+
+
+def completeness(symbol, df, interval):
+    # Report of expected vs present bars between the first and last bar
+    if interval not in INTERVALS or df.empty:
+        return None
+    index = df.index
+    if interval == "1d":
+        # Compared by session date, not instant; gaps are returned as
+        # midnights in the frame's time zone
+        dates = _session_dates(index)
+        expected = expected_index(symbol, interval, dates[0], dates[-1])
+        gaps = [(start.tz_localize(index.tz), end.tz_localize(index.tz), n)
+                for start, end, n in find_gaps(dates, expected)]
+    else:
+        expected = expected_index(symbol, interval, index[0], index[-1])
+        gaps = find_gaps(index, expected)
+    missing = sum(n for _, _, n in gaps)
+    return {
+        "symbol": symbol,
+        "expected": len(expected),
+        "present": len(expected) - missing,
+        "missing": missing,
+        "completeness": 1 - missing / len(expected) if len(expected) else 1.0,
+        "gaps": gaps,
+    }
+
+
+def merge_ranges(gaps, max_gap):
+    # Joins gap ranges separated by less than `max_gap`, so nearby holes are
+    # backfilled with one request
+    merged = []
+    for start, end, n in gaps:
+        if merged and start - merged[-1][1] < max_gap:
+            merged[-1] = (merged[-1][0], end, merged[-1][2] + n)
+        else:
+            merged.append((start, end, n))
+    return merged
@@ -0,0 +1,531 @@
+# Vectorized indicator functions with the same definitions as the ta classes
+# used in app.py.
+#
+# Every function accepts either a Series (one symbol) or a DataFrame with one
+# column per symbol, so a whole watchlist is computed in one pandas call per
+# indicator instead of one ta object per symbol.
+#
+# Higher-timeframe versions (daily RSI on an hourly chart, ...) are computed
+# on bars resampled from the displayed series and then aligned back onto its
+# index (higher_timeframe()). Resampled bars are labelled with the time they
+# close, so a displayed bar only sees higher-timeframe values that were final
+# when it opened; the forming higher-timeframe bar is never used.
+#
+# The formulas are written against a Graph of intermediate series: EMA(n),
+# SMA(n), rolling std(n), Wilder smoothing, price changes, returns, the true
+# range. A node is computed the first time an indicator asks for it and then
+# shared, so MACD and an EMA overlay read the same EMA(26), Bollinger Bands
+# and an SMA(20) the same rolling mean. Nothing that no requested indicator
+# reads is computed. A Graph kept across reruns (Graph.update) holds its
+# nodes until the prices they were computed from change.
+
+import numpy as np
+import pandas as pd
+
+# Bump when a formula below changes; materialized indicator columns
+# (materialize.py) written by an older version are rebuilt
+VERSION = 1
+
+# RSI levels drawn on the charts and used by the default alert rules
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+# --------------------- INTERMEDIATES -----------------------
+# Node key -> series: ("ema", source, n), ("sma", source, n), ... where
+# source is a price field or another node key.
+
+# ema and wilder take an optional min_periods (default: the window); 0 gives
+# the early values the ta classes compute with fillna=True
+
+def _ema(g, source, window, min_periods=None):
+    min_periods = window if min_periods is None else min_periods
+    return g[source].ewm(span=window, min_periods=min_periods, adjust=False).mean()
+
+
+def _wilder(g, source, window, min_periods=None):
+    min_periods = window if min_periods is None else min_periods
+    return g[source].ewm(alpha=1 / window, min_periods=min_periods, adjust=False).mean()
+
+
+def _sma(g, source, window):
+    return g[source].rolling(window, min_periods=window).mean()
+
+
+def _std(g, source, window):
+    return g[source].rolling(window, min_periods=window).std(ddof=0)
+
+
+def _diff(g, source):
+    return g[source].diff(1)
+
+
+def _gain(g, source):
+    diff = g[("diff", source)]
+    return diff.where(diff > 0, 0.0)
+
+
+def _loss(g, source):
+    diff = g[("diff", source)]
+    return -diff.where(diff < 0, 0.0)
+
+
+def _returns(g, source):
+    return g[source].pct_change(fill_method=None)
+
+
+def _const(g, value):
+    return value
+
+
+def _add(g, a, b):
+    return g[a] + g[b]
+
+
+def _sub(g, a, b):
+    return g[a] - g[b]
+
+
+def _mul(g, a, b):
+    return g[a] * g[b]
+
+
+def _div(g, a, b):
+    return g[a] / g[b]
+
+
+def _pow(g, a, b):
+    return g[a] ** g[b]
+
+
+def _neg(g, a):
+    return -g[a]
+
+
+def _abs(g, a):
+    return abs(g[a])
+
+
+def _log(g, a):
+    return np.log(g[a])
+
+
+def _sqrt(g, a):
+    return np.sqrt(g[a])
+
+
+def _min(g, a, b):
+    return np.fmin(g[a], g[b])
+
+
+def _max(g, a, b):
+    return np.fmax(g[a], g[b])
+
+
+def _shift(g, source, periods):
+    return g[source].shift(periods)
+
+
+def _true_range(g):
+    high, low, close = g["High"], g["Low"], g["Close"]
+    prev = close.shift(1)
+    return np.fmax(np.fmax(high - low, (high - prev).abs()), (low - prev).abs())
+
+
+NODES = {
+    "ema": _ema,
+    "wilder": _wilder,
+    "sma": _sma,
+    "std": _std,
+    "diff": _diff,
+    "gain": _gain,
+    "loss": _loss,
+    "returns": _returns,
+    "shift": _shift,
+    "true_range": _true_range,
+    # Arithmetic, for formulas (expressions.py)
+    "const": _const,
+    "add": _add,
+    "sub": _sub,
+    "mul": _mul,
+    "div": _div,
+    "pow": _pow,
+    "neg": _neg,
+    "abs": _abs,
+    "log": _log,
+    "sqrt": _sqrt,
+    "min": _min,
+    "max": _max,
+}
+
+
+def _same(a, b):
+    return (a.shape == b.shape and a.index.equals(b.index)
+            and np.array_equal(a.to_numpy(), b.to_numpy(), equal_nan=True))
+
+
+class Graph:
+    # Memoized intermediates over one set of prices (Series, or frames with
+    # one column per symbol)
+    def __init__(self, prices=None):
+        self._fields = {}
+        self._values = {}  # node key -> series
+        self._depends = {}  # node key -> price fields it was computed from
+        self._stack = []  # fields read by the nodes being computed
+        self._read = set()  # nodes read since the last update()
+        self.computed = 0
+        if prices is not None:
+            self.update(prices)
+
+    def update(self, prices):
+        # New prices; nodes computed from a field whose values changed are
+        # dropped. Returns the changed fields.
+        changed = set()
+        for field in FIELDS:
+            if field not in prices:
+                continue
+            values = prices[field]
+            old = self._fields.get(field)
+            if old is None or not _same(old, values):
+                self._fields[field] = values
+                changed.add(field)
+        for key in [k for k, fields in self._depends.items() if fields & changed]:
+            del self._values[key], self._depends[key]
+        self._read = set()
+        return changed
+
+    def prune(self):
+        # Drops the nodes no indicator read since the last update()
+        for key in set(self._values) - self._read:
+            del self._values[key], self._depends[key]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if self._stack:
+                self._stack[-1].add(key)
+            return self._fields[key]
+        if key not in self._values:
+            self._stack.append(set())
+            try:
+                value = NODES[key[0]](self, *key[1:])
+            finally:
+                fields = self._stack.pop()
+            self._values[key], self._depends[key] = value, fields
+            self.computed += 1
+        if self._stack:
+            self._stack[-1].update(self._depends[key])
+        self._read.add(key)
+        return self._values[key]
+
+
+# --------------------- INDICATORS -----------------------
+# Indicator outputs from a Graph; the plain functions below wrap them for
+# single calls
+
+def _bollinger(g, window=20, window_dev=2):
+    close = g["Close"]
+    mavg = g[("sma", "Close", window)]
+    std = g[("std", "Close", window)]
+    hband = mavg + window_dev * std
+    lband = mavg - window_dev * std
+    return {
+        "bb_bbm": mavg,
+        "bb_bbh": hband,
+        "bb_bbl": lband,
+        "bb_bbhi": (close > hband).astype("float64"),
+        "bb_bbli": (close < lband).astype("float64"),
+    }
+
+
+def _adi(g):
+    high, low, close, volume = g["High"], g["Low"], g["Close"], g["Volume"]
+    clv = ((close - low) - (high - close)) / (high - low)
+    clv = clv.replace([np.inf, -np.inf], np.nan).fillna(0.0)  # float division by zero
+    return {"ADI": (clv * volume).cumsum()}
+
+
+def _early(fillna):
+    # Trailing min_periods of an ema/wilder key
+    return (0,) if fillna else ()
+
+
+def _rsi(g, window=14, fillna=False):
+    emaup = g[("wilder", ("gain", "Close"), window, *_early(fillna))]
+    emadn = g[("wilder", ("loss", "Close"), window, *_early(fillna))]
+    value = 100 - (100 / (1 + emaup / emadn))
+    return {"RSI": value.mask(emadn == 0, 100.0)}
+
+
+def _macd(g, window_fast=12, window_slow=26, window_sign=9, fillna=False):
+    line_key = ("sub", ("ema", "Close", window_fast, *_early(fillna)),
+                ("ema", "Close", window_slow, *_early(fillna)))
+    line = g[line_key]
+    signal = g[("ema", line_key, window_sign, *_early(fillna))]
+    return {"MACD_Line": line, "MACD_Signal": signal, "MACD_Histogram": line - signal}
+
+
+def _sma_indicator(g, window=20):
+    return {"SMA": g[("sma", "Close", window)]}
+
+
+def _ema_indicator(g, window=26):
+    return {"EMA": g[("ema", "Close", window)]}
+
+
+def _atr(g, window=14):
+    # Seeded with the mean of the first `window` true ranges, then Wilder
+    # smoothed, as ta's AverageTrueRange
+    tr = g[("true_range",)]
+    if len(tr) < window:
+        return {"ATR": tr * np.nan}
+    values = tr.iloc[window - 1:].copy()
+    values.iloc[0] = tr.iloc[:window].mean()
+    return {"ATR": values.ewm(alpha=1 / window, adjust=False).mean().reindex(tr.index)}
+
+
+# Path-dependent overlays, computed by the loops of kernels.py. It is
+# imported when an overlay is drawn, so the first paint does not load it
+# (benchmarks/startup.py).
+
+def _psar(g, step=0.02, max_step=0.2):
+    import kernels
+    out = kernels.psar(g["High"], g["Low"], g["Close"], step, max_step)
+    return {"psar_up": out["psar_up"], "psar_down": out["psar_down"]}
+
+
+def _supertrend(g, window=10, multiplier=3.0):
+    import kernels
+    atr = _atr(g, window)["ATR"]
+    out = kernels.supertrend(g["High"], g["Low"], g["Close"], atr, multiplier)
+    line, direction = out["supertrend"], out["supertrend_direction"]
+    return {"supertrend_up": line.where(direction == 1), "supertrend_down": line.where(direction == -1)}
+
+
+def _trailing_stop(g, window=14, multiplier=3.0):
+    import kernels
+    return kernels.trailing_stop(g["Close"], _atr(g, window)["ATR"], multiplier)
+
+
+def _renko(g, size=None):
+    # Bricks of `size`, by default the last ATR(14) of each symbol
+    close = g["Close"]
+    if size is None:
+        size = _atr(g, 14)["ATR"].ffill().iloc[-1]
+    if isinstance(close, pd.DataFrame):
+        sizes = size if isinstance(size, pd.Series) else pd.Series(size, index=close.columns)
+        return {"renko": pd.DataFrame({c: _renko_level(close[c], sizes[c]) for c in close.columns})}
+    return {"renko": _renko_level(close, size)}
+
+
+def _renko_level(close, size):
+    if not size > 0:  # NaN with fewer bars than the ATR window
+        return close * np.nan
+    import kernels
+    return kernels.renko(close, float(size))["renko"]
+
+
+def ema(series, window):
+    return Graph({"Close": series})[("ema", "Close", window)]
+
+
+def bollinger(close, window=20, window_dev=2):
+    return _bollinger(Graph({"Close": close}), window, window_dev)
+
+
+def adi(high, low, close, volume):
+    return _adi(Graph({"High": high, "Low": low, "Close": close, "Volume": volume}))
+
+
+def rsi(close, window=14):
+    return _rsi(Graph({"Close": close}), window)
+
+
+def macd(close, window_fast=12, window_slow=26, window_sign=9):
+    return _macd(Graph({"Close": close}), window_fast, window_slow, window_sign)
+
+
+# --------------------- MIXED CALENDARS -----------------------
+# Wide frames put every symbol on the union of their timestamps, so in a
+# watchlist of crypto and stocks the stock columns have NaN rows for nights
+# and weekends. Run over those rows, windows and EWMs would count them as
+# bars (RSI as zero moves). Calendars packs each column's own rows to the
+# top, the indicators run on that, and unpack() puts the results back on the
+# shared index: per symbol the same values as computed alone.
+
+class Calendars:
+    def __init__(self, close):
+        valid = close.notna().to_numpy()
+        rows, columns = valid.shape
+        self.index, self.columns = close.index, close.columns
+        # Flat positions of each column's valid rows, in order, then the rest
+        order = np.argsort(~valid, axis=0, kind="stable")
+        self._flat = order * columns + np.arange(columns)
+        self._inside = np.arange(rows)[:, None] < valid.sum(axis=0)
+
+    def pack_values(self, values):
+        # values (rows x columns ndarray) with each column's rows at the top
+        values = np.asarray(values, dtype="float64").ravel().take(self._flat)
+        values[~self._inside] = np.nan
+        return values
+
+    def pack(self, frame):
+        # frame's values with each column's rows at the top (RangeIndex)
+        return pd.DataFrame(self.pack_values(frame.to_numpy(dtype="float64")), columns=frame.columns)
+
+    def unpack_values(self, values):
+        # Inverse of pack() on an ndarray; rows a column has no bar on are NaN
+        out = np.full(values.shape, np.nan)
+        out.ravel()[self._flat[self._inside]] = values[self._inside]
+        return out
+
+    def unpack(self, frame):
+        return pd.DataFrame(self.unpack_values(frame.to_numpy(dtype="float64")),
+                            index=self.index, columns=self.columns)
+
+
+# Overlay timeframe -> (resample rule, bar length)
+TIMEFRAMES = {
+    "4h": ("4h", pd.Timedelta(hours=4)),
+    "1D": ("1D", pd.Timedelta(days=1)),
+    "1W": ("W-MON", pd.Timedelta(weeks=1)),  # Monday to Monday
+}
+
+OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample(ohlcv, rule):
+    # OHLCV bars of `rule`, labelled with their closing time; empty bins
+    # (weekends for stocks) are dropped
+    agg = {c: f for c, f in OHLCV_AGG.items() if c in ohlcv.columns}
+    bars = ohlcv.resample(rule, label="right", closed="left").agg(agg)
+    return bars.dropna(subset=["Close"])
+
+
+def align(values, index):
+    # Last value labelled at or before each timestamp of `index`
+    pos = np.searchsorted(values.index.values, index.values, side="right") - 1
+    out = values.to_numpy(dtype="float64")[np.maximum(pos, 0)]
+    out[pos < 0] = np.nan
+    return pd.Series(out, index=index, name=values.name)
+
+
+def higher_timeframe(ohlcv, timeframe, indicator, **params):
+    # Close-based `indicator` (rsi, bollinger, macd) computed on `timeframe`
+    # bars and aligned onto ohlcv.index
+    rule, _ = TIMEFRAMES[timeframe]
+    bars = resample(ohlcv, rule)
+    return {name: align(values, ohlcv.index) for name, values in indicator(bars["Close"], **params).items()}
+
+
+# --------------------- REGISTRY -----------------------
+# What the dashboard and the alert engine can compute. Each entry names its
+# parameters and its outputs with the flat column names used in app.py
+# ("<group>_<label>"), so callers compute, name and plot only the indicators
+# that are switched on. Entries computed with one Graph share intermediates.
+
+class Indicator:
+    def __init__(self, key, group, outputs, function, params=None, fill=None, early=False):
+        self.key = key  # short id, used in profile stage names
+        self.group = group
+        self.outputs = outputs  # function output -> column label
+        self.function = function  # (graph, **params) -> {output: series}
+        self.params = params or {}  # defaults
+        self.fill = fill  # value for NaN with fillna, as the ta classes use
+        # With fillna, function(fillna=True) computes the warm-up rows
+        # (min_periods=0) as the ta class does, before the gaps are filled
+        self.early = early
+
+    @property
+    def columns(self):
+        return {output: f"{self.group}_{label}" for output, label in self.outputs.items()}
+
+    def __call__(self, prices, fillna=False, graph=None, **params):
+        graph = graph if graph is not None else Graph(prices)
+        params = {**self.params, **params}
+        if fillna and self.early:
+            params["fillna"] = True
+        out = self.function(graph, **params)
+        if fillna and self.fill is not None:
+            # As ta's _check_fillna
+            out = {k: v.replace([np.inf, -np.inf], np.nan).ffill().fillna(self.fill) for k, v in out.items()}
+        return out
+
+
+REGISTRY = {
+    "Bollinger Bands": Indicator(
+        "bollinger", "Bollinger Bands",
+        {"bb_bbm": "Middle", "bb_bbh": "High", "bb_bbl": "Low",
+         "bb_bbhi": "High Indicator", "bb_bbli": "Low Indicator"},
+        _bollinger, params={"window": 20, "window_dev": 2},
+    ),
+    "ADI": Indicator("adi", "Indicators", {"ADI": "ADI"}, _adi),
+    "RSI": Indicator("rsi", "Indicators", {"RSI": "RSI"}, _rsi, params={"window": 14}, fill=50.0,
+                     early=True),
+    "MACD": Indicator(
+        "macd", "MACD",
+        {"MACD_Line": "MACD Line", "MACD_Signal": "Signal Line", "MACD_Histogram": "Histogram"},
+        _macd, params={"window_fast": 12, "window_slow": 26, "window_sign": 9}, fill=0.0, early=True,
+    ),
+    "SMA": Indicator("sma", "Moving Averages", {"SMA": "SMA"}, _sma_indicator, params={"window": 20}),
+    "EMA": Indicator("ema", "Moving Averages", {"EMA": "EMA"}, _ema_indicator, params={"window": 26}),
+    "ATR": Indicator("atr", "Indicators", {"ATR": "ATR"}, _atr, params={"window": 14}, fill=0.0),
+    "Parabolic SAR": Indicator(
+        "psar", "Parabolic SAR", {"psar_up": "Up", "psar_down": "Down"}, _psar,
+        params={"step": 0.02, "max_step": 0.2},
+    ),
+    "SuperTrend": Indicator(
+        "supertrend", "SuperTrend", {"supertrend_up": "Up", "supertrend_down": "Down"}, _supertrend,
+        params={"window": 10, "multiplier": 3.0},
+    ),
+    "Trailing Stop": Indicator(
+        "trailing_stop", "Trailing Stop", {"trailing_stop": "Stop"}, _trailing_stop,
+        params={"window": 14, "multiplier": 3.0},
+    ),
+    "Renko": Indicator("renko", "Renko", {"renko": "Level"}, _renko, params={"size": None}),
+}
+
+# Switched on when the dashboard opens
+DEFAULT_INDICATORS = ["Bollinger Bands", "ADI", "RSI", "MACD"]
+
+
+def providing(fields):
+    # Registry names whose outputs include any of `fields`
+    return [name for name, ind in REGISTRY.items() if set(ind.outputs) & set(fields)]
+
+
+def compute(prices, names=None, params=None, graph=None):
+    # Outputs of the named indicators (all by default); params maps a name to
+    # parameter overrides. prices maps "Open"... "Volume" to Series or wide
+    # frames; pass a kept Graph to reuse its nodes.
+    params = params or {}
+    if graph is None:
+        graph = Graph(prices)
+    else:
+        graph.update(prices)
+    out = {}
+    for name in names if names is not None else REGISTRY:
+        out.update(REGISTRY[name](prices, graph=graph, **params.get(name, {})))
+    return out
+
+
+def compute_all(high, low, close, volume, rsi_window=14, macd_windows=(12, 26, 9)):
+    # The four indicator groups of app.py with its default parameters
+    fast, slow, sign = macd_windows
+    return compute(
+        {"High": high, "Low": low, "Close": close, "Volume": volume},
+        DEFAULT_INDICATORS,
+        params={"RSI": {"window": rsi_window},
+                "MACD": {"window_fast": fast, "window_slow": slow, "window_sign": sign}},
+    )
+
+
+def compute_on_calendars(prices, names=None, params=None):
+    # compute() for wide frames whose symbols trade on different calendars
+    calendars = Calendars(prices["Close"])
+    packed = {field: calendars.pack(values) for field, values in prices.items() if field in FIELDS}
+    return {k: calendars.unpack(v) for k, v in compute(packed, names, params).items()}
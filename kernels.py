@@ -0,0 +1,280 @@
+# Path-dependent indicators: Parabolic SAR, SuperTrend, ATR trailing stop
+# and Renko bricks. Each bar depends on the previous output through a branch
+# (a reversal, a band that only ratchets one way), so they have no pandas or
+# NumPy form and are written as plain loops over one column.
+#
+# The loops only use what Numba compiles (indexing, arithmetic, math), so
+# with Numba installed they are compiled to machine code on first use
+# (cached in __pycache__); without it the same functions run as
+# Python over lists, which is several times faster than indexing NumPy
+# arrays element by element. The default backend is "numba" when it is
+# importable, otherwise "python"; KERNEL_BACKEND=python forces the fallback.
+# Both give the same values (benchmarks/kernels.py). Numba is only imported
+# when the first kernel runs (backends()), so importing this module, and
+# indicators.py with it, stays cheap for pages that never draw an overlay.
+#
+# The functions below take Series or frames with one column per symbol, like
+# those of indicators.py, and loop over the columns.
+
+import functools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# --------------------- KERNELS -----------------------
+# Inputs are sequences of one column; outputs are filled into the sequences
+# passed last. NaN inputs (warm-up, bars before a listing) give NaN outputs.
+
+def _psar(high, low, close, step, max_step, psar, up, down):
+    # As ta's PSARIndicator: starts in an uptrend on the third bar
+    n = len(close)
+    for i in range(min(n, 2)):
+        psar[i] = close[i]
+        up[i] = math.nan
+        down[i] = math.nan
+    if n < 3:
+        return
+    up_trend = True
+    factor = step
+    up_trend_high = high[0]
+    down_trend_low = low[0]
+    for i in range(2, n):
+        reversal = False
+        if up_trend:
+            value = psar[i - 1] + factor * (up_trend_high - psar[i - 1])
+            if low[i] < value:
+                reversal = True
+                value = up_trend_high
+                down_trend_low = low[i]
+                factor = step
+            else:
+                if high[i] > up_trend_high:
+                    up_trend_high = high[i]
+                    factor = min(factor + step, max_step)
+                if low[i - 2] < value:
+                    value = low[i - 2]
+                elif low[i - 1] < value:
+                    value = low[i - 1]
+        else:
+            value = psar[i - 1] - factor * (psar[i - 1] - down_trend_low)
+            if high[i] > value:
+                reversal = True
+                value = down_trend_low
+                up_trend_high = high[i]
+                factor = step
+            else:
+                if low[i] < down_trend_low:
+                    down_trend_low = low[i]
+                    factor = min(factor + step, max_step)
+                if high[i - 2] > value:
+                    value = high[i - 2]
+                elif high[i - 1] > value:
+                    value = high[i - 1]
+        up_trend = up_trend != reversal
+        psar[i] = value
+        up[i] = value if up_trend else math.nan
+        down[i] = math.nan if up_trend else value
+
+
+def _supertrend(high, low, close, atr, multiplier, line, direction):
+    # Bands at (high + low) / 2 -/+ multiplier * ATR that only tighten while
+    # the close stays inside them; the line is the lower band in an uptrend
+    # (direction 1) and the upper band in a downtrend (-1)
+    upper = lower = math.nan
+    trend = 0
+    for i in range(len(close)):
+        if math.isnan(atr[i]) or math.isnan(close[i]):
+            line[i] = math.nan
+            direction[i] = math.nan
+            trend = 0
+            continue
+        middle = (high[i] + low[i]) / 2
+        basic_upper = middle + multiplier * atr[i]
+        basic_lower = middle - multiplier * atr[i]
+        if trend == 0:
+            upper, lower = basic_upper, basic_lower
+            trend = 1 if close[i] >= middle else -1
+        else:
+            if basic_upper < upper or close[i - 1] > upper:
+                upper = basic_upper
+            if basic_lower > lower or close[i - 1] < lower:
+                lower = basic_lower
+            if trend == 1 and close[i] < lower:
+                trend = -1
+            elif trend == -1 and close[i] > upper:
+                trend = 1
+        line[i] = lower if trend == 1 else upper
+        direction[i] = trend
+
+
+def _trailing_stop(close, atr, multiplier, stop):
+    # ATR trailing stop: multiplier * ATR below the close while it stays
+    # above the stop, only ever raised; above the close (only lowered) once it
+    # crosses below
+    previous = math.nan
+    for i in range(len(close)):
+        if math.isnan(atr[i]) or math.isnan(close[i]):
+            stop[i] = previous = math.nan
+            continue
+        loss = multiplier * atr[i]
+        if math.isnan(previous):
+            value = close[i] - loss
+        elif close[i] > previous and close[i - 1] > previous:
+            value = max(previous, close[i] - loss)
+        elif close[i] < previous and close[i - 1] < previous:
+            value = min(previous, close[i] + loss)
+        elif close[i] > previous:
+            value = close[i] - loss
+        else:
+            value = close[i] + loss
+        stop[i] = previous = value
+
+
+def _renko(close, size, level, direction, count):
+    # Close-based bricks of a fixed size: per bar the close of the last brick,
+    # its direction (1 up, -1 down) and the number of bricks so far. A
+    # reversal takes two brick sizes from the last close.
+    last = math.nan
+    trend = 0
+    bricks = 0
+    for i in range(len(close)):
+        price = close[i]
+        if math.isnan(price):
+            level[i] = last
+            direction[i] = trend
+            count[i] = bricks
+            continue
+        if math.isnan(last):
+            last = price
+        rise = size if trend >= 0 else 2 * size
+        fall = size if trend <= 0 else 2 * size
+        if price >= last + rise:
+            more = math.floor((price - last - rise) / size)
+            last += rise + more * size
+            trend = 1
+            bricks += 1 + more
+        elif price <= last - fall:
+            more = math.floor((last - fall - price) / size)
+            last -= fall + more * size
+            trend = -1
+            bricks += 1 + more
+        level[i] = last
+        direction[i] = trend
+        count[i] = bricks
+
+
+KERNELS = {"psar": (_psar, 3), "supertrend": (_supertrend, 2), "trailing_stop": (_trailing_stop, 1),
+           "renko": (_renko, 3)}  # kernel, number of outputs
+
+
+def _python(kernel, outputs):
+    def run(*args):
+        n = len(args[0])
+        args = [a.tolist() if isinstance(a, np.ndarray) else a for a in args]
+        out = [[math.nan] * n for _ in range(outputs)]
+        kernel(*args, *out)
+        return [np.array(o, dtype="float64") for o in out]
+    return run
+
+
+def _numba(numba, kernel, outputs):
+    compiled = numba.njit(cache=True, nogil=True)(kernel)
+
+    def run(*args):
+        n = len(args[0])
+        out = [np.empty(n) for _ in range(outputs)]
+        compiled(*args, *out)
+        return out
+    return run
+
+
+@functools.lru_cache(maxsize=None)
+def _load():
+    try:
+        import numba
+    except ImportError:
+        numba = None
+    backends = {"python": {name: _python(*k) for name, k in KERNELS.items()}}
+    if numba is not None:
+        backends["numba"] = {name: _numba(numba, *k) for name, k in KERNELS.items()}
+    default = os.environ.get("KERNEL_BACKEND") or ("numba" if numba is not None else "python")
+    if default not in backends:
+        raise ValueError(f"KERNEL_BACKEND={default} is not available; use {', '.join(backends)}")
+    return backends, default
+
+
+def backends():
+    # Backend name -> {kernel name: run}; imports Numba on the first call
+    return _load()[0]
+
+
+def default_backend():
+    return _load()[1]
+
+
+def run(name, columns, *params, backend=None):
+    # Kernel outputs for every column of `columns` (Series or frames of the
+    # same shape), as Series or frames like the first one
+    kernel = backends()[backend or default_backend()][name]
+    like = columns[0]
+    if isinstance(like, pd.Series):
+        arrays = [c.to_numpy(dtype="float64") for c in columns]
+        return [pd.Series(o, index=like.index) for o in kernel(*arrays, *params)]
+    # A symbol listed later than the others starts at its first bar (the
+    # first valid value of the last input)
+    frames = [c.to_numpy(dtype="float64") for c in columns]
+    valid = ~np.isnan(frames[-1])
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), len(valid))
+    out = [np.full(like.shape, np.nan) for _ in range(KERNELS[name][1])]
+    for j in range(like.shape[1]):
+        if first[j] == len(valid):
+            continue
+        arrays = (np.ascontiguousarray(f[first[j]:, j]) for f in frames)
+        for o, values in zip(out, kernel(*arrays, *params)):
+            o[first[j]:, j] = values
+    return [pd.DataFrame(o, index=like.index, columns=like.columns) for o in out]
+
+
+# --------------------- INDICATORS -----------------------
+
+def psar(high, low, close, step=0.02, max_step=0.2, backend=None):
+    # Parabolic SAR; up holds it in uptrends, down in downtrends (NaN
+    # otherwise)
+    value, up, down = run("psar", (high, low, close), float(step), float(max_step), backend=backend)
+    return {"psar": value, "psar_up": up, "psar_down": down}
+
+
+def supertrend(high, low, close, atr, multiplier=3.0, backend=None):
+    line, direction = run("supertrend", (high, low, close, atr), float(multiplier), backend=backend)
+    return {"supertrend": line, "supertrend_direction": direction}
+
+
+def trailing_stop(close, atr, multiplier=3.0, backend=None):
+    return {"trailing_stop": run("trailing_stop", (close, atr), float(multiplier), backend=backend)[0]}
+
+
+def renko(close, size, backend=None):
+    # Per bar: close of the last Renko brick, its direction and the brick
+    # count; renko_bricks() turns them into the bricks
+    level, direction, count = run("renko", (close,), float(size), backend=backend)
+    return {"renko": level, "renko_direction": direction, "renko_count": count}
+
+
+def renko_bricks(renko_values, size):
+    # (open, close, bar) per brick from renko() of one symbol. The bricks of
+    # a bar close on its level and step back from it by one size each.
+    level = renko_values["renko"].to_numpy()
+    direction = renko_values["renko_direction"].to_numpy()
+    count = renko_values["renko_count"].to_numpy().astype("int64")
+    new = np.diff(count, prepend=0)
+    bars = np.repeat(np.arange(len(count)), new)
+    back = np.arange(len(bars)) - np.repeat(count - new, new)  # 0 ... new - 1 within a bar
+    closes = level[bars] - direction[bars] * size * (new[bars] - 1 - back)
+    return pd.DataFrame({
+        "open": closes - direction[bars] * size,
+        "close": closes,
+        "bar": renko_values["renko"].index[bars],
+    })
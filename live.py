@@ -0,0 +1,318 @@
+# Live mode for the 1m interval.
+#
+# A feed delivers new (or revised) bars, they are stored in a fixed-size
+# NumPy ring buffer, indicators are advanced one bar at a time from their
+# previous state, and the chart traces are extended with the new points
+# instead of being rebuilt. app.py drives this from an st.fragment so only
+# the live chart reruns, not the download and the rest of the page.
+#
+# Streamlit sends the whole figure on every tick, so the chart only holds
+# the last `window` bars (not the whole buffer), as epoch milliseconds and
+# NumPy arrays (base64 typed arrays, see charts.py): the payload per tick
+# stays the same however long the session runs.
+
+import time
+
+import numpy as np
+import pandas as pd
+
+import fetch
+import perf
+import providers
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+# --------------------- RING BUFFER -----------------------
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype="int64")  # epoch nanoseconds
+        self.values = np.zeros((capacity, len(FIELDS)), dtype="float64")
+        self._next = 0  # slot the next bar goes into
+        self.size = 0
+
+    def _last_slot(self):
+        return (self._next - 1) % self.capacity
+
+    @property
+    def last_time(self):
+        return int(self.times[self._last_slot()]) if self.size else None
+
+    def append(self, ts, bar):
+        # A bar with the same timestamp as the newest one is a revision of the
+        # still-forming bar and overwrites it
+        if self.size and ts == self.last_time:
+            self.values[self._last_slot()] = bar
+            return False
+        self.times[self._next] = ts
+        self.values[self._next] = bar
+        self._next = (self._next + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return True
+
+    def tail(self, n):
+        # Last n bars in chronological order
+        n = min(n, self.size)
+        idx = (np.arange(self._next - n, self._next)) % self.capacity
+        return self.times[idx], self.values[idx]
+
+    def to_frame(self):
+        times, values = self.tail(self.size)
+        return pd.DataFrame(
+            values,
+            index=pd.to_datetime(times, utc=True),
+            columns=[f.capitalize() for f in FIELDS],
+        )
+
+
+# --------------------- FEEDS -----------------------
+# A feed returns a list of (epoch_ns, [open, high, low, close, volume]) bars
+# that are new or revised since the previous poll.
+
+class Feed:
+    def poll(self):
+        raise NotImplementedError
+
+
+class SimulatedFeed(Feed):
+    # Geometric random walk producing one bar per `bar_seconds` of wall time;
+    # with speed > 1 bars arrive faster than real time (useful for testing)
+    def __init__(self, last_close=100.0, last_time=None, bar_seconds=60, speed=1.0,
+                 volatility=0.001, seed=None):
+        self.close = float(last_close)
+        self.bar_ns = int(bar_seconds * 1e9)
+        now = time.time_ns() // self.bar_ns * self.bar_ns
+        self.time = last_time if last_time is not None else now - self.bar_ns
+        self.speed = speed
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+        self._wall = time.monotonic()
+
+    def poll(self):
+        elapsed = (time.monotonic() - self._wall) * self.speed
+        n = int(elapsed * 1e9 // self.bar_ns)
+        if n == 0:
+            return []
+        self._wall += n * self.bar_ns / 1e9 / self.speed
+
+        returns = self.rng.normal(0.0, self.volatility, size=(n, 4))
+        bars = []
+        for r in returns:
+            open_ = self.close
+            path = open_ * np.exp(np.cumsum(r))
+            close = path[-1]
+            bar = [open_, max(open_, path.max()), min(open_, path.min()), close,
+                   float(self.rng.integers(1, 1000))]
+            self.time += self.bar_ns
+            self.close = close
+            bars.append((self.time, bar))
+        return bars
+
+
+class YFinanceFeed(Feed):
+    # Polls today's 1m bars through the provider layer (providers.py), behind
+    # the same rate limiter and circuit breaker as data.get_data(), and
+    # returns the ones at or after the newest bar already seen (the newest
+    # one may still be forming). While the provider is unavailable a poll
+    # returns no bars and the chart keeps the ones it has; `unavailable`
+    # holds the reason until a poll succeeds again.
+    def __init__(self, symbol, last_time=None):
+        self.symbol = symbol
+        self.last_time = last_time
+        self.unavailable = None
+
+    def poll(self):
+        request = ("1d", "1m", None, None)
+        try:
+            provider = providers.select_provider(self.symbol, *request)
+            perf.registry.inc("crypto_app_provider_requests_total", [("provider", provider.name)])
+            df = fetch.call(
+                lambda: provider.download(self.symbol, *request),
+                limiter=provider.limiter,
+                breaker=provider.breaker,
+                attempts=2,
+            )
+        except fetch.ProviderUnavailable as e:
+            self.unavailable = str(e)
+            return []
+        except fetch.NoDataError:
+            return []
+        self.unavailable = None
+        times = df.index.tz_convert("UTC").asi8 if df.index.tz else df.index.asi8
+        values = df[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype="float64")
+        if self.last_time is not None:
+            keep = times >= self.last_time
+            times, values = times[keep], values[keep]
+        if len(times):
+            self.last_time = int(times[-1])
+        return list(zip(times.tolist(), values))
+
+
+FEEDS = {
+    "Simulator": SimulatedFeed,
+    "yfinance": YFinanceFeed,
+}
+
+
+# --------------------- INCREMENTAL INDICATORS -----------------------
+# Same definitions as the ta classes used in app.py (ewm with adjust=False,
+# seeded with the first value, NaN until `window` values have been seen).
+# update() returns the new value; update(..., revise=True) first rolls back
+# the previous update, for when the still-forming bar is revised.
+
+class EMA:
+    def __init__(self, window=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.min_periods = window or 1
+        self.value = None
+        self.count = 0
+        self._saved = (None, 0)
+
+    def update(self, x, revise=False):
+        if revise:
+            self.value, self.count = self._saved
+        self._saved = (self.value, self.count)
+        if not np.isnan(x):
+            self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+            self.count += 1
+        return self.value if self.count >= self.min_periods else np.nan
+
+
+class RSI:
+    def __init__(self, window=14):
+        self.up = EMA(window, alpha=1.0 / window)
+        self.down = EMA(window, alpha=1.0 / window)
+        self.up.min_periods = self.down.min_periods = window
+        self.prev = None
+        self._saved = None
+
+    def update(self, close, revise=False):
+        if revise:
+            self.prev = self._saved
+        self._saved = self.prev
+        diff = np.nan if self.prev is None else close - self.prev
+        self.prev = close
+        # ta counts the leading NaN diff as a zero move
+        up = self.up.update(diff if diff > 0 else 0.0, revise)
+        down = self.down.update(-diff if diff < 0 else 0.0, revise)
+        if np.isnan(down):
+            return np.nan
+        return 100.0 if down == 0 else 100.0 - 100.0 / (1.0 + up / down)
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, sign=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(sign)
+
+    def update(self, close, revise=False):
+        macd = self.fast.update(close, revise) - self.slow.update(close, revise)
+        signal = self.signal.update(macd, revise)
+        return macd, signal, macd - signal
+
+
+def bollinger(closes, window=20, window_dev=2):
+    # Needs only the last `window` closes, which the ring buffer already holds
+    if len(closes) < window:
+        return np.nan, np.nan, np.nan
+    last = closes[-window:]
+    mavg = last.mean()
+    std = last.std()  # ddof=0, as in ta
+    return mavg, mavg + window_dev * std, mavg - window_dev * std
+
+
+# --------------------- LIVE SESSION -----------------------
+
+TRACES = ("Close", "Bollinger Middle", "Bollinger High", "Bollinger Low",
+          "RSI", "MACD Line", "Signal Line", "MACD Histogram")
+
+
+class LiveSession:
+    def __init__(self, feed, history=None, capacity=1440, rsi_window=14,
+                 macd_windows=(12, 26, 9), bb_window=20, window=240):
+        self.feed = feed
+        self.buffer = RingBuffer(capacity)
+        self.window = min(window, capacity)  # bars on the chart
+        self.rsi = RSI(rsi_window)
+        self.macd = MACD(*macd_windows)
+        self.bb_window = bb_window
+        self.figure = self._empty_figure()
+        self._x = []
+        self._y = [[] for _ in TRACES]
+
+        if history is not None and not history.empty:
+            # Warm the indicators up on the bars that are already on screen
+            times = history.index.tz_convert("UTC").asi8 if history.index.tz else history.index.asi8
+            values = history[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype="float64")
+            self.push(list(zip(times.tolist(), values)))
+
+    def _empty_figure(self):
+        from plotly.subplots import make_subplots
+        import plotly.graph_objects as go
+
+        fig = make_subplots(rows=3, cols=1, shared_xaxes=True, row_heights=[0.6, 0.2, 0.2],
+                            vertical_spacing=0.03)
+        colors = ("blue", "orange", "green", "red", "brown", "blue", "orange", "green")
+        rows = (1, 1, 1, 1, 2, 3, 3, 3)
+        for name, color, row in zip(TRACES, colors, rows):
+            if name == "MACD Histogram":
+                trace = go.Bar(x=[], y=[], name=name, marker_color=color, opacity=0.5)
+            else:
+                trace = go.Scatter(x=[], y=[], mode="lines", name=name, line=dict(color=color))
+            fig.add_trace(trace, row=row, col=1)
+        fig.add_hline(y=70, line_dash="dot", line_color="red", row=2, col=1)
+        fig.add_hline(y=30, line_dash="dot", line_color="green", row=2, col=1)
+        fig.update_yaxes(range=[0, 100], row=2, col=1)
+        fig.update_xaxes(type="date")
+        fig.update_layout(height=700, width=1000, uirevision="live",
+                          legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+        return fig
+
+    def push(self, bars):
+        # Returns the number of bars that were appended (revisions excluded)
+        new_points = []  # (is_new, epoch_ns, [values per trace])
+        for ts, bar in bars:
+            is_new = self.buffer.append(ts, bar)
+            close = bar[3]
+            revise = not is_new
+            rsi = self.rsi.update(close, revise)
+            macd = self.macd.update(close, revise)
+            _, values = self.buffer.tail(self.bb_window)
+            bb = bollinger(values[:, 3], self.bb_window)
+            new_points.append((is_new, ts, (close, *bb, rsi, *macd)))
+        self._extend_traces(new_points)
+        return sum(1 for is_new, _, _ in new_points if is_new)
+
+    def _extend_traces(self, points):
+        # Appends the new points to the kept x/y lists (a revision replaces
+        # the last one) and trims them to the chart window, instead of
+        # rebuilding them from the figure
+        if not points:
+            return
+        for is_new, ts, values in points:
+            if not is_new and self._x:
+                self._x.pop()
+                for y in self._y:
+                    y.pop()
+            self._x.append(ts // 10**6)  # epoch ms, UTC
+            for y, value in zip(self._y, values):
+                y.append(value)
+
+        excess = len(self._x) - self.window
+        if excess > 0:
+            del self._x[:excess]
+            for y in self._y:
+                del y[:excess]
+
+        # Only the trace arrays change; layout, axes and hlines are untouched
+        with self.figure.batch_update():
+            x = np.array(self._x, dtype="float64")  # plotly.js has no int64 arrays
+            for trace, y in zip(self.figure.data, self._y):
+                trace.x = x
+                trace.y = np.array(y, dtype="float64")
+
+    def poll(self):
+        return self.push(self.feed.poll())
@@ -0,0 +1,260 @@
+# Indicator columns materialized next to the OHLCV archive.
+#
+# For every archived series the dashboard's default indicators (Bollinger
+# 20/2, ADI, RSI 14, MACD 12/26/9) are stored as one more archive (archive.py)
+# in <SYMBOL>_<interval>/indicators/, under a name derived from
+# indicators.VERSION and the parameters, so a formula or parameter change
+# starts a new copy instead of mixing old and new values.
+#
+# When bars are appended to the series only the new rows are computed. The
+# last close, the EWM states behind RSI and MACD, the last ADI value and the
+# Bollinger window are kept in meta.json; an adjust=False EWM continued from
+# its saved state gives the same values as a full recompute, the rolling
+# Bollinger and cumulative ADI agree to float rounding.
+#
+# read() serves the columns for a frame that is a contiguous run of the
+# archived bars (plus newer bars, computed from the saved state), as if the
+# indicators had been computed on the frame alone: the first rows are
+# masked and ADI is re-based to start at the frame. The stored RSI and MACD
+# EWMs started at the first archived bar, not at the frame's; the weight of
+# that start falls by (1 - alpha) per bar, so the first _settle() rows of
+# RSI and MACD are computed on the frame and the stored rows after them
+# agree with a computation on the frame to float rounding.
+#
+#   python materialize.py BTC-USD 1m   # build or extend now
+
+import hashlib
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import archive
+import indicators
+
+# The registry defaults, which app.py reads materialized
+DEFAULT_PARAMS = {
+    "bb_window": indicators.REGISTRY["Bollinger Bands"].params["window"],
+    "bb_dev": indicators.REGISTRY["Bollinger Bands"].params["window_dev"],
+    "rsi_window": indicators.REGISTRY["RSI"].params["window"],
+    "macd_windows": list(indicators.REGISTRY["MACD"].params.values()),
+}
+
+# Weight below which the start of an EWM no longer shows in its values
+SETTLED = 1e-13
+
+# In the order of the renaming step in app.py
+COLUMNS = [
+    "bb_bbm", "bb_bbh", "bb_bbl", "bb_bbhi", "bb_bbli",
+    "ADI", "RSI",
+    "MACD_Line", "MACD_Signal", "MACD_Histogram",
+]
+
+
+def name(params):
+    blob = json.dumps({"version": indicators.VERSION, **params}, sort_keys=True)
+    return f"V{indicators.VERSION}-{hashlib.sha1(blob.encode()).hexdigest()[:10].upper()}"
+
+
+def clean(ohlcv):
+    # Rows ta.utils.dropna() keeps: no NaN, zero or value above exp(709)
+    values = ohlcv[archive.COLUMNS].to_numpy()
+    keep = ((values < np.exp(709)) & (values != 0)).all(axis=1)
+    return ohlcv[keep]
+
+
+def _warmup(params):
+    fast, slow, sign = params["macd_windows"]
+    return max(params["bb_window"], params["rsi_window"], slow + sign)
+
+
+def _settle(params):
+    # Bars until the start of the RSI and MACD EWMs weighs less than SETTLED;
+    # the signal line smooths the MACD line, so their spans add up
+    fast, slow, sign = params["macd_windows"]
+
+    def bars(alpha):
+        return math.ceil(math.log(SETTLED) / math.log(1 - alpha))
+    return max(bars(1 / params["rsi_window"]), bars(2 / (slow + 1)) + bars(2 / (sign + 1)))
+
+
+def _ewm_last(values, alpha):
+    return float(values.ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+
+
+def _continue(state, values, alpha):
+    # adjust=False EWM of `values` picking up from a previous output `state`
+    series = pd.Series(np.concatenate(([state], values)))
+    return series.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _full(bars, params):
+    # Indicator frame and extension state for a whole series
+    fast, slow, sign = params["macd_windows"]
+    n = params["rsi_window"]
+    high, low, close, volume = bars["High"], bars["Low"], bars["Close"], bars["Volume"]
+    out = {}
+    out.update(indicators.bollinger(close, params["bb_window"], params["bb_dev"]))
+    out.update(indicators.adi(high, low, close, volume))
+    out.update(indicators.rsi(close, n))
+    out.update(indicators.macd(close, fast, slow, sign))
+    frame = pd.DataFrame(out, index=bars.index)[COLUMNS]
+
+    diff = close.diff(1)
+    state = {
+        "closes": close.iloc[-(params["bb_window"] - 1):].tolist() if params["bb_window"] > 1 else [],
+        "close": float(close.iloc[-1]),
+        "up": _ewm_last(diff.where(diff > 0, 0.0), 1 / n),
+        "down": _ewm_last(-diff.where(diff < 0, 0.0), 1 / n),
+        "fast": _ewm_last(close, 2 / (fast + 1)),
+        "slow": _ewm_last(close, 2 / (slow + 1)),
+        "signal": float(frame["MACD_Signal"].iloc[-1]),
+        "adi": float(frame["ADI"].iloc[-1]),
+    }
+    return frame, state
+
+
+def _extend(bars, params, state):
+    # Indicator frame and new state for bars following the saved state
+    fast, slow, sign = params["macd_windows"]
+    n = params["rsi_window"]
+    w = params["bb_window"]
+    high, low, close, volume = (bars[c].to_numpy(dtype="float64") for c in ("High", "Low", "Close", "Volume"))
+
+    window = pd.Series(np.concatenate((state["closes"], close)))
+    mavg = window.rolling(w, min_periods=w).mean().to_numpy()[-len(close):]
+    std = window.rolling(w, min_periods=w).std(ddof=0).to_numpy()[-len(close):]
+    hband = mavg + params["bb_dev"] * std
+    lband = mavg - params["bb_dev"] * std
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        clv = ((close - low) - (high - close)) / (high - low)
+    clv[~np.isfinite(clv)] = 0.0
+    adi = state["adi"] + np.cumsum(clv * volume)
+
+    diff = np.diff(np.concatenate(([state["close"]], close)))
+    up = _continue(state["up"], np.where(diff > 0, diff, 0.0), 1 / n)
+    down = _continue(state["down"], np.where(diff < 0, -diff, 0.0), 1 / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + up / down))
+    rsi[down == 0] = 100.0
+
+    ema_fast = _continue(state["fast"], close, 2 / (fast + 1))
+    ema_slow = _continue(state["slow"], close, 2 / (slow + 1))
+    line = ema_fast - ema_slow
+    signal = _continue(state["signal"], line, 2 / (sign + 1))
+
+    frame = pd.DataFrame({
+        "bb_bbm": mavg, "bb_bbh": hband, "bb_bbl": lband,
+        "bb_bbhi": (close > hband).astype("float64"), "bb_bbli": (close < lband).astype("float64"),
+        "ADI": adi, "RSI": rsi,
+        "MACD_Line": line, "MACD_Signal": signal, "MACD_Histogram": line - signal,
+    }, index=bars.index)
+    state = {
+        "closes": window.iloc[len(window) - (w - 1):].tolist() if w > 1 else [],
+        "close": float(close[-1]),
+        "up": float(up[-1]),
+        "down": float(down[-1]),
+        "fast": float(ema_fast[-1]),
+        "slow": float(ema_slow[-1]),
+        "signal": float(signal[-1]),
+        "adi": float(adi[-1]),
+    }
+    return frame, state
+
+
+class IndicatorStore:
+    def __init__(self, ohlcv, params=None):
+        self.ohlcv = ohlcv  # archive.Archive holding the bars
+        self.params = params or DEFAULT_PARAMS
+        self.name = name(self.params)
+        self._stores = {}  # (symbol, interval) -> archive.Archive
+
+    def _store(self, symbol, interval):
+        store = self._stores.get((symbol, interval))
+        if store is None:
+            root = os.path.join(self.ohlcv._path(symbol, interval), "indicators")
+            store = self._stores[(symbol, interval)] = archive.Archive(root, columns=COLUMNS)
+        return store
+
+    def update(self, symbol, interval):
+        # Builds or extends the materialized columns; returns the rows written
+        source = self.ohlcv.series(symbol, interval)
+        if source is None or source.rows == 0:
+            return 0
+        store = self._store(symbol, interval)
+        current = store.series(self.name, interval)
+        done = current.meta["source_rows"] if current is not None else 0
+        if current is not None and (done > source.rows or current.meta["source_last"] != int(source.time[done - 1])):
+            # The bars were rewritten underneath
+            store.remove(self.name, interval)
+            current, done = None, 0
+        if done == source.rows:
+            return 0
+
+        extra = {"source_rows": source.rows, "source_last": int(source.time[-1]), "params": self.params}
+        if current is None:
+            bars = clean(source.slice())
+            if len(bars) < _warmup(self.params):
+                return 0
+            frame, state = _full(bars, self.params)
+        else:
+            bars = clean(source.slice(start=source._timestamp(source.time[done])))
+            if bars.empty:
+                # Only rows dropped by clean() arrived; they are read again
+                # with the next extension
+                return 0
+            frame, state = _extend(bars, self.params, current.meta["state"])
+        extra["state"] = state
+        return store.append(self.name, interval, frame, extra=extra)
+
+    def read(self, symbol, interval, df):
+        # Indicator frame for df (cleaned bars with yfinance column names), or
+        # None when df is not a contiguous run of the materialized bars
+        current = self._store(symbol, interval).series(self.name, interval)
+        if current is None or df.empty:
+            return None
+        times = current.time
+        # A naive index is UTC, as Archive.append() stores it
+        index = df.index.tz_localize("UTC") if df.index.tz is None else df.index
+        stamps = index.tz_convert("UTC").as_unit("ns").asi8
+        inside = int(np.searchsorted(stamps, times[-1], side="right"))
+        if inside == 0:
+            return None
+        pos = np.searchsorted(times, stamps[:inside])
+        if pos[-1] >= current.rows or (times[pos] != stamps[:inside]).any() or pos[-1] - pos[0] != inside - 1:
+            return None
+        if inside < len(df) and pos[-1] != current.rows - 1:
+            return None
+
+        frame = current.slice(current._timestamp(times[pos[0]]), None).iloc[:inside]
+        frame = frame.set_axis(df.index[:inside]).copy()
+        if inside < len(df):
+            newer, _ = _extend(df.iloc[inside:], self.params, current.meta["state"])
+            frame = pd.concat([frame, newer])
+
+        # As if computed on df alone
+        fast, slow, sign = self.params["macd_windows"]
+        if pos[0] > 0:
+            frame["ADI"] -= current.columns["ADI"][pos[0] - 1]
+        bb_columns = ["bb_bbm", "bb_bbh", "bb_bbl"]
+        frame.iloc[:self.params["bb_window"] - 1, frame.columns.get_indexer(bb_columns)] = np.nan
+        frame.iloc[:self.params["bb_window"] - 1, frame.columns.get_indexer(["bb_bbhi", "bb_bbli"])] = 0.0
+        frame.iloc[:self.params["rsi_window"] - 1, frame.columns.get_loc("RSI")] = np.nan
+        frame.iloc[:slow - 1, frame.columns.get_loc("MACD_Line")] = np.nan
+        frame.iloc[:slow + sign - 2, frame.columns.get_indexer(["MACD_Signal", "MACD_Histogram"])] = np.nan
+        if pos[0] > 0:
+            head = df["Close"].iloc[:_settle(self.params)]
+            seeded = {**indicators.rsi(head, self.params["rsi_window"]), **indicators.macd(head, fast, slow, sign)}
+            for column in ("RSI", "MACD_Line", "MACD_Signal", "MACD_Histogram"):
+                frame.iloc[:len(head), frame.columns.get_loc(column)] = seeded[column].to_numpy()
+        return frame
+
+
+if __name__ == "__main__":
+    symbol, interval = sys.argv[1:3]
+    ohlcv = archive.Archive(os.environ.get("ARCHIVE_DIR", os.path.join(".cache", "ohlcv")))
+    print(f"{IndicatorStore(ohlcv).update(symbol.upper(), interval)} rows materialized")
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import analytics
+from data import get_closes
+
+
+st.title("Cross-Asset Correlation")
+st.sidebar.header("Universe")
+
+
+def parse_symbols(text):
+    symbols = [s.strip().upper() for s in text.replace(",", "\n").splitlines()]
+    return list(dict.fromkeys(s for s in symbols if s))
+
+
+symbols = parse_symbols(st.sidebar.text_area(
+    "Symbols (comma or newline separated):",
+    "BTC-USD, ETH-USD, SOL-USD, AAPL, MSFT, NVDA, SPY, GLD",
+))
+period = st.sidebar.selectbox("Period:", ['3mo', '6mo', '1y', '2y', '5y'], index=2)
+window = st.sidebar.slider("Rolling window (days)", min_value=10, max_value=250, value=60, step=5)
+calendar = st.sidebar.radio(
+    "Calendar alignment:",
+    ["Common trading days", "Every day (carry prices forward)"],
+    help="Crypto trades every day, stocks only on exchange sessions",
+)
+
+if len(symbols) < 2:
+    st.info("Enter at least two symbols.")
+    st.stop()
+
+closes = get_closes(symbols, period, "1d")
+missing = [s for s in symbols if s not in closes]
+if missing:
+    st.warning(f"No data for: {', '.join(missing)}")
+
+reports = [c.attrs["completeness"] for c in closes.values() if c.attrs.get("completeness")]
+if any(r["missing"] for r in reports):
+    with st.expander("Data completeness"):
+        st.dataframe(
+            pd.DataFrame(reports).set_index("symbol").drop(columns="gaps")
+            .sort_values("completeness").style.format({"completeness": "{:.2%}"})
+        )
+
+prices = analytics.align_prices(closes, how="inner" if calendar.startswith("Common") else "outer")
+returns = analytics.log_returns(prices)
+periods_per_year = analytics.periods_per_year(returns.index)
+
+if len(returns) < window:
+    st.error(f"Only {len(returns)} aligned returns, fewer than the {window}-day window.")
+    st.stop()
+
+
+# --------------------- CORRELATION MATRIX -----------------------
+# One (window x N)'(window x N) product for the selected window end
+
+end = st.select_slider(
+    "Window ending on:",
+    options=list(returns.index[window - 1:]),
+    value=returns.index[-1],
+    format_func=lambda d: d.strftime("%Y-%m-%d"),
+)
+end_pos = returns.index.get_loc(end) + 1
+cov = analytics.window_cov(returns.to_numpy(), end_pos, window)
+corr = analytics.cov_to_corr(cov)
+
+import plotly.graph_objects as go
+
+st.subheader(f"Correlation of daily log returns ({window} days to {end:%Y-%m-%d})")
+fig = go.Figure(go.Heatmap(
+    z=corr,
+    x=returns.columns,
+    y=returns.columns,
+    zmin=-1,
+    zmax=1,
+    colorscale="RdBu",
+    reversescale=True,
+))
+size = min(1000, 300 + 18 * len(returns.columns))
+fig.update_layout(height=size, width=size, yaxis=dict(autorange="reversed"))
+st.plotly_chart(fig)
+
+
+# --------------------- AVERAGE CORRELATION OVER TIME -----------------------
+# The window is slid incrementally (rank-2 updates per day)
+
+@st.cache_data(show_spinner=False)
+def cached_average_correlation(returns, window):
+    return analytics.average_correlation(returns, window)
+
+
+st.subheader("Average pairwise correlation")
+st.line_chart(cached_average_correlation(returns, window))
+
+
+# --------------------- COVARIANCE TABLE -----------------------
+
+cov_frame = pd.DataFrame(cov * periods_per_year, index=returns.columns, columns=returns.columns)
+with st.expander("Annualized covariance matrix"):
+    st.dataframe(cov_frame)
+st.download_button(
+    label="Download covariance (CSV)",
+    data=cov_frame.to_csv(),
+    file_name="covariance.csv",
+    mime="text/csv",
+)
+st.caption(
+    f"{len(returns.columns)} symbols, {len(returns)} aligned days, "
+    f"annualized volatility range {np.sqrt(np.diag(cov) * periods_per_year).min():.1%} - "
+    f"{np.sqrt(np.diag(cov) * periods_per_year).max():.1%}"
+)
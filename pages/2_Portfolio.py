@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import analytics
+from data import get_closes
+
+
+BENCHMARK = "BTC-USD"
+
+st.title("Portfolio Analytics")
+st.sidebar.header("Settings")
+
+period = st.sidebar.selectbox("Period:", ['3mo', '6mo', '1y', '2y', '5y'], index=2)
+level = st.sidebar.select_slider("VaR confidence:", options=[0.90, 0.95, 0.975, 0.99], value=0.95)
+calendar = st.sidebar.radio(
+    "Calendar alignment:",
+    ["Common trading days", "Every day (carry prices forward)"],
+    help="Crypto trades every day, stocks only on exchange sessions",
+)
+
+
+# --------------------- HOLDINGS -----------------------
+st.subheader("Holdings")
+holdings = st.data_editor(
+    pd.DataFrame({
+        "Symbol": ["BTC-USD", "ETH-USD", "AAPL", "MSFT", "SPY"],
+        "Quantity": [0.5, 4.0, 50.0, 30.0, 20.0],
+    }),
+    num_rows="dynamic",
+    key="holdings",
+)
+holdings["Symbol"] = holdings["Symbol"].astype(str).str.strip().str.upper()
+holdings = holdings[(holdings["Symbol"] != "") & (holdings["Quantity"].fillna(0) != 0)]
+quantities = holdings.groupby("Symbol")["Quantity"].sum()
+
+if quantities.empty:
+    st.info("Add at least one position.")
+    st.stop()
+
+# The benchmark is fetched alongside the positions so beta uses the same calendar
+closes = get_closes(list(dict.fromkeys([*quantities.index, BENCHMARK])), period, "1d")
+missing = [s for s in quantities.index if s not in closes]
+if missing:
+    st.warning(f"No data for: {', '.join(missing)} (left out)")
+    quantities = quantities.drop(missing)
+if quantities.empty or BENCHMARK not in closes:
+    st.error("Not enough data to analyse the portfolio.")
+    st.stop()
+
+prices = analytics.align_prices(closes, how="inner" if calendar.startswith("Common") else "outer")
+# Common trading days of crypto-only holdings still include weekends
+periods_per_year = analytics.periods_per_year(prices.index)
+benchmark = analytics.simple_returns(prices[[BENCHMARK]])[BENCHMARK]
+prices = prices[quantities.index]
+
+values = analytics.portfolio_values(prices, quantities)
+returns = analytics.simple_returns(values.to_frame())["Portfolio"]
+position_returns = analytics.simple_returns(prices)
+weights = prices.iloc[-1] * quantities / values.iloc[-1]
+
+
+# --------------------- SUMMARY -----------------------
+hist_var, hist_cvar = analytics.historical_var_cvar(returns, level)
+param_var, param_cvar = analytics.parametric_var_cvar(returns, level)
+drawdown, peak, trough = analytics.max_drawdown(values)
+portfolio_beta = analytics.betas(returns.to_frame(), benchmark)["Portfolio"]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Value", f"{values.iloc[-1]:,.2f}", f"{values.iloc[-1] / values.iloc[0] - 1:.1%}")
+col2.metric("Volatility (ann.)", f"{analytics.annualized_volatility(returns, periods_per_year):.1%}")
+col3.metric(f"Beta to {BENCHMARK}", f"{portfolio_beta:.2f}")
+col4.metric("Max drawdown", f"{drawdown:.1%}", help=f"{peak:%Y-%m-%d} to {trough:%Y-%m-%d}")
+
+st.subheader(f"1-day Value at Risk ({level:.1%})")
+st.table(pd.DataFrame(
+    {
+        "VaR": [hist_var, param_var],
+        "CVaR": [hist_cvar, param_cvar],
+        "VaR (value)": [hist_var * values.iloc[-1], param_var * values.iloc[-1]],
+        "CVaR (value)": [hist_cvar * values.iloc[-1], param_cvar * values.iloc[-1]],
+    },
+    index=["Historical", "Parametric (normal)"],
+).style.format({"VaR": "{:.2%}", "CVaR": "{:.2%}", "VaR (value)": "{:,.2f}", "CVaR (value)": "{:,.2f}"}))
+
+
+# --------------------- VALUE AND DRAWDOWN -----------------------
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.05)
+fig.add_trace(go.Scatter(x=values.index, y=values, mode="lines", name="Value", line=dict(color="blue")),
+              row=1, col=1)
+fig.add_trace(go.Scatter(x=values.index, y=values / values.cummax() - 1, mode="lines", fill="tozeroy",
+                         name="Drawdown", line=dict(color="red")), row=2, col=1)
+fig.update_yaxes(tickformat=".0%", row=2, col=1)
+fig.update_layout(height=600, width=1000, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+st.plotly_chart(fig)
+
+
+# --------------------- POSITIONS -----------------------
+st.subheader("Positions")
+positions = pd.DataFrame({
+    "Quantity": quantities,
+    "Price": prices.iloc[-1],
+    "Value": prices.iloc[-1] * quantities,
+    "Weight": weights,
+    "Volatility (ann.)": analytics.annualized_volatility(position_returns, periods_per_year),
+    f"Beta to {BENCHMARK}": analytics.betas(position_returns, benchmark),
+    "Risk contribution": analytics.risk_contributions(position_returns, weights, periods_per_year),
+})
+st.dataframe(positions.sort_values("Value", ascending=False).style.format({
+    "Price": "{:,.2f}",
+    "Value": "{:,.2f}",
+    "Weight": "{:.1%}",
+    "Volatility (ann.)": "{:.1%}",
+    f"Beta to {BENCHMARK}": "{:.2f}",
+    "Risk contribution": "{:.1%}",
+}))
+st.caption(f"{len(quantities)} positions over {len(prices)} aligned days; "
+           f"weights sum to {np.sum(weights):.0%}")
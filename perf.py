@@ -0,0 +1,201 @@
+# Per-stage performance instrumentation for app.py.
+#
+# Every rerun of the dashboard gets a RerunProfile; each block of app.py is
+# wrapped in `with profile.stage("name"):`. Finished reruns are
+#   - logged as one JSON line on the "crypto_app.perf" logger,
+#   - folded into process-wide Prometheus-style counters and histograms
+#     (shared by all sessions served by this process),
+#   - optionally written to a node_exporter textfile (PERF_PROM_FILE).
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("crypto_app.perf")
+
+# Histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Number of recent reruns kept for the in-app percentile readout
+RECENT_RERUNS = 1000
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts, sum, count]
+        self.recent_reruns = deque(maxlen=RECENT_RERUNS)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, tuple(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def counter(self, name, labels=()):
+        return self._counters.get((name, tuple(labels)), 0)
+
+    def percentile(self, q):
+        values = sorted(self.recent_reruns)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def render(self):
+        # Prometheus text exposition format
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{fmt_labels(labels)} {value}")
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), (buckets, total, count) in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for bound, c in zip(BUCKETS, buckets):
+                        lines.append(f"{name}_bucket{fmt_labels(labels, [('le', bound)])} {c}")
+                    lines.append(f"{name}_bucket{fmt_labels(labels, [('le', '+Inf')])} {count}")
+                    lines.append(f"{name}_sum{fmt_labels(labels)} {total:.6f}")
+                    lines.append(f"{name}_count{fmt_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        # Atomic replace so the textfile collector never reads a partial file
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".perf-")
+        with os.fdopen(fd, "w") as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
+
+
+registry = Registry()
+
+
+# --------------------- CACHE HIT RATES -----------------------
+# Call cache_call() at the call site of a cached function and cache_miss()
+# inside its body: the body only runs on a miss.
+
+def cache_call(name):
+    registry.inc("crypto_app_cache_calls_total", [("cache", name)])
+
+
+def cache_miss(name):
+    registry.inc("crypto_app_cache_misses_total", [("cache", name)])
+
+
+def cache_stats(name):
+    calls = registry.counter("crypto_app_cache_calls_total", [("cache", name)])
+    misses = registry.counter("crypto_app_cache_misses_total", [("cache", name)])
+    hits = max(calls - misses, 0)
+    return {"calls": calls, "hits": hits, "hit_rate": hits / calls if calls else None}
+
+
+# --------------------- RERUN PROFILE -----------------------
+
+# tracemalloc slows allocation down noticeably, so it only runs while a
+# rerun with the developer panel open is in progress. It is process-wide and
+# sessions rerun concurrently in threads, so the profiles tracking memory
+# are counted and the last one to finish stops it (unless it was already
+# running before the first one, then it is left on).
+_memory_lock = threading.Lock()
+_memory_profiles = 0
+_memory_started = False  # tracing was started here
+
+
+def _track_memory():
+    global _memory_profiles, _memory_started
+    with _memory_lock:
+        if _memory_profiles == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_started = True
+        _memory_profiles += 1
+
+
+def _untrack_memory():
+    global _memory_profiles, _memory_started
+    with _memory_lock:
+        _memory_profiles -= 1
+        if _memory_profiles == 0 and _memory_started:
+            tracemalloc.stop()
+            _memory_started = False
+
+
+class RerunProfile:
+    def __init__(self, track_memory=False):
+        # With several concurrent sessions the memory deltas include their
+        # work too
+        self.track_memory = track_memory
+        self._untrack = None
+        if track_memory:
+            _track_memory()
+            # Released by finish(), or when a rerun that stopped early drops
+            # the profile
+            self._untrack = weakref.finalize(self, _untrack_memory)
+        self.stages = []  # dicts with stage, seconds, memory_delta
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        mem_before = tracemalloc.get_traced_memory()[0] if self.track_memory else None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            mem_delta = None
+            if mem_before is not None:
+                mem_delta = tracemalloc.get_traced_memory()[0] - mem_before
+            self.stages.append({"stage": name, "seconds": seconds, "memory_delta": mem_delta})
+            registry.observe("crypto_app_stage_seconds", seconds, [("stage", name)])
+
+    def finish(self):
+        if self._untrack is not None:
+            self._untrack()
+        total = time.perf_counter() - self._started
+        registry.observe("crypto_app_rerun_seconds", total)
+        registry.inc("crypto_app_reruns_total")
+        registry.recent_reruns.append(total)
+
+        logger.info(json.dumps({
+            "event": "rerun",
+            "seconds": round(total, 6),
+            "stages": [
+                {**s, "seconds": round(s["seconds"], 6)} for s in self.stages
+            ],
+        }))
+
+        path = os.environ.get("PERF_PROM_FILE")
+        if path:
+            try:
+                registry.write_textfile(path)
+            except OSError as e:
+                logger.warning("could not write %s: %s", path, e)
+        return total
@@ -0,0 +1,326 @@
+# Market-data providers behind data.get_data().
+#
+# A provider declares what it can serve (intervals, how far back each
+# interval goes, whether one request can carry several symbols) and a
+# relative cost per request. data.py asks select_provider() for the cheapest
+# provider able to serve a request, so a local replay directory is used when
+# it covers the request, then the memory-mapped archive (archive.py) that
+# data.py writes downloads through to (closed date ranges only), and Yahoo is
+# only called for the rest. An exchange API plugs in by subclassing Provider
+# and adding an instance to PROVIDERS.
+#
+# Every provider returns frames with flat columns in yf.download order
+# (COLUMNS) and a DatetimeIndex.
+
+import os
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+import archive
+import fetch
+import gaps
+
+COLUMNS = ["Close", "High", "Low", "Open", "Volume"]
+
+PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+    "1y": 366, "2y": 731, "5y": 1827, "10y": 3653, "max": None,
+}
+
+
+def period_start(period, now):
+    # First timestamp covered by a yfinance-style period ending at `now`
+    if period == "ytd":
+        return now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    days = PERIOD_DAYS[period]
+    return None if days is None else now - timedelta(days=days)
+
+
+def _as_timestamp(value, tz):
+    # value comparable with an index in tz (None: a naive index in UTC)
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(tz) if ts.tzinfo is None else ts.tz_convert(tz)
+
+
+class Provider:
+    name = "base"
+    intervals = ()
+    max_lookback_days = {}  # interval -> days back from today (None = unlimited)
+    supports_batch = False
+    max_batch = 1  # symbols per download_many request
+    cost = 1.0  # relative cost of one request; local sources are 0
+    limiter = None  # fetch.TokenBucket for remote providers
+    breaker = None  # fetch.CircuitBreaker for remote providers
+
+    def can_serve(self, symbol, period, interval, start=None, end=None):
+        if interval not in self.intervals:
+            return False
+        limit = self.max_lookback_days.get(interval)
+        if limit is None:
+            return True
+        if start is not None:
+            return (date.today() - pd.Timestamp(start).date()).days <= limit
+        days = PERIOD_DAYS.get(period, 366 if period == "ytd" else None)
+        return days is not None and days <= limit
+
+    def download(self, symbol, period, interval, start=None, end=None):
+        raise NotImplementedError
+
+    def download_many(self, symbols, period, interval, start=None, end=None):
+        # Returns {symbol: frame} for the symbols that have data and
+        # {symbol: FetchError} for the others. Default: one request per symbol.
+        frames, errors = {}, {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self.download(symbol, period, interval, start, end)
+            except fetch.NoDataError as e:
+                errors[symbol] = e
+        return frames, errors
+
+    def news(self, symbol):
+        # List of dicts with title, link, publisher, published (Timestamp)
+        return []
+
+
+# --------------------- YFINANCE -----------------------
+
+class YFinanceProvider(Provider):
+    name = "yfinance"
+    intervals = ("1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo")
+    # Yahoo only keeps intraday history this far back
+    max_lookback_days = {
+        "1m": 30, "2m": 60, "5m": 60, "15m": 60, "30m": 60,
+        "60m": 730, "90m": 60, "1h": 730,
+    }
+    supports_batch = True
+    max_batch = 100
+    cost = 1.0
+
+    def __init__(self):
+        self.limiter = fetch.TokenBucket(rate=2, capacity=5)  # requests per second
+        self.breaker = fetch.CircuitBreaker(failure_threshold=5, reset_seconds=30)
+
+    def download(self, symbol, period, interval, start=None, end=None):
+        import yfinance as yf
+
+        # Handle data fetching based on the selected period or custom dates
+        if start is None:
+            df = yf.download(tickers=symbol, period=period, interval=interval,
+                             progress=False, multi_level_index=False)
+        else:
+            df = yf.download(tickers=symbol, start=start, end=end, interval=interval,
+                             progress=False, multi_level_index=False)
+
+        if df.empty:
+            raise self._error(yf, symbol)
+        return df[COLUMNS]
+
+    def _error(self, yf, symbol):
+        # yfinance reports failures per ticker instead of raising
+        error = str(getattr(yf.shared, "_ERRORS", {}).get(symbol, ""))
+        if not error or "delisted" in error or "not found" in error.lower() or "No data" in error:
+            return fetch.NoDataError(error or f"No data for {symbol}")
+        return fetch.TransientError(error)
+
+    def download_many(self, symbols, period, interval, start=None, end=None):
+        # One request for the whole group; the (Ticker, Price) columns are
+        # split back into one frame per symbol on its own calendar
+        import yfinance as yf
+
+        symbols = list(symbols)
+        if start is None:
+            df = yf.download(tickers=symbols, period=period, interval=interval, group_by="ticker",
+                             progress=False, multi_level_index=True)
+        else:
+            df = yf.download(tickers=symbols, start=start, end=end, interval=interval,
+                             group_by="ticker", progress=False, multi_level_index=True)
+
+        frames, errors = {}, {}
+        present = set(df.columns.get_level_values(0)) if not df.empty else set()
+        for symbol in symbols:
+            frame = df[symbol][COLUMNS].dropna(how="all") if symbol in present else None
+            if frame is None or frame.empty:
+                errors[symbol] = self._error(yf, symbol)
+            else:
+                frames[symbol] = frame
+        if not frames and any(isinstance(e, fetch.TransientError) for e in errors.values()):
+            # Nothing came back at all: treat the request as failed so it is retried
+            raise next(e for e in errors.values() if isinstance(e, fetch.TransientError))
+        return frames, errors
+
+    def news(self, symbol):
+        import yfinance as yf
+
+        articles = []
+        for item in yf.Ticker(symbol).news or []:
+            # Newer yfinance versions nest the article under "content"
+            content = item.get("content", item)
+            link = content.get("link") or (content.get("canonicalUrl") or {}).get("url")
+            publisher = content.get("publisher") or (content.get("provider") or {}).get("displayName")
+            if "providerPublishTime" in content:
+                published = pd.to_datetime(content["providerPublishTime"], unit="s")
+            else:
+                published = pd.to_datetime(content.get("pubDate"))
+            articles.append({"title": content.get("title"), "link": link,
+                             "publisher": publisher, "published": published})
+        return articles
+
+
+# --------------------- LOCAL REPLAY -----------------------
+
+class ReplayProvider(Provider):
+    # Serves recorded bars from `root`/<SYMBOL>_<interval>.(parquet|csv), for
+    # offline work and repeatable benchmarks. Periods are measured back from
+    # the last recorded bar, so a recording replays the same way any day.
+    name = "replay"
+    supports_batch = True
+    max_batch = 10_000  # local files, no request overhead
+    cost = 0.0
+
+    def __init__(self, root):
+        self.root = root
+        self._frames = {}  # path -> (mtime, frame)
+
+    def _path(self, symbol, interval):
+        for ext in ("parquet", "csv"):
+            path = os.path.join(self.root, f"{symbol.upper()}_{interval}.{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    @property
+    def intervals(self):
+        if not os.path.isdir(self.root):
+            return ()
+        names = (os.path.splitext(f)[0] for f in os.listdir(self.root))
+        return tuple({n.rsplit("_", 1)[1] for n in names if "_" in n})
+
+    def can_serve(self, symbol, period, interval, start=None, end=None):
+        path = self._path(symbol, interval)
+        if path is None:
+            return False
+        if start is None:
+            return True
+        frame = self._load(path)
+        return not frame.empty and frame.index[0] <= _as_timestamp(start, frame.index.tz)
+
+    def _load(self, path):
+        mtime = os.path.getmtime(path)
+        cached = self._frames.get(path)
+        if cached is None or cached[0] != mtime:
+            if path.endswith(".parquet"):
+                frame = pd.read_parquet(path)
+            else:
+                frame = pd.read_csv(path, index_col=0)
+                frame.index = pd.to_datetime(frame.index, utc=True)
+            frame.columns = [c.strip().title() for c in frame.columns]
+            cached = self._frames[path] = (mtime, frame[COLUMNS].sort_index())
+        return cached[1]
+
+    def download(self, symbol, period, interval, start=None, end=None):
+        path = self._path(symbol, interval)
+        if path is None:
+            raise fetch.NoDataError(f"No recording for {symbol} {interval} in {self.root}")
+        frame = self._load(path)
+        if frame.empty:
+            raise fetch.NoDataError(f"Empty recording {path}")
+        if start is None:
+            first = period_start(period, frame.index[-1].to_pydatetime())
+            out = frame if first is None else frame[frame.index >= pd.Timestamp(first)]
+        else:
+            tz = frame.index.tz
+            out = frame[frame.index >= _as_timestamp(start, tz)]
+            if end is not None:
+                out = out[out.index < _as_timestamp(end, tz)]
+        if out.empty:
+            raise fetch.NoDataError(f"Recording for {symbol} does not cover the request")
+        return out.copy()
+
+
+# --------------------- MEMORY-MAPPED ARCHIVE -----------------------
+
+class ArchiveProvider(Provider):
+    # Serves Custom Dates ranges the archive fully covers. It only holds
+    # closed bars, so requests running up to now (a period, or no end date)
+    # go to a remote provider, which also returns the bar still forming.
+    name = "archive"
+    supports_batch = True
+    max_batch = 10_000
+    cost = 0.0
+
+    def __init__(self, open_archive, bar_lengths):
+        self.open_archive = open_archive  # () -> archive.Archive, opened on first use
+        self.bar_lengths = bar_lengths  # interval -> pd.Timedelta
+
+    @property
+    def archive(self):
+        return self.open_archive()
+
+    @property
+    def intervals(self):
+        return tuple(i for i in self.archive.intervals() if i in self.bar_lengths)
+
+    def can_serve(self, symbol, period, interval, start=None, end=None):
+        if interval not in self.bar_lengths or start is None or end is None:
+            return False
+        series = self.archive.series(symbol, interval)
+        if series is None or series.rows == 0:
+            return False
+        return (series.first <= _as_timestamp(start, series.tz)
+                and series.last + self.bar_lengths[interval] >= _as_timestamp(end, series.tz))
+
+    def download(self, symbol, period, interval, start=None, end=None):
+        series = self.archive.series(symbol, interval)
+        if series is None:
+            raise fetch.NoDataError(f"No archive for {symbol} {interval}")
+        if start is None:
+            start = period_start(period, pd.Timestamp.now(tz="UTC").to_pydatetime())
+        out = series.slice(start, end)
+        if out.empty:
+            raise fetch.NoDataError(f"Archive for {symbol} does not cover the request")
+        return out
+
+
+# --------------------- SELECTION -----------------------
+
+# Downloads are written through to the archive (data.py); set ARCHIVE_DIR to
+# an empty string to turn it off. It is opened on first use (get_archive()),
+# not while the app imports.
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", os.path.join(".cache", "ohlcv"))
+ARCHIVE = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    # The archive.Archive under ARCHIVE_DIR, or None when it is turned off
+    global ARCHIVE
+    if ARCHIVE is None and ARCHIVE_DIR:
+        with _archive_lock:
+            if ARCHIVE is None:
+                ARCHIVE = archive.Archive(ARCHIVE_DIR)
+    return ARCHIVE
+
+
+PROVIDERS = []
+if os.environ.get("REPLAY_DIR"):
+    PROVIDERS.append(ReplayProvider(os.environ["REPLAY_DIR"]))
+if ARCHIVE_DIR:
+    PROVIDERS.append(ArchiveProvider(get_archive, {i: pd.Timedelta(f) for i, f in gaps.INTERVALS.items()}))
+PROVIDERS.append(YFinanceProvider())
+
+
+def select_provider(symbol, period, interval, start=None, end=None, n_symbols=1):
+    # Cheapest provider able to serve the request; for several symbols,
+    # providers that batch them into one request are preferred
+    candidates = [p for p in PROVIDERS if p.can_serve(symbol, period, interval, start, end)]
+    if not candidates:
+        raise fetch.NoDataError(f"No provider serves interval {interval} for period {period}")
+    return min(candidates, key=lambda p: p.cost * (1 if p.supports_batch else n_symbols))
+
+
+def news_provider():
+    return next((p for p in PROVIDERS if type(p).news is not Provider.news), None)
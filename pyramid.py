@@ -0,0 +1,98 @@
+# Level-of-detail pyramid for charting long series at screen resolution.
+#
+# Level k holds buckets of 2**k consecutive bars: the first bar's time and,
+# per column, the aggregates it is configured with (first/last/min/max, sum
+# for volume). Each level is built from the one below by combining
+# neighbouring pairs, so a pyramid costs about twice its columns.
+#
+# window(start, end, points) picks the finest level with at most `points`
+# buckets between start and end and slices it, so a zoom window over years
+# of minute bars is answered with ~points rows whatever its length. Columns
+# are kept separately: when an indicator changes only its levels are rebuilt.
+
+import numpy as np
+import pandas as pd
+
+
+def _combine(level, how):
+    # Next level: neighbouring pairs merged, an odd last bucket kept alone
+    n = len(level)
+    a, b = level[0:n - 1:2], level[1:n:2]
+    if how == "first":
+        merged = np.where(np.isnan(a), b, a)
+    elif how == "last":
+        merged = np.where(np.isnan(b), a, b)
+    elif how == "min":
+        merged = np.fmin(a, b)
+    elif how == "max":
+        merged = np.fmax(a, b)
+    else:  # sum
+        merged = np.nansum(np.stack([a, b]), axis=0)
+    return np.concatenate((merged, level[n - 1:])) if n % 2 else merged
+
+
+def _levels(values, how):
+    levels = [values]
+    while len(levels[-1]) > 1:
+        levels.append(_combine(levels[-1], how))
+    return levels
+
+
+class Pyramid:
+    def __init__(self, aggregations=None):
+        # aggregations: column -> tuple of "first", "last", "min", "max",
+        # "sum"; the first one is served under the column's name, the others
+        # as "<column> <how>". Other columns get ("last",).
+        self.aggregations = aggregations or {}
+        self._index = None  # level 0 times (int64 in units of self._unit)
+        self._unit = "ns"
+        self._times = []  # bucket start time per level
+        self._columns = {}  # column -> (values, {how: levels})
+
+    def update(self, df):
+        # Brings the pyramid in line with df; returns the rebuilt columns
+        times = df.index.asi8
+        if self._index is None or self._unit != df.index.unit or not np.array_equal(self._index, times):
+            depth = int(np.ceil(np.log2(len(times)))) + 1 if len(times) > 1 else 1
+            self._index = times
+            self._unit = df.index.unit
+            self._times = [times[::2 ** k] for k in range(depth)]
+            self._columns = {}
+        rebuilt = []
+        for column in df.columns:
+            values = df[column].to_numpy(dtype="float64")
+            cached = self._columns.get(column)
+            if cached is not None and np.array_equal(cached[0], values, equal_nan=True):
+                continue
+            hows = self.aggregations.get(column, ("last",))
+            self._columns[column] = (values, {how: _levels(values, how) for how in hows})
+            rebuilt.append(column)
+        for column in set(self._columns) - set(df.columns):
+            del self._columns[column]
+        return rebuilt
+
+    @property
+    def levels(self):
+        return len(self._times)
+
+    def level_for(self, start, end, points):
+        # Finest level with at most `points` buckets from row start to end
+        rows = max(end - start, 1)
+        return min(max(0, int(np.ceil(np.log2(rows / points)))), self.levels - 1)
+
+    def window(self, start, end, points, tz=None):
+        # (level, frame) with one row per bucket for start <= time < end
+        ns = pd.Timedelta(1, unit=self._unit).value
+        i = int(np.searchsorted(self._index, -(-pd.Timestamp(start).value // ns)))
+        j = int(np.searchsorted(self._index, -(-pd.Timestamp(end).value // ns)))
+        k = self.level_for(i, j, points)
+        lo = i >> k
+        hi = ((j - 1) >> k) + 1 if j > i else lo
+        index = pd.DatetimeIndex(self._times[k][lo:hi].view(f"M8[{self._unit}]"))
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        out = {}
+        for column, (_, levels) in self._columns.items():
+            for n, (how, level) in enumerate(levels.items()):
+                out[column if n == 0 else f"{column} {how}"] = level[k][lo:hi]
+        return k, pd.DataFrame(out, index=index)
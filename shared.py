@@ -0,0 +1,233 @@
+# Zero-copy handoff of OHLCV and indicator arrays to worker processes.
+#
+# A process pool (screeners, parameter sweeps, backtests) that is given
+# DataFrames pickles each of them into every task: the bytes are copied out,
+# sent through a pipe and copied in again. Here the main process copies
+# each array once into a named shared-memory block (Registry.publish) and
+# sends workers a handle of a few hundred bytes; attach() maps the block and
+# returns an ndarray or DataFrame over it, so every worker reads the same
+# physical pages. A worker maps each block once and keeps it for the tasks
+# that follow.
+#
+#   registry = shared.Registry()
+#   handles = {s: registry.publish(("ohlcv", s), data.get_data(s, "5y", "1d")) for s in symbols}
+#   # (yfinance's int64 Volume is published as float64 with the prices)
+#   with ProcessPoolExecutor(16) as pool:
+#       results = list(pool.map(screen, handles.values()))   # screen(h): shared.attach(h) ...
+#   registry.close()
+#
+# Blocks are reference counted by key in the publishing process: publishing
+# a key that is already published returns the same handle and adds a
+# reference, release() drops one and unlinks the block with the last.
+# close() (also run at exit) unlinks whatever is left, so no block outlives
+# the process even when a caller forgets to release. Attached arrays are
+# read-only: workers share the pages and must not write to them.
+#
+# Measured against pickling with benchmarks/shared.py.
+
+import atexit
+import itertools
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+_names = itertools.count()
+
+
+class ArrayHandle:
+    # What a worker needs to map one array: block name, shape and dtype
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __repr__(self):
+        return f"ArrayHandle({self.name!r}, {self.shape}, {self.dtype})"
+
+
+class FrameHandle:
+    # A DataFrame of same-dtype columns: the values as one (columns, rows)
+    # block, so each column is contiguous, and the index as a second one
+    def __init__(self, values, index, columns, tz=None, attrs=None):
+        self.values = values  # ArrayHandle
+        self.index = index  # ArrayHandle of int64 times (or plain values)
+        self.columns = columns
+        self.tz = tz
+        self.attrs = attrs or {}
+
+    def __repr__(self):
+        return f"FrameHandle({self.values.name!r}, {self.values.shape[1]} rows, {list(self.columns)})"
+
+
+def _create(array):
+    array = np.asarray(array)
+    name = f"ca{os.getpid()}_{next(_names)}"  # short: macOS allows 31 characters
+    block = shared_memory.SharedMemory(name=name, create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, ArrayHandle(name, array.shape, array.dtype.str)
+
+
+def _blocks(handle):
+    if isinstance(handle, FrameHandle):
+        return [handle.values.name, handle.index.name]
+    return [handle.name]
+
+
+class Registry:
+    # Shared-memory blocks published by this process, by key
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> [handle, references, blocks]
+        self._pid = os.getpid()
+        atexit.register(self.close)
+
+    def publish(self, key, values):
+        # Handle for an ndarray, Series or DataFrame under key; the values are
+        # copied into shared memory once. A frame's numeric columns share one
+        # block in their common dtype (int64 and float64 columns as float64).
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+        if isinstance(values, pd.Series):
+            values = values.to_frame()
+        if isinstance(values, pd.DataFrame):
+            handle, blocks = self._frame(values)
+        else:
+            block, handle = _create(values)
+            blocks = [block]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:  # published by another thread meanwhile
+                entry[1] += 1
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+                return entry[0]
+            self._entries[key] = [handle, 1, blocks]
+        return handle
+
+    def _frame(self, df):
+        index = df.index
+        tz = None
+        if isinstance(index, pd.DatetimeIndex):
+            tz = str(index.tz) if index.tz is not None else None
+            index_values = (index.tz_convert(None) if tz else index).to_numpy()  # UTC
+        else:
+            index_values = index.to_numpy()
+        dtypes = set(df.dtypes)
+        if not all(pd.api.types.is_numeric_dtype(d) for d in dtypes):
+            raise ValueError(f"only numeric columns can be published, not {sorted(map(str, dtypes))}")
+        dtype = np.result_type(*dtypes) if dtypes else np.float64
+        values, values_handle = _create(df.to_numpy(dtype=dtype).T)
+        times, index_handle = _create(index_values)
+        return FrameHandle(values_handle, index_handle, list(df.columns), tz, dict(df.attrs)), [values, times]
+
+    def release(self, key):
+        # Drops one reference; the last one unlinks the block
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(key)
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._entries[key]
+        for block in entry[2]:
+            block.close()
+            block.unlink()
+
+    def references(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return sum(block.size for _, _, blocks in list(self._entries.values()) for block in blocks)
+
+    def close(self):
+        # Unlinks every block, whatever its references
+        if os.getpid() != self._pid:
+            return  # a forked worker; the blocks belong to the parent
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for _, _, blocks in entries.values():
+            for block in blocks:
+                block.close()
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------------- WORKERS -----------------------
+
+_attached = {}  # block name -> SharedMemory mapped by this process
+
+
+def _open(name):
+    # Only the publisher unlinks. Before Python 3.13 attaching registers the
+    # block with the resource tracker, which unlinks what is registered when
+    # its processes exit. Pool workers share the publisher's tracker, where
+    # the block is registered already; a process that starts its own tracker
+    # here has to take the block off it.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    own_tracker = resource_tracker._resource_tracker._fd is None
+    block = shared_memory.SharedMemory(name=name)
+    if own_tracker:
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def _map(handle):
+    block = _attached.get(handle.name)
+    if block is None:
+        block = _attached[handle.name] = _open(handle.name)
+    array = np.ndarray(handle.shape, dtype=handle.dtype, buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+def attach(handle):
+    # The ndarray or DataFrame behind a handle, without copying its values
+    if isinstance(handle, ArrayHandle):
+        return _map(handle)
+    index = _map(handle.index)
+    if np.issubdtype(index.dtype, np.datetime64):
+        index = pd.DatetimeIndex(index)
+        if handle.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(handle.tz)
+    df = pd.DataFrame(_map(handle.values).T, index=index, columns=handle.columns, copy=False)
+    df.attrs.update(handle.attrs)
+    return df
+
+
+def detach(handle=None):
+    # Unmaps one handle's blocks (all blocks when None) in this process;
+    # arrays still referring to them must be gone
+    names = list(_attached) if handle is None else _blocks(handle)
+    for name in names:
+        block = _attached.pop(name, None)
+        if block is not None:
+            block.close()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the write-through archive of data.py out of the working tree
+os.environ.setdefault("ARCHIVE_DIR", "")
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import alerts
+import indicators
+
+
+def _ohlcv(index, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": rng.uniform(1e3, 1e4, len(index)),
+    }, index=index)
+
+
+def _watchlist():
+    # Crypto trades every hour, the stock only 14:00-20:00 on weekdays
+    hours = pd.date_range("2024-01-01", periods=24 * 60, freq="h", tz="UTC")
+    stock_hours = hours[(hours.dayofweek < 5) & (hours.hour >= 14) & (hours.hour < 21)]
+    frames = {"BTC-USD": _ohlcv(hours, 0), "AAPL": _ohlcv(stock_hours, 1)}
+    ohlcv = {field: pd.concat({s: df[field] for s, df in frames.items()}, axis=1) for field in indicators.FIELDS}
+    return frames, ohlcv
+
+
+def test_mixed_calendar_indicators_match_each_symbol_alone():
+    frames, ohlcv = _watchlist()
+    index, symbols, panel = alerts.build_panel(ohlcv, ["RSI", "MACD", "Bollinger Bands"])
+    for j, symbol in enumerate(symbols):
+        alone = indicators.compute(frames[symbol], ["RSI", "MACD", "Bollinger Bands"])
+        for name, values in alone.items():
+            expected = values.reindex(index).to_numpy()
+            np.testing.assert_allclose(panel[name][:, j], expected, rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+
+def _fired(ohlcv, rules):
+    # Alerts over the whole history, as if every bar after the first were new
+    engine = alerts.AlertEngine(rules)
+    index, symbols, panel = alerts.build_panel(ohlcv, engine._indicators)
+    engine._last_bar = index[0]
+    return {(a["rule"], a["symbol"], a["bar"]) for a in engine.evaluate(index, symbols, panel)}
+
+
+def test_mixed_calendar_crossings_match_each_symbol_alone():
+    # Crypto on the hour, the stock on the half hour: no row has both
+    hours = pd.date_range("2024-01-01", periods=24 * 30, freq="h", tz="UTC")
+    half_hours = (hours + pd.Timedelta(minutes=30))[(hours.dayofweek < 5) & (hours.hour >= 14) & (hours.hour < 21)]
+    frames = {"BTC-USD": _ohlcv(hours, 0), "AAPL": _ohlcv(half_hours, 1)}
+    rules = alerts.DEFAULT_RULES
+
+    mixed = _fired({f: pd.concat({s: df[f] for s, df in frames.items()}, axis=1, sort=True)
+                    for f in indicators.FIELDS}, rules)
+    alone = set()
+    for symbol, df in frames.items():
+        alone |= _fired({f: df[[f]].set_axis([symbol], axis=1) for f in indicators.FIELDS}, rules)
+    assert {symbol for _, symbol, _ in alone} == set(frames)
+    assert mixed == alone
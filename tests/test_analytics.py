@@ -0,0 +1,23 @@
+import pandas as pd
+
+import analytics
+
+
+def _closes(symbols, freq):
+    index = pd.date_range("2024-01-01", periods=60, freq=freq, tz="UTC")
+    return {s: pd.Series(range(1, 61), index=index, dtype="float64") for s in symbols}
+
+
+def test_periods_per_year_follows_the_aligned_calendar():
+    crypto = _closes(["BTC-USD", "ETH-USD"], "D")
+    stocks = _closes(["AAPL"], "B")
+    assert analytics.periods_per_year(analytics.align_prices(crypto).index) == 365
+    assert analytics.periods_per_year(analytics.align_prices({**crypto, **stocks}).index) == 252
+    assert analytics.periods_per_year(analytics.align_prices({**crypto, **stocks}, how="outer").index) == 365
+
+
+def test_periods_per_year_of_intraday_bars():
+    hours = pd.date_range("2024-01-01", periods=24 * 14, freq="h")
+    assert analytics.periods_per_year(hours) == 365 * 24
+    sessions = hours[(hours.dayofweek < 5) & (hours.hour >= 14) & (hours.hour < 21)]
+    assert analytics.periods_per_year(sessions) == 252 * 7
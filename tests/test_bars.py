@@ -0,0 +1,27 @@
+import io
+
+import numpy as np
+import pytest
+
+import bars
+
+NS = 1_700_000_000_123_456_789
+
+
+@pytest.mark.parametrize("unit", [10**9, 10**6, 10**3, 1])
+def test_integer_epochs_in_any_unit(unit):
+    ts, _, _ = bars.read_trades(io.StringIO(f"timestamp,price,size\n{NS // unit},1.0,2.0\n"))
+    assert ts[0] == NS // unit * unit
+
+
+@pytest.mark.parametrize("unit", [10**9, 10**6])
+def test_fractional_epochs_keep_their_fraction(unit):
+    ts, _, _ = bars.read_trades(io.StringIO(f"timestamp,price,size\n{NS / unit!r},1.0,2.0\n"))
+    assert abs(ts[0] - NS) < 1000
+
+
+def test_trades_are_sorted_stably_by_time():
+    text = "timestamp,price,size\n3000,1,1\n1000,2,1\n3000,3,1\n2000,4,1\n1000,5,1\n"
+    ts, price, _ = bars.read_trades(io.StringIO(text))
+    assert (ts == np.array([1, 1, 2, 3, 3]) * 10**12).all()
+    assert price.tolist() == [2, 5, 4, 1, 3]
@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import archive
+import data
+import materialize
+import providers
+
+
+def _frame(index):
+    n = len(index)
+    return pd.DataFrame({c: np.arange(1.0, n + 1) for c in archive.COLUMNS}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = archive.Archive(str(tmp_path))
+    monkeypatch.setattr(providers, "ARCHIVE", store)
+    monkeypatch.setattr(data, "_indicators", materialize.IndicatorStore(store))
+    return store
+
+
+def test_archive_is_opened_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(providers, "ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(providers, "ARCHIVE", None)
+    monkeypatch.setattr(data, "_indicators", None)
+    assert data.get_indicators("BTC-USD", "1d", _frame(pd.date_range("2024-01-01", periods=3))) is None
+    assert providers.ARCHIVE is not None and providers.get_archive() is providers.ARCHIVE
+    assert data._indicators.ohlcv is providers.ARCHIVE
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "America/New_York"])
+def test_archive_keeps_closed_bars_of_naive_and_aware_indexes(store, tz):
+    # The last bar is still forming and must not be archived
+    index = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=5, freq="D")
+    index = index.tz_localize(None) if tz is None else index.tz_convert(tz)
+    data._archive("BTC-USD", "1d", _frame(index))
+    series = store.series("BTC-USD", "1d")
+    assert series.rows == 4
+
+
+class _Provider:
+    name = "fake"
+    max_batch = 10
+    limiter = breaker = None
+    cost = 1
+
+    def __init__(self):
+        self.calls = 0
+
+    def download_many(self, symbols, *request):
+        self.calls += 1
+        index = pd.date_range("2024-01-01", periods=3, freq="D")
+        return {s: _frame(index) for s in symbols}, {}
+
+
+def test_batch_failure_reaches_every_waiting_session(monkeypatch):
+    def broken(symbol, interval, frame):
+        raise TypeError("archive failed")
+
+    monkeypatch.setattr(data, "_backfill", lambda provider, symbol, interval, frame: frame)
+    monkeypatch.setattr(data, "_archive", broken)
+    monkeypatch.setattr(data, "BATCH_WINDOW", 0.2)
+    batcher, provider = data._Batcher(), _Provider()
+    request = ("5d", "1d", None, None)
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(batcher.submit, provider, ["AAA"], request)
+        time.sleep(0.05)
+        follower = pool.submit(batcher.submit, provider, ["BBB"], request)
+        futures = {**leader.result(timeout=5), **follower.result(timeout=5)}
+    for future in futures.values():
+        with pytest.raises(TypeError):
+            future.result(timeout=5)
+    assert provider.calls == 1
+    assert not batcher._pending
+
+    # The next request is a new batch
+    monkeypatch.setattr(data, "_archive", lambda symbol, interval, frame: None)
+    monkeypatch.setattr(data, "BATCH_WINDOW", 0)
+    assert batcher.submit(provider, ["AAA"], request)["AAA"].result(timeout=5).shape == (3, 5)
+
+
+def test_symbols_missing_from_a_download_do_not_hang(monkeypatch):
+    provider = _Provider()
+    provider.download_many = lambda symbols, *request: ({}, {})
+    monkeypatch.setattr(data, "BATCH_WINDOW", 0)
+    future = data._Batcher().submit(provider, ["AAA"], ("5d", "1d", None, None))["AAA"]
+    with pytest.raises(data.fetch.NoDataError):
+        future.result(timeout=5)
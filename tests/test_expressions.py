@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import expressions
+import indicators
+
+
+@pytest.mark.parametrize("text", [
+    "close * 10.0 ** 400",
+    "close * 10 ** 400",
+    "close + 2 ** 0.5 ** -1000",
+    "close * (-8) ** 0.5",
+    "close + 1e400",
+    "close / (1 / 0)",
+    "ema(close, 100000000000000000000)",
+    "sma(close, 0)",
+    "ema(close, 2.5)",
+    "close.__class__",
+])
+def test_invalid_formulas_raise_expression_error(text):
+    with pytest.raises(expressions.ExpressionError):
+        expressions.compile_formula(text)
+
+
+def test_formula_matches_pandas():
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 200)))
+    graph = indicators.Graph(pd.DataFrame({"Close": close}))
+    values = expressions.compile_formula("ema(close, 12) - ema(close, 26) + 2 ** 3")(graph)
+    expected = (close.ewm(span=12, min_periods=12, adjust=False).mean()
+                - close.ewm(span=26, min_periods=26, adjust=False).mean() + 8)
+    np.testing.assert_allclose(values.to_numpy(), expected.to_numpy(), rtol=1e-12)
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+import features
+from test_alerts import _watchlist
+
+
+def test_mixed_calendar_features_match_each_symbol_alone():
+    frames, ohlcv = _watchlist()
+    values, names = features.stack(ohlcv, dtype="float64")
+    index = ohlcv["Close"].index
+    for j, symbol in enumerate(ohlcv["Close"].columns):
+        alone = features.frame(frames[symbol], dtype="float64").reindex(index).to_numpy()
+        np.testing.assert_allclose(values[:, j, :], alone, rtol=1e-9, atol=1e-9)
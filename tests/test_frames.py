@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+import frames
+import indicators
+
+
+def test_compact_frame_covers_every_indicator_column():
+    n = 60
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)), index=pd.date_range("2024-01-01", periods=n))
+    prices = {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": close * 0 + 1e3}
+    df = pd.DataFrame({"Price Data_Close": close})
+    for indicator in indicators.REGISTRY.values():
+        values = indicator(prices)
+        for output, column in indicator.columns.items():
+            df[column] = values[output]
+    df["Custom_spread"] = close - close.shift()
+    df["Bollinger Bands_High Indicator"] = df["Bollinger Bands_High Indicator"].fillna(0.0)
+
+    compact = frames.compact_frame(df)
+    assert compact["Price Data_Close"].dtype == np.float64
+    assert compact["Bollinger Bands_High Indicator"].dtype == np.int8
+    others = compact.columns.drop(["Price Data_Close", "Bollinger Bands_High Indicator", "Bollinger Bands_Low Indicator"])
+    assert (compact[others].dtypes == np.float32).all()
@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+import gaps
+
+# 2024-01-15 is Martin Luther King Jr. Day
+SESSIONS = pd.bdate_range("2024-01-02", "2024-01-31").drop(pd.Timestamp("2024-01-15"))
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "America/New_York"])
+def test_daily_stock_bars_are_compared_by_session_date(tz):
+    index = SESSIONS if tz is None else SESSIONS.tz_localize(tz)
+    report = gaps.completeness("AAPL", pd.DataFrame(index=index, data={"Close": 1.0}), "1d")
+    assert report["missing"] == 0 and report["expected"] == len(SESSIONS)
+
+    report = gaps.completeness("AAPL", pd.DataFrame(index=index.delete([5, 6]), data={"Close": 1.0}), "1d")
+    assert report["missing"] == 2
+    [(start, end, n)] = report["gaps"]
+    assert (start, end, n) == (index[5], index[5] + pd.Timedelta(days=2), 2)
+
+
+def test_daily_crypto_bars_in_utc():
+    index = pd.date_range("2024-01-01", "2024-01-31", freq="D", tz="UTC")
+    report = gaps.completeness("BTC-USD", pd.DataFrame(index=index.delete(10), data={"Close": 1.0}), "1d")
+    assert report["missing"] == 1 and report["gaps"][0][0] == index[10]
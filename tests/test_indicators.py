@@ -0,0 +1,37 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+
+def _prices(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC")
+    return pd.DataFrame({"Close": close, "High": close + 0.5, "Low": close - 0.5}, index=index)
+
+
+@pytest.mark.parametrize("fillna", [False, True])
+def test_rsi_and_macd_match_ta(fillna):
+    from ta.momentum import RSIIndicator
+    from ta.trend import MACD
+
+    prices = _prices()
+    close = prices["Close"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rsi = RSIIndicator(close, 14, fillna=fillna).rsi()
+        macd = MACD(close, 26, 12, 9, fillna=fillna)
+    expected = {
+        "RSI": rsi,
+        "MACD_Line": macd.macd(),
+        "MACD_Signal": macd.macd_signal(),
+        "MACD_Histogram": macd.macd_diff(),
+    }
+    ours = {**indicators.REGISTRY["RSI"](prices, fillna=fillna),
+            **indicators.REGISTRY["MACD"](prices, fillna=fillna)}
+    for name, values in expected.items():
+        np.testing.assert_allclose(ours[name].to_numpy(), values.to_numpy(), rtol=0, atol=1e-9, err_msg=name)
@@ -0,0 +1,63 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+import kernels
+
+
+def _frame(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-2, n)))
+    spread = rng.uniform(0, 1, n)
+    return pd.DataFrame({"High": close + spread, "Low": close - spread, "Close": close})
+
+
+def _calls(df):
+    atr = indicators._atr(indicators.Graph(df))["ATR"]
+    return {
+        "psar": lambda backend: kernels.psar(df.High, df.Low, df.Close, backend=backend),
+        "supertrend": lambda backend: kernels.supertrend(df.High, df.Low, df.Close, atr, backend=backend),
+        "trailing_stop": lambda backend: kernels.trailing_stop(df.Close, atr, backend=backend),
+        "renko": lambda backend: kernels.renko(df.Close, 0.5, backend=backend),
+    }
+
+
+@pytest.mark.parametrize("name", list(kernels.KERNELS))
+def test_numba_matches_python(name):
+    pytest.importorskip("numba")
+    call = _calls(_frame())[name]
+    expected, ours = call("python"), call("numba")
+    for output, values in expected.items():
+        np.testing.assert_array_equal(ours[output].to_numpy(), values.to_numpy(), err_msg=output)
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_psar_matches_ta(backend):
+    # ta's PSARIndicator, which features.py used before the kernels; on a
+    # RangeIndex, as ta writes one branch by label
+    PSARIndicator = pytest.importorskip("ta.trend").PSARIndicator
+    if backend == "numba":
+        pytest.importorskip("numba")
+    df = _frame()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        reference = PSARIndicator(df.High, df.Low, df.Close)
+    ours = kernels.psar(df.High, df.Low, df.Close, backend=backend)
+    for output in ("psar", "psar_up", "psar_down"):
+        np.testing.assert_allclose(ours[output].to_numpy(), getattr(reference, output)().to_numpy(),
+                                   rtol=0, atol=1e-12, err_msg=output)
+
+
+def test_frame_columns_start_at_each_listing():
+    # A symbol listed later runs from its own first bar
+    df = _frame(500)
+    late = df.copy()
+    late.iloc[:200] = np.nan
+    wide = {c: pd.DataFrame({"A": df[c], "B": late[c]}) for c in df.columns}
+    out = kernels.psar(wide["High"], wide["Low"], wide["Close"])["psar"]
+    alone = kernels.psar(df.High.iloc[200:], df.Low.iloc[200:], df.Close.iloc[200:])["psar"]
+    assert out["B"].iloc[:200].isna().all()
+    np.testing.assert_array_equal(out["B"].iloc[200:].to_numpy(), alone.to_numpy())
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+import fetch
+import live
+import providers
+
+MINUTE = 60 * 10**9
+
+
+def _bars(start, n, close=100.0):
+    return [(start + i * MINUTE, np.array([close, close + 1, close - 1, close + i, 10.0])) for i in range(n)]
+
+
+def test_traces_follow_the_ring_buffer():
+    session = live.LiveSession(live.Feed(), capacity=5)
+    assert session.push(_bars(0, 8)) == 8
+    for trace in session.figure.data:
+        assert len(trace.x) == len(trace.y) == 5
+    assert session.figure.data[0].y.tolist() == [103.0, 104.0, 105.0, 106.0, 107.0]
+    assert session.figure.data[0].x.tolist() == [i * MINUTE / 10**6 for i in range(3, 8)]
+
+
+def test_chart_holds_only_the_window():
+    session = live.LiveSession(live.Feed(), capacity=50, window=10)
+    session.push(_bars(0, 40))
+    assert session.buffer.size == 40
+    for trace in session.figure.data:
+        assert len(trace.x) == len(trace.y) == 10
+    assert session.figure.data[0].y[-1] == 139.0
+
+
+def test_revision_replaces_the_last_point():
+    session = live.LiveSession(live.Feed(), capacity=5)
+    session.push(_bars(0, 3))
+    revised = np.array([100.0, 101.0, 99.0, 50.0, 10.0])
+    assert session.push([(2 * MINUTE, revised)]) == 0
+    close = session.figure.data[0]
+    assert len(close.x) == 3 and close.y[-1] == 50.0
+    assert session.push(_bars(3 * MINUTE, 1)) == 1
+    assert len(session.figure.data[0].x) == 4
+
+
+class _Provider:
+    name = "fake"
+    limiter = None
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.breaker = fetch.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        self.calls = 0
+
+    def download(self, symbol, period, interval, start=None, end=None):
+        self.calls += 1
+        frame = self.frames.pop(0)
+        if isinstance(frame, Exception):
+            raise frame
+        return frame
+
+
+def test_yfinance_feed_goes_through_the_provider_breaker(monkeypatch):
+    index = pd.date_range("2024-01-02 14:30", periods=3, freq="min", tz="UTC")
+    frame = pd.DataFrame({c: [1.0, 2.0, 3.0] for c in ("Close", "High", "Low", "Open", "Volume")}, index=index)
+    provider = _Provider([frame, fetch.TransientError("429"), fetch.TransientError("429")])
+    monkeypatch.setattr(providers, "select_provider", lambda *args, **kwargs: provider)
+    monkeypatch.setattr(fetch.time, "sleep", lambda seconds: None)
+
+    feed = live.YFinanceFeed("BTC-USD")
+    assert [t for t, _ in feed.poll()] == index.asi8.tolist()
+    assert feed.poll() == [] and feed.unavailable
+    # The breaker opened after two failures: no further request is sent
+    assert feed.poll() == [] and provider.calls == 3
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import archive
+import indicators
+import materialize
+
+
+def _bars(n, seed=0, tz="UTC"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    index = pd.date_range("2020-01-01", periods=n, freq="D", tz=tz)
+    return pd.DataFrame({
+        "Close": close, "High": close * 1.01, "Low": close * 0.99, "Open": close,
+        "Volume": rng.uniform(1e3, 1e4, n),
+    }, index=index)[archive.COLUMNS]
+
+
+@pytest.mark.parametrize("start, stop", [(0, 900), (300, 1000), (700, 1100)])
+def test_read_matches_a_computation_on_the_frame(tmp_path, start, stop):
+    # (700, 1100) also runs past the archive, from the saved state
+    bars = _bars(1100)
+    ohlcv = archive.Archive(str(tmp_path))
+    ohlcv.append("BTC-USD", "1d", bars.iloc[:1000])
+    store = materialize.IndicatorStore(ohlcv)
+    assert store.update("BTC-USD", "1d") == 1000
+
+    df = bars.iloc[start:stop]
+    ours = store.read("BTC-USD", "1d", df)
+    params = {"RSI": {"window": materialize.DEFAULT_PARAMS["rsi_window"]}}
+    expected = indicators.compute(df, indicators.DEFAULT_INDICATORS, params)
+    for column in materialize.COLUMNS:
+        np.testing.assert_allclose(ours[column].to_numpy(), expected[column].to_numpy(dtype="float64"),
+                                   rtol=1e-9, atol=1e-9, err_msg=column)
+
+
+def test_read_accepts_a_naive_index(tmp_path):
+    # yfinance daily bars are naive
+    bars = _bars(1000, tz=None)
+    ohlcv = archive.Archive(str(tmp_path))
+    ohlcv.append("BTC-USD", "1d", bars)
+    store = materialize.IndicatorStore(ohlcv)
+    store.update("BTC-USD", "1d")
+
+    df = bars.iloc[400:]
+    ours = store.read("BTC-USD", "1d", df)
+    assert ours is not None and ours.index.equals(df.index)
+    expected = indicators.compute(df, indicators.DEFAULT_INDICATORS)
+    for column in materialize.COLUMNS:
+        np.testing.assert_allclose(ours[column].to_numpy(), expected[column].to_numpy(dtype="float64"),
+                                   rtol=1e-9, atol=1e-9, err_msg=column)
@@ -0,0 +1,38 @@
+import tracemalloc
+
+import perf
+
+
+def test_concurrent_profiles_keep_memory_tracing_until_the_last_finishes(monkeypatch):
+    monkeypatch.delenv("PERF_PROM_FILE", raising=False)
+    assert not tracemalloc.is_tracing()
+    first = perf.RerunProfile(track_memory=True)
+    second = perf.RerunProfile(track_memory=True)
+    untracked = perf.RerunProfile(track_memory=False)
+    untracked.finish()
+    first.finish()
+    assert tracemalloc.is_tracing()
+    with second.stage("work"):
+        data = [0] * 100_000
+    assert second.stages[-1]["memory_delta"] > 0
+    del data
+    second.finish()
+    second.finish()  # a second finish does not release twice
+    assert not tracemalloc.is_tracing()
+
+
+def test_dropped_profile_releases_tracing():
+    profile = perf.RerunProfile(track_memory=True)
+    assert tracemalloc.is_tracing()
+    del profile
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_started_elsewhere_is_left_running(monkeypatch):
+    monkeypatch.delenv("PERF_PROM_FILE", raising=False)
+    tracemalloc.start()
+    try:
+        perf.RerunProfile(track_memory=True).finish()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
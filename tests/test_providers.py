@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import archive
+import gaps
+import providers
+
+
+@pytest.fixture
+def provider(tmp_path):
+    store = archive.Archive(str(tmp_path))
+    # Daily bars up to yesterday, naive as yfinance returns them
+    index = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D").tz_localize(None) - pd.Timedelta(days=1),
+                          periods=200, freq="D")
+    store.append("BTC-USD", "1d", pd.DataFrame({c: np.arange(1.0, 201) for c in archive.COLUMNS}, index=index))
+    bar_lengths = {i: pd.Timedelta(f) for i, f in gaps.INTERVALS.items()}
+    return providers.ArchiveProvider(lambda: store, bar_lengths), index
+
+
+def test_archive_does_not_serve_requests_up_to_now(provider):
+    provider, _ = provider
+    assert not provider.can_serve("BTC-USD", "6mo", "1d")
+    assert not provider.can_serve("BTC-USD", "Custom Dates", "1d", "2000-01-01", None)
+
+
+def test_archive_serves_closed_ranges_with_the_index_it_was_given(provider):
+    provider, index = provider
+    start, end = index[10], index[50]
+    assert provider.can_serve("BTC-USD", "Custom Dates", "1d", start.tz_localize("UTC"), end.date())
+    out = provider.download("BTC-USD", "Custom Dates", "1d", start, end)
+    assert out.index.tz is None
+    assert out.index.equals(index[10:50])
+    assert not provider.can_serve("BTC-USD", "Custom Dates", "1d", index[0] - pd.Timedelta(days=1), end)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared
+
+
+@pytest.fixture
+def registry():
+    with shared.Registry() as registry:
+        yield registry
+    shared.detach()
+
+
+def _ohlcv(tz):
+    index = pd.date_range("2024-03-08", periods=5, freq="D", tz=tz)
+    return pd.DataFrame({
+        "Close": np.arange(5.0), "High": np.arange(5.0) + 1,
+        "Volume": np.arange(5, dtype="int64") * 1000,  # int64, as yfinance returns it
+    }, index=index)
+
+
+@pytest.mark.parametrize("tz", [None, "UTC", "America/New_York"])
+def test_frame_round_trip(registry, tz):
+    df = _ohlcv(tz)
+    df.attrs["completeness"] = {"missing": 0}
+    out = shared.attach(registry.publish(("ohlcv", tz), df))
+    pd.testing.assert_frame_equal(out, df.astype("float64"), check_freq=False)
+    assert out.attrs == df.attrs
+    assert not out["Close"].to_numpy().flags.writeable
+
+
+def test_array_round_trip(registry):
+    values = np.arange(12, dtype="int32").reshape(3, 4)
+    out = shared.attach(registry.publish("array", values))
+    assert out.dtype == values.dtype and (out == values).all()
+
+
+def test_non_numeric_columns_are_rejected(registry):
+    with pytest.raises(ValueError):
+        registry.publish("text", pd.DataFrame({"a": [1.0], "b": ["x"]}))
+
+
+def test_blocks_are_unlinked_with_the_last_reference(registry):
+    df = _ohlcv("UTC")
+    handle = registry.publish("key", df)
+    assert registry.publish("key", df) is handle
+    assert registry.references("key") == 2
+
+    registry.release("key")
+    assert "key" in registry
+    shared.attach(handle)  # still mapped by name
+    shared.detach(handle)
+
+    registry.release("key")
+    assert "key" not in registry and len(registry) == 0
+    with pytest.raises(FileNotFoundError):
+        shared.attach(handle)
+    with pytest.raises(KeyError):
+        registry.release("key")
+
+
+def test_close_unlinks_every_block():
+    registry = shared.Registry()
+    handle = registry.publish("key", _ohlcv(None))
+    registry.close()
+    with pytest.raises(FileNotFoundError):
+        shared.attach(handle)